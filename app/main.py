@@ -1,14 +1,41 @@
 
 import uvicorn
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 
-from app.routers import games, match_requests, favourites
-
-app = FastAPI()
+from app.routers import games, match_requests, favourites, metrics
+from app.services.service_factory import ServiceFactory
+from app.services.Ingestion.IgdbSyncTask import IgdbSyncTask
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build every resource (and its data service, pool and schema) exactly once
+    ServiceFactory.startup(["GamesResource", "MatchRequestsResource", "FavouritesResource"])
+    games_resource = ServiceFactory.get_service("GamesResource")
+    games_resource.start_catalog_refresh()
+    # Keep game_info in step with IGDB: upserts from the last high-water mark, first one right away.
+    # Every worker starts the task; an advisory lock lets only one of them sync at a time.
+    ingestion_config = ServiceFactory.get_ingestion_config()
+    igdb_sync = None
+    if ingestion_config["sync_enabled"]:
+        igdb_sync = IgdbSyncTask(ServiceFactory.get_service("IgdbIngestion"), interval=ingestion_config["sync_interval"])
+        igdb_sync.start()
+    match_requests_resource = ServiceFactory.get_service("MatchRequestsResource")
+    await match_requests_resource.start_matchmaking()
+    yield
+    await match_requests_resource.stop_matchmaking()
+    if igdb_sync is not None:
+        await igdb_sync.stop()
+    await games_resource.stop_catalog_refresh()
+    ServiceFactory.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +50,7 @@ app.add_middleware(
 app.include_router(games.router)
 app.include_router(match_requests.router)
 app.include_router(favourites.router)
+app.include_router(metrics.router)
 
 @app.get("/health")
 async def health():
@@ -30,31 +58,3 @@ async def health():
 
 if __name__ == "__main__":
     uvicorn.run(app, port=8000, host="0.0.0.0", reload=True)
-
-
-
-# # TODO: Check if game exists, then update the game instead of creating new entry
-# @app.on_event("startup")
-# async def startup():
-#     # Initialize the 'Games' database schema
-#     print('Initialize the database...')
-#     db.initialize('Games')  # Ensure the database and tables are created
-#     print('Initialized all the tables in the database')
-#     print("Fetching game data from IGDB and populating the database...")
-#     games_info = fetch_games_data()
-#     for game in games_info:
-#         # Prepare the data object for insertion
-#         data_object = {
-#             "gameId": game["id"],
-#             "title": game["name"],
-#             "description": game["description"],
-#             "image": game["image_url"]
-#         }
-#
-#         # Insert the data object into the database
-#         if db.data_service.insert_data_object("Games", "game_info", data_object):
-#            pass
-#         else:
-#             print(f"Failed to insert game: {game['name']}")
-#     print("Database population complete for table: games_info!")
-
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
 import uuid
-from typing import List
+from typing import List, Optional
 from app.models.game import Game
+from app.models.pagination_links import PaginationLinks
 
 class Favourite(BaseModel):
     favouriteId : str = Field(default_factory=lambda: str(uuid.uuid4()))  # Automatically generate UUID
@@ -9,4 +10,5 @@ class Favourite(BaseModel):
     gameId: str
 
 class Favourites(BaseModel):
-    games: List[Game]
\ No newline at end of file
+    games: List[Game]
+    links: Optional[PaginationLinks] = None
\ No newline at end of file
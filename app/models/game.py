@@ -2,7 +2,7 @@ from typing import Optional, Dict, List
 from pydantic import BaseModel
 from app.models.pagination_links import PaginationLinks
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, Index, String, Text
 
 Base = declarative_base()
 
@@ -17,6 +17,17 @@ class GameInfo(Base):
     description = Column(Text)
     genre = Column(Text)
 
+class GameGenre(Base):
+    """One row per (game, genre); genre names are stored lowercased."""
+    __tablename__ = 'game_genre'
+    __table_args__ = (
+        Index('idx_game_genre_genre', 'genre', 'gameId'),
+        {'schema': 'Game'}
+    )
+
+    gameId = Column(String(36), primary_key=True)
+    genre = Column(String(64), primary_key=True)
+
 class Game(BaseModel):
     gameId: str
     title: str
@@ -27,4 +38,19 @@ class Game(BaseModel):
 
 class Games(BaseModel):
     games: List[Game]
-    links: PaginationLinks
\ No newline at end of file
+    links: PaginationLinks
+
+
+class GameSuggestion(BaseModel):
+    gameId: str
+    title: str
+    links: Optional[Dict[str, Dict[str, str]]] = None
+
+class GameSuggestions(BaseModel):
+    prefix: str
+    suggestions: List[GameSuggestion]
+
+class GenreCounts(BaseModel):
+    genres: Dict[str, int]
+    other: int
+    total: int
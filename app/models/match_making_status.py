@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 class MatchMakingStatus(BaseModel):
     matchRequestId: str
-    status: str  # Possible values: "matching", "matched", "not_found", "error"
-    partnerRequestId: Optional[str] = None
\ No newline at end of file
+    status: str  # Possible values: "matching", "matched", "cancelled", "expired", "not_found", "error"
+    partnerRequestId: Optional[str] = None  # First partner; kept for two-player clients
+    partnerRequestIds: Optional[List[str]] = None  # Every other request in the match or lobby
\ No newline at end of file
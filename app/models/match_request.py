@@ -10,6 +10,9 @@ class MatchRequest(BaseModel):
     expireDate: str  # Use str for date or adjust to use a specific date type
     isActive: bool = False
     isCancelled: bool = False
+    skillRating: Optional[int] = None  # Requests without a rating match any rating
+    region: Optional[str] = None
+    language: Optional[str] = None
 
 class MatchRequestWithLinks(MatchRequest):
     links: Dict[str, Dict[str, str]]
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 
 from framework.resources.base_resource import BaseResource
@@ -6,6 +7,10 @@ from app.models.game import Game
 from app.models.favourite import Favourite, Favourites
 
 from app.services.service_factory import ServiceFactory
+from framework.services.DataAccess.ExecutorDataService import ExecutorDataService
+from framework.utils.http_caching import DataVersion, Version
+from framework.utils.pagination import encode_cursor, build_href
+from framework.utils.ttl_cache import TTLCache
 
 
 class FavouritesResource(BaseResource):
@@ -22,11 +27,33 @@ class FavouritesResource(BaseResource):
         self.key_field = "favouriteId"
 
         self.data_service.initialize(self.database)
+        self.async_data_service = ExecutorDataService(self.data_service)
+
+        config = config or {}
+        # Per user, changing whenever they add a favourite; ETags of their lists are derived from it.
+        # A user's DataVersion is only kept while they are among the most recent readers.
+        self.favourites_version_ttl = config.get("favourites_version_ttl", 1)
+        self.favourites_versions = TTLCache(max_size=config.get("favourites_versions_size", 10000))
+        self.cache_control = config.get("favourites_cache_control")
+
+    def favourites_version(self, user_id: str) -> DataVersion:
+        """The version of user_id's favourites, shared by every worker through the data_version table."""
+        version = self.favourites_versions.get(user_id)
+        if version is None:
+            version = DataVersion(lambda: self.load_favourites_version(user_id), ttl=self.favourites_version_ttl)
+            self.favourites_versions.set(user_id, version)
+        return version
+
+    async def load_favourites_version(self, user_id: str) -> Version:
+        version, modified_at = await self.async_data_service.run(
+            self.data_service.get_data_version, self.database, self.data_service.favourites_version_name(user_id)
+        )
+        return Version(f"db.{version}", modified_at)
 
-    def get_item(self, key: str) -> Favourite:
-        d_service = self.data_service
+    async def get_item(self, key: str) -> Favourite:
+        d_service = self.async_data_service
 
-        record = d_service.get_data_object(
+        record = await d_service.get_data_object(
             self.database, self.table, key_field=self.key_field, key_value=key
         )
         result = self.populate_favourite_model(record)
@@ -34,30 +61,45 @@ class FavouritesResource(BaseResource):
         return result
 
 
-    def get_list(self, user_id: str, page:int, page_size:int) -> Favourites:
-        d_service = self.data_service
+    async def get_list(self, user_id: str, page:int, page_size:int, cursor: str = None) -> Favourites:
+        d_service = self.async_data_service
 
-        game_ids = d_service.get_favourites(user_id, page, page_size)
+        game_ids, has_next_page = await d_service.run(
+            self.data_service.get_favourites, user_id, page, page_size, cursor
+        )
 
-        favourite_games = []
         game_table = 'game_info'
         game_key = 'gameId'
 
-        for game_id in game_ids:
-            game = d_service.get_data_object(self.database, game_table, key_field=game_key, key_value=game_id['gameId'])
-            game_model = self.populate_game_model(game)
-            favourite_games.append(game_model)
-
-        favourites = Favourites(games = favourite_games)
+        # Look the games up concurrently rather than one round trip after another
+        games = await asyncio.gather(*[
+            d_service.get_data_object(self.database, game_table, key_field=game_key, key_value=game_id['gameId'])
+            for game_id in game_ids
+        ])
+        favourite_games = [self.populate_game_model(game) for game in games]
+
+        path = f"/favourites/{user_id}"
+        next_cursor = encode_cursor({"favouriteId": game_ids[-1]['favouriteId']}) if game_ids else None
+        favourites = Favourites(
+            games = favourite_games,
+            links={
+                "self": {"href": build_href(path, page=None if cursor else page, page_size=page_size, cursor=cursor)},
+                "next": {"href": build_href(path, page_size=page_size, cursor=next_cursor)} if has_next_page else None,
+                "prev": {"href": build_href(path, page=page - 1, page_size=page_size)} if page > 1 and not cursor else None
+            }
+        )
 
         return favourites
 
-    def add_to_favourite(self, favourite: Favourite) -> Favourite:
+    async def add_to_favourite(self, favourite: Favourite) -> Favourite:
         favourite_id = str(uuid.uuid4())
         favourite.favouriteId = favourite_id
 
-        d_service = self.data_service
-        is_successful = d_service.insert_data_object(self.database, self.table, favourite.dict())
+        d_service = self.async_data_service
+        is_successful = await d_service.insert_data_object(self.database, self.table, favourite.dict())
+        if is_successful:
+            # The insert bumped the user's version in its transaction
+            self.favourites_version(favourite.userId).invalidate()
 
         return favourite if is_successful else None
 
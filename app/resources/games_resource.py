@@ -1,6 +1,16 @@
 from framework.resources.base_resource import BaseResource
-from app.models.game import Game, Games
+from app.models.game import Game, Games, GameSuggestion, GameSuggestions, GenreCounts
 from app.services.service_factory import ServiceFactory
+from app.services.Catalog.CatalogRefresher import CatalogRefresher
+from app.services.Catalog.CatalogSnapshot import CatalogSnapshot
+from app.services.DataAccess.GamesDataService import MAIN_GENRES, OTHER_GENRE, normalize_genres
+from app.services.Search.TitlePrefixIndex import TitlePrefixIndex
+from app.services.Search.TitleIndexRefresher import TitleIndexRefresher
+from app.services.Search.TitleSearchIndex import TitleSearchIndex
+from framework.utils.pagination import encode_cursor, decode_cursor, build_href
+from framework.utils.http_caching import DataVersion, Version
+from framework.utils.ttl_cache import TTLCache
+from framework.services.DataAccess.ExecutorDataService import ExecutorDataService
 
 
 class GamesResource(BaseResource):
@@ -17,27 +27,356 @@ class GamesResource(BaseResource):
         self.key_field = "gameId"
 
         self.data_service.initialize(self.database)
+        self.async_data_service = ExecutorDataService(self.data_service)
 
+        config = config or {}
+        # Changes whenever the catalog does; ETags of /games responses are derived from it
+        self.catalog_version = DataVersion(self.load_catalog_version, ttl=config.get("catalog_version_ttl", 1))
+        self.list_cache_control = config.get("games_cache_control")
+        self.item_cache_control = config.get("game_cache_control")
 
-    def get_item(self, key: str) -> Game:
-        d_service = self.data_service
+        self.title_index = None
+        self.prefix_index = TitlePrefixIndex(max_limit=config.get("suggest_max_limit", 50))
+        # Read before the titles, so the indexes are at least as new as this version
+        indexed_version = self.read_catalog_version_tag()
+        titles = self.load_titles()
+        if titles is not None:
+            self.prefix_index.build(titles)
+            if config.get("title_index_enabled", True):
+                self.title_index = self.build_title_index(config, titles)
+        self.data_service.add_change_listener(self.on_games_changed)
 
-        record = d_service.get_data_object(
-            self.database, self.collection, key_field=self.key_field, key_value=key
+        # Games per genre; one entry, for the current catalog version
+        self.genre_counts_cache = TTLCache(max_size=1, ttl=config.get("genre_counts_ttl", 300))
+        self.games_cache = self.build_games_cache(config)
+
+        # Snapshot mode: /games is served from an in-memory copy of the catalog that a
+        # background task rebuilds and swaps in every catalog_refresh_interval seconds
+        self.catalog = None
+        self.catalog_refresher = None
+        # When the content of the current snapshot was first loaded, for Last-Modified
+        self.catalog_changed_at = None
+        # (snapshot, (prefix_index, title_index)) built by refresh_catalog for on_catalog_loaded
+        self._prepared_indexes = None
+        if config.get("catalog_snapshot_enabled", False):
+            try:
+                self.catalog = self.load_catalog()
+                self.catalog_changed_at = self.catalog.loaded_at
+                print(f"Catalog snapshot loaded: {self.catalog.stats()}")
+            except Exception as e:
+                print(f"Could not load the catalog snapshot, serving /games from the database: {e}")
+            self.catalog_refresher = CatalogRefresher(
+                self.refresh_catalog, self.on_catalog_loaded, interval=config.get("catalog_refresh_interval", 60)
+            )
+        # Otherwise writes made by other workers reach the title indexes through a rebuild
+        # whenever the shared catalog version moves
+        self.index_refresher = None
+        if self.catalog_refresher is None:
+            self.index_refresher = TitleIndexRefresher(
+                self.load_catalog_version_tag, self.rebuild_search_indexes,
+                indexed_version=indexed_version if titles is not None else None,
+                interval=config.get("title_index_refresh_interval", 30)
+            )
+
+    def load_catalog(self):
+        rows, game_genres = self.data_service.get_catalog()
+        return CatalogSnapshot(rows, game_genres, MAIN_GENRES, OTHER_GENRE)
+
+    async def refresh_catalog(self):
+        snapshot = await self.async_data_service.run(self.load_catalog)
+        current = self.catalog
+        if current is None or current.checksum != snapshot.checksum:
+            # Index the new titles here, off the request path, so the swap has nothing left to build
+            self._prepared_indexes = (snapshot, await self.async_data_service.run(
+                self.build_search_indexes, list(zip(snapshot.ids, snapshot.titles))
+            ))
+        return snapshot
+
+    def build_search_indexes(self, titles):
+        """:return: (prefix_index, title_index) over (gameId, title) pairs; title_index None if disabled."""
+        config = self.config or {}
+        prefix_index = TitlePrefixIndex(max_limit=config.get("suggest_max_limit", 50))
+        prefix_index.build(titles)
+        title_index = None
+        if config.get("title_index_enabled", True):
+            title_index = self.build_title_index(config, titles)
+        return prefix_index, title_index
+
+    def on_catalog_loaded(self, snapshot):
+        prepared, self._prepared_indexes = self._prepared_indexes, None
+        # A single reference swap: requests in flight finish on the snapshot they started with
+        previous, self.catalog = self.catalog, snapshot
+        if previous is not None and previous.checksum == snapshot.checksum:
+            return
+        # Writes made by other workers reach the title indexes only through the snapshot
+        if prepared is None or prepared[0] is not snapshot:
+            prepared = (snapshot, self.build_search_indexes(list(zip(snapshot.ids, snapshot.titles))))
+        self.prefix_index, self.title_index = prepared[1]
+        self.catalog_changed_at = snapshot.loaded_at
+        self.catalog_version.invalidate()
+        self.genre_counts_cache.clear()
+        if self.games_cache is not None:
+            self.games_cache.clear()
+
+    async def load_catalog_version(self) -> Version:
+        """
+        The version of what this process serves: the snapshot checksum in snapshot mode,
+        otherwise the catalog's version row, which every write through the data service bumps.
+        """
+        catalog = self.catalog
+        if catalog is not None:
+            return Version(f"snapshot.{catalog.checksum}", self.catalog_changed_at)
+        version, modified_at = await self.async_data_service.run(
+            self.data_service.get_data_version, self.database, self.collection
+        )
+        return Version(f"db.{version}", modified_at)
+
+    async def load_catalog_version_tag(self):
+        return (await self.catalog_version.current()).tag
+
+    def read_catalog_version_tag(self):
+        """The database catalog version tag, read synchronously; None if it cannot be read."""
+        try:
+            version, _ = self.data_service.get_data_version(self.database, self.collection)
+        except Exception as e:
+            print(f"Could not read the catalog version: {e}")
+            return None
+        return f"db.{version}"
+
+    async def rebuild_search_indexes(self):
+        """Reload every title and swap in fresh title indexes, built off the event loop."""
+        titles = await self.async_data_service.run(self.data_service.get_game_titles)
+        self.prefix_index, self.title_index = await self.async_data_service.run(self.build_search_indexes, titles)
+
+    def start_catalog_refresh(self):
+        """Start the background snapshot or title index refresh; called from the app lifespan."""
+        if self.catalog_refresher is not None:
+            self.catalog_refresher.start(delay=self.catalog_refresher.interval)
+        if self.index_refresher is not None:
+            self.index_refresher.start(delay=self.index_refresher.interval)
+
+    async def stop_catalog_refresh(self):
+        if self.catalog_refresher is not None:
+            await self.catalog_refresher.stop()
+        if self.index_refresher is not None:
+            await self.index_refresher.stop()
+
+    @staticmethod
+    def build_games_cache(config):
+        """
+        Read-through cache of Game and Games responses, keyed by catalog version and game
+        id or normalized list parameters. Anything with get/set/clear/stats can stand in for the LRU;
+        None (games_cache_size 0) sends every read to the database.
+        """
+        if config.get("games_cache_size", 10000) <= 0:
+            return None
+        return TTLCache(
+            max_size=config.get("games_cache_size", 10000),
+            ttl=config.get("games_cache_ttl", 3600),
+            max_weight=config.get("games_cache_max_bytes"),
+            # Approximate footprint: the size of the response body it saves rebuilding
+            weigher=lambda model: len(model.model_dump_json())
+        )
+
+    def load_titles(self):
+        """(gameId, title) for the whole catalog, or None if it cannot be read."""
+        try:
+            return self.data_service.get_game_titles()
+        except Exception as e:
+            print(f"Could not load game titles for the search indexes: {e}")
+            return None
+
+    @staticmethod
+    def build_title_index(config, titles):
+        """
+        Load every title into an in-memory search index. Without it, title filters fall
+        back to the LIKE query.
+        """
+        index = TitleSearchIndex(
+            min_similarity=config.get("title_search_min_similarity", 0.3),
+            max_fuzzy_tokens=config.get("title_search_max_fuzzy_tokens", 50)
         )
+        index.build(titles)
+        print(f"Title search index built: {index.stats()}")
+        return index
+
+    def on_games_changed(self, collection_name, data_objects):
+        """Keep the title indexes and caches in step with writes made through the data service."""
+        if collection_name != self.collection:
+            return
+        self.catalog_version.invalidate()
+        self.genre_counts_cache.clear()
+        # List pages depend on every game, so drop the lot; the catalog rarely changes
+        if self.games_cache is not None:
+            self.games_cache.clear()
+        titles = [(data_object[self.key_field], data_object["title"]) for data_object in data_objects
+                  if "title" in data_object and data_object.get(self.key_field) is not None]
+        if len(titles) == 1:
+            self.prefix_index.add(*titles[0])
+        elif titles:
+            self.prefix_index.add_many(titles)
+        # In snapshot mode title hits must stay those of the snapshot its ETags name;
+        # the next refresh brings the write in. Writes by other workers arrive through
+        # index_refresher.
+        if self.title_index is not None and self.catalog is None:
+            for game_id, title in titles:
+                self.title_index.add(game_id, title)
+
+    def suggest(self, prefix: str, limit: int = 10) -> GameSuggestions:
+        """Type-ahead: titles starting with prefix, answered from memory without touching the database."""
+        suggestions = [
+            GameSuggestion(gameId=game_id, title=title, links={"self": {"href": f"/games/{game_id}"}})
+            for game_id, title in self.prefix_index.suggest(prefix, limit)
+        ]
+        return GameSuggestions(prefix=prefix, suggestions=suggestions)
+
+    async def has_item(self, key: str) -> bool:
+        """
+        Whether the game exists, without building it: a cached response or the snapshot
+        answer from memory, otherwise an id-only lookup. Lets a conditional GET tell a 404
+        from a 304 before paying for the record.
+        """
+        version = await self.catalog_version.current()
+        if self.games_cache is not None and self.games_cache.get((version.tag, "item", key)) is not None:
+            return True
+        catalog = self.catalog
+        if catalog is not None:
+            return catalog.get(key) is not None
+        return await self.async_data_service.run(self.data_service.has_game, key)
+
+    async def get_item(self, key: str) -> Game:
+        # Entries are keyed by the catalog version, so a write made by another worker
+        # retires them as soon as this process sees the new version
+        version = await self.catalog_version.current()
+        cache_key = (version.tag, "item", key)
+        if self.games_cache is not None:
+            cached = self.games_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        catalog = self.catalog
+        if catalog is not None:
+            record = catalog.get(key)
+        else:
+            d_service = self.async_data_service
+
+            record = await d_service.get_data_object(
+                self.database, self.collection, key_field=self.key_field, key_value=key
+            )
+        if record is None:
+            return None
         result = self.populate_game_model(record)
 
+        if self.games_cache is not None:
+            self.games_cache.set(cache_key, result)
         return result
 
-    def get_list(self, title:str, game_id:str, page:int, page_size:int, genre: str = None) -> Games:
-        d_service = self.data_service
+    async def get_list(self, title:str, game_id:str, page:int, page_size:int, genre: str = None,
+                       cursor: str = None, genre_match: str = "any") -> Games:
+        # Normalized so equivalent requests share an entry: page is ignored with a cursor,
+        # genre_match only matters for several genres
+        genre_match = genre_match if genre and "," in genre else None
+        version = await self.catalog_version.current()
+        cache_key = (version.tag, "list", title, game_id, None if cursor else page, page_size, genre, genre_match, cursor)
+        if self.games_cache is not None:
+            cached = self.games_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        games_result = await self._get_list(title, game_id, page, page_size, genre, cursor, genre_match or "any")
+
+        if self.games_cache is not None:
+            self.games_cache.set(cache_key, games_result)
+        return games_result
+
+    async def _get_list(self, title, game_id, page, page_size, genre, cursor, genre_match) -> Games:
+        d_service = self.async_data_service
+        filters = {"title": title, "game_id": game_id, "genre": genre,
+                   "genre_match": genre_match if genre and "," in genre else None}
+
+        catalog = self.catalog
+        if catalog is not None:
+            return self.list_from_catalog(catalog, title, game_id, page, page_size, genre, genre_match, cursor,
+                                          filters)
+
+        if title and self.title_index is not None:
+            return await self.search_titles(title, game_id, page, page_size, genre, genre_match, cursor, filters)
 
-        records, has_next_page = d_service.get_game_records(title, game_id, page, page_size, genre)
+        records, has_next_page = await d_service.run(
+            self.data_service.get_game_records, title, game_id, page, page_size, genre, cursor, genre_match
+        )
 
-        games_result = self.populate_games_response_model(records, page, page_size, has_next_page)
+        games_result = self.populate_games_response_model(records, page, page_size, has_next_page, cursor, filters)
 
         return games_result
 
+    def list_from_catalog(self, catalog, title, game_id, page, page_size, genre, genre_match, cursor,
+                          filters) -> Games:
+        """
+        Answer /games from the catalog snapshot without touching the database. Title
+        filters still rank through the search index when there is one.
+        """
+        genres = normalize_genres(genre)
+
+        if title and self.title_index is not None:
+            offset = decode_cursor(cursor, "offset")["offset"] if cursor else (page - 1) * page_size
+            mask = catalog.select(game_id=game_id, genres=genres, genre_match=genre_match)
+            game_ids = [hit for hit in self.title_index.search(title) if catalog.contains(mask, hit)]
+            records = catalog.records_for(game_ids[offset:offset + page_size])
+            has_next_page = len(game_ids) > offset + page_size
+            return self.populate_games_response_model(records, page, page_size, has_next_page, cursor, filters,
+                                                      next_cursor=encode_cursor({"offset": offset + page_size}))
+
+        mask = catalog.select(title=title, game_id=game_id, genres=genres, genre_match=genre_match)
+        if cursor:
+            records, has_next_page = catalog.page(mask, page_size, after_id=decode_cursor(cursor, "gameId")["gameId"])
+        else:
+            records, has_next_page = catalog.page(mask, page_size, offset=(page - 1) * page_size)
+        return self.populate_games_response_model(records, page, page_size, has_next_page, cursor, filters)
+
+    async def get_genre_counts(self) -> GenreCounts:
+        """
+        Facet counts per genre. Served from a cache keyed by the catalog version, which
+        every game_info write bumps, so browsing costs no GROUP BY.
+        """
+        if self.catalog is not None:
+            return GenreCounts(**self.catalog.genre_counts())
+        version = await self.catalog_version.current()
+        counts = self.genre_counts_cache.get(version.tag)
+        if counts is None:
+            counts = await self.async_data_service.run(self.data_service.get_genre_counts)
+            self.genre_counts_cache.set(version.tag, counts)
+        return GenreCounts(**counts)
+
+    async def search_titles(self, title, game_id, page, page_size, genre, genre_match, cursor, filters) -> Games:
+        """
+        Answer a title filter from the search index: games come back ranked by relevance,
+        and only the ids on the requested page are read from the database. Cursors carry
+        the offset into the ranked hits.
+        """
+        offset = decode_cursor(cursor, "offset")["offset"] if cursor else (page - 1) * page_size
+
+        game_ids = self.title_index.search(title)
+        if game_id:
+            game_ids = [hit for hit in game_ids if hit == game_id]
+
+        if genre:
+            # Narrow the hits by id alone, keeping their rank, so offsets stay stable and
+            # only the requested page is loaded
+            in_genre = await self.async_data_service.run(
+                self.data_service.get_game_ids_by_genre, genre, genre_match
+            )
+            game_ids = [hit for hit in game_ids if hit in in_genre]
+
+        has_next_page = len(game_ids) > offset + page_size
+        records = await self.async_data_service.run(
+            self.data_service.get_game_records_by_ids, game_ids[offset:offset + page_size]
+        )
+
+        next_cursor = encode_cursor({"offset": offset + page_size})
+        return self.populate_games_response_model(records, page, page_size, has_next_page, cursor, filters,
+                                                  next_cursor=next_cursor)
+
     @staticmethod
     def populate_game_model(record):
         return Game(
@@ -52,9 +391,11 @@ class GamesResource(BaseResource):
         )
 
     @staticmethod
-    def populate_games_response_model(records, page, page_size, has_next_page):
+    def populate_games_response_model(records, page, page_size, has_next_page, cursor=None, filters=None,
+                                      next_cursor=None):
 
         game_models = []
+        filters = filters or {}
 
         # Convert the records to Game objects
         for row in records:
@@ -70,15 +411,22 @@ class GamesResource(BaseResource):
             )
             game_models.append(game_model)
 
+        # Unless the caller supplies one (title search), the next link carries a keyset cursor,
+        # so following it never costs an OFFSET scan
+        if next_cursor is None and game_models:
+            next_cursor = encode_cursor({"gameId": game_models[-1].gameId})
+
         # Create response including pagination links
         response = Games(
             games=game_models,
             links={
-                "self": {"href": f"/games?page={page}&page_size={page_size}"},
-                "next": {"href": f"/games?page={page + 1}&page_size={page_size}"} if has_next_page else None,
-                "prev": {"href": f"/games?page={page - 1}&page_size={page_size}"} if page > 1 else None
+                "self": {"href": build_href("/games", page=None if cursor else page, page_size=page_size,
+                                            cursor=cursor, **filters)},
+                "next": {"href": build_href("/games", page_size=page_size, cursor=next_cursor, **filters)}
+                if has_next_page else None,
+                "prev": {"href": build_href("/games", page=page - 1, page_size=page_size, **filters)}
+                if page > 1 and not cursor else None
             }
         )
 
         return response
-
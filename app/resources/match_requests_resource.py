@@ -1,5 +1,6 @@
 import asyncio
 import uuid
+from datetime import date, datetime
 from framework.resources.base_resource import BaseResource
 from app.models.match_making_status import MatchMakingStatus
 from app.models.match_request_initiate import MatchRequestInitiate
@@ -8,7 +9,20 @@ from app.models.match_request import MatchRequest, MatchRequests, MatchRequestWi
 from app.resources.favourites_resource import FavouritesResource
 
 from framework.exceptions.match_exceptions import MatchNotFoundException,MatchNotValidException
+from framework.exceptions.match_exceptions import TooManyMatchRequestsException, MatchmakingOverloadedException
+from framework.exceptions.match_exceptions import MatchAlreadyMatchedException
 from app.services.service_factory import ServiceFactory
+from app.services.Matchmaking.MatchmakingBackend import MatchmakingBackend
+from app.services.Matchmaking.NotificationHub import NotificationHub
+from app.services.Matchmaking.StatusPoller import StatusPoller
+from app.services.Matchmaking.MatchmakingScheduler import MatchmakingScheduler
+from app.services.Matchmaking.MatchmakingRecovery import MatchmakingRecovery
+from app.services.Matchmaking.ExpirySweeper import ExpirySweeper
+from app.services.Matchmaking.MatchmakingShards import MatchmakingShards
+from app.services.Matchmaking.AdmissionController import AdmissionController
+from framework.services.DataAccess.ExecutorDataService import ExecutorDataService
+from framework.utils.pagination import encode_cursor, build_href
+from framework.utils.ttl_cache import TTLCache
 
 
 class MatchRequestsResource(BaseResource):
@@ -26,67 +40,202 @@ class MatchRequestsResource(BaseResource):
         self.key_field = "matchRequestId"
 
         self.data_service.initialize(self.database)
+        self.async_data_service = ExecutorDataService(self.data_service)
+
+        config = config or {}
+        # Claims, batch passes and the waiting-request snapshot; shard workers build the same
+        self.matchmaking_backend = MatchmakingBackend(self.data_service, self.async_data_service, config)
+        self.matchmaking_engine = self.matchmaking_backend.new_engine()
+        self.notification_hub = NotificationHub()
+
+        # One shared poll catches status changes other workers make to requests clients wait on here
+        self.status_poller = StatusPoller(
+            self.notification_hub, self.find_settled, self.refresh_status,
+            interval=config.get("status_recheck_interval", 5)
+        )
 
-    def get_item(self, key: str) -> MatchRequestWithLinks:
-        d_service = self.data_service
+        self.matchmaking_scheduler = MatchmakingScheduler(
+            self.matchmaking_backend.match_batch, self.on_batch_matched,
+            interval=config.get("tick_interval", 2),
+            max_batch_size=config.get("max_batch_size", 1000),
+            matcher_factory=self.matchmaking_backend.new_skill_matcher,
+            party_size=self.matchmaking_backend.party_size
+        )
+        self.matchmaking_recovery = MatchmakingRecovery(
+            self.matchmaking_engine, self.matchmaking_backend.load_active_requests,
+            interval=config.get("checkpoint_interval", 30)
+        )
+        self.expiry_sweeper = ExpirySweeper(
+            self.expire_batch, self.on_expired,
+            interval=config.get("expiry_sweep_interval", 60),
+            batch_size=config.get("expiry_batch_size", 500)
+        )
+        # Status polls are answered from here; every status change this process makes is
+        # written through. "matching" entries get a short TTL, since another worker may
+        # match the request without this process hearing about it.
+        self.status_cache = TTLCache(
+            max_size=config.get("status_cache_size", 100000),
+            ttl=config.get("status_cache_ttl", 300)
+        )
+        self.status_cache_pending_ttl = config.get("status_cache_pending_ttl", 2)
 
-        record = d_service.get_data_object(
+        self.admission_controller = AdmissionController(
+            max_concurrent=config.get("max_concurrent", 64),
+            max_queued=config.get("max_queued", 256),
+            retry_after=config.get("retry_after", 1)
+        )
+        # Active requests a user may have at once, counted in the database
+        self.max_per_user = config.get("max_per_user", 3)
+        # With shard_workers > 0, arrivals are matched in worker processes partitioned by
+        # gameId instead of by this process's engine
+        self.matchmaking_shards = MatchmakingShards(
+            config["shard_workers"], config, self.on_shard_matched
+        ) if config.get("shard_workers") else None
+
+    async def get_item(self, key: str) -> MatchRequestWithLinks:
+        d_service = self.async_data_service
+
+        record = await d_service.get_data_object(
             self.database, self.match_request_table, key_field=self.key_field, key_value=key
         )
         result = self.populate_match_request_model(record)
 
         return result
 
-    def get_list(self, userid: str, game_id: str, page: int, page_size: int) -> MatchRequests:
-        d_service = self.data_service
+    async def get_list(self, userid: str, game_id: str, page: int, page_size: int, cursor: str = None) -> MatchRequests:
+        d_service = self.async_data_service
 
-        records = d_service.get_match_requests_records(userid, game_id, page, page_size)
+        records, has_next_page = await d_service.run(
+            self.data_service.get_match_requests_records, userid, game_id, page, page_size, cursor
+        )
 
-        match_requests_result = self.populate_match_requests_response_model(records, page, page_size)
+        filters = {"user_id": userid, "game_id": game_id}
+        match_requests_result = self.populate_match_requests_response_model(
+            records, page, page_size, has_next_page, cursor, filters
+        )
 
         return match_requests_result
 
-    def create_match_request(self, match_request: MatchRequest) -> MatchRequest:
+    async def create_match_request(self, match_request: MatchRequest) -> MatchRequest:
 
         match_request_id = str(uuid.uuid4())
         match_request.matchRequestId = match_request_id
 
-        d_service = self.data_service
-        is_successful = d_service.insert_data_object(self.database, self.match_request_table, match_request.dict())
+        d_service = self.async_data_service
+        is_successful = await d_service.insert_data_object(self.database, self.match_request_table, match_request.dict())
 
         return match_request if is_successful else None
 
-    def initiate_match_process(self, match_request_initiate: MatchRequestInitiate):
+    async def initiate_match_process(self, match_request_initiate: MatchRequestInitiate):
 
         try:
             match_request_id = match_request_initiate.MatchRequestId
 
-            d_service = self.data_service
+            d_service = self.async_data_service
             # Fetch the match request from the DB
-            match_request = d_service.get_data_object(self.database, self.match_request_table, self.key_field, match_request_id)
+            match_request = await d_service.get_data_object(self.database, self.match_request_table, self.key_field, match_request_id)
 
             if not match_request:
                 raise MatchNotFoundException("Match request not found.")
             if match_request.get("isActive"):
                 raise MatchNotValidException("Match request is already active.")
 
-            # Update the match request to set it as active
-            match_request["isActive"] = True
-
-            # Use the new update_data_object method
-            update_successful = d_service.update_data_object(self.database, self.match_request_table, self.key_field, match_request_id, match_request)
-
-            if not update_successful:
-                raise Exception("Failed to update match request.")
+            user_id = match_request["userId"]
+            if await d_service.run(self.data_service.count_active_match_requests, user_id) >= self.max_per_user:
+                raise self.too_many_requests()
+
+            # Reserve matchmaking capacity before activating, so a rejected request stays
+            # inactive and can simply be retried. process_matchmaking gives it back.
+            self.admission_controller.admit(match_request_id)
+
+            # Conditionally flip the request to active, so concurrent initiations (or an
+            # initiation racing a match) cannot both succeed, nor push the user over the cap
+            try:
+                activated = await d_service.run(
+                    self.data_service.activate_match_request, match_request_id, user_id, self.max_per_user
+                )
+            except Exception:
+                self.admission_controller.release(match_request_id)
+                raise
+
+            if not activated:
+                self.admission_controller.release(match_request_id)
+                if await d_service.run(self.data_service.count_active_match_requests, user_id) >= self.max_per_user:
+                    raise self.too_many_requests()
+                raise MatchNotValidException("Match request is already active, matched or cancelled.")
+
+            self.cache_status(MatchMakingStatus(matchRequestId=match_request_id, status="matching"))
 
             return match_request["matchRequestId"]
 
+        except (MatchNotFoundException, MatchNotValidException,
+                TooManyMatchRequestsException, MatchmakingOverloadedException):
+            raise
         except Exception as e:
             raise Exception(e)
 
-    def get_match_status(self, match_request_id) -> MatchMakingStatus:
-        d_service = self.data_service
-        match_request = d_service.get_data_object(self.database, self.match_request_table, self.key_field, match_request_id)
+    def too_many_requests(self):
+        return TooManyMatchRequestsException(
+            f"At most {self.max_per_user} match requests may be active at once.",
+            self.admission_controller.retry_after
+        )
+
+    async def cancel_match_request(self, match_request_id) -> MatchMakingStatus:
+        """
+        Cancel a request that has not been matched yet: mark it cancelled in the database,
+        drop it from the matchmaking queues and wake anyone waiting on its status.
+        Cancelling an already cancelled request succeeds again.
+
+        :raises MatchNotFoundException: The request does not exist.
+        :raises MatchAlreadyMatchedException: The request was matched before it could be cancelled.
+        """
+        d_service = self.async_data_service
+        cancelled = await d_service.run(self.data_service.cancel_match_request, match_request_id)
+
+        if not cancelled:
+            status = await self.get_match_status(match_request_id, refresh=True)
+            if status.status == "cancelled":
+                return status
+            if status.status == "matched":
+                raise MatchAlreadyMatchedException("Match request has already been matched.")
+            raise MatchNotFoundException("Match request not found.")
+
+        status = MatchMakingStatus(matchRequestId=match_request_id, status="cancelled")
+        self.remove_queued(match_request_id)
+        self.publish_status(status)
+        return status
+
+    async def get_match_status(self, match_request_id, refresh=False) -> MatchMakingStatus:
+        """
+        Return the match status from the status cache, loading it from the database on a
+        miss (or always, with refresh).
+        """
+        if not refresh:
+            status = self.status_cache.get(match_request_id)
+            if status is not None:
+                return status
+
+        status = await self.load_match_status(match_request_id)
+        self.cache_status(status)
+        return status
+
+    def cache_status(self, status):
+        if status.status == "matching":
+            self.status_cache.set(status.matchRequestId, status, ttl=self.status_cache_pending_ttl)
+        elif status.status in ("matched", "cancelled", "expired"):
+            self.status_cache.set(status.matchRequestId, status)
+        else:
+            # not_found may be created later; errors are not worth keeping
+            self.status_cache.pop(status.matchRequestId)
+
+    def publish_status(self, status):
+        """Write a status change through to the cache and wake anyone waiting on it."""
+        self.cache_status(status)
+        self.notification_hub.publish(status.matchRequestId, status)
+
+    async def load_match_status(self, match_request_id) -> MatchMakingStatus:
+        d_service = self.async_data_service
+        match_request = await d_service.get_data_object(self.database, self.match_request_table, self.key_field, match_request_id)
 
         if not match_request:
             return MatchMakingStatus(
@@ -100,14 +249,28 @@ class MatchRequestsResource(BaseResource):
                 status="matching"
             )
 
-        # Check if there is a matched request in the matched_requests table
-        matched_request = d_service.get_data_object(self.database, self.matched_request_table, "matchRequestId1", match_request_id)
+        # Check whether the request was matched, as a pair or as part of a lobby
+        group = await d_service.run(self.data_service.get_match_group, match_request_id)
 
-        if matched_request:
+        if group:
+            partner_request_ids = [member_id for member_id in group if member_id != match_request_id]
             return MatchMakingStatus(
                 matchRequestId=match_request_id,
                 status="matched",
-                partnerRequestId=matched_request["matchRequestId2"]
+                partnerRequestId=partner_request_ids[0],
+                partnerRequestIds=partner_request_ids
+            )
+
+        if match_request.get("isCancelled"):
+            return MatchMakingStatus(
+                matchRequestId=match_request_id,
+                status="cancelled"
+            )
+
+        if self.is_expired(match_request):
+            return MatchMakingStatus(
+                matchRequestId=match_request_id,
+                status="expired"
             )
 
         # If no match is found, return the appropriate status
@@ -117,6 +280,54 @@ class MatchRequestsResource(BaseResource):
         )
 
 
+    async def wait_for_match_status(self, match_request_id, timeout) -> MatchMakingStatus:
+        """
+        Return the match status, parking for up to timeout seconds while it is still
+        "matching". Wakes as soon as a change is published, whether made by this process
+        or picked up from another worker by the status poller.
+        """
+        hub = self.notification_hub
+
+        # Subscribe before the first read so a change made while reading is not lost
+        future = hub.subscribe(match_request_id)
+        try:
+            status = await self.get_match_status(match_request_id)
+            if status.status != "matching":
+                return status
+            await asyncio.wait({future}, timeout=timeout)
+            if future.done():
+                return future.result()
+            return await self.get_match_status(match_request_id)
+        finally:
+            hub.unsubscribe(match_request_id, future)
+
+    async def find_settled(self, match_request_ids):
+        return await self.async_data_service.run(self.data_service.get_settled_match_requests, match_request_ids)
+
+    async def refresh_status(self, match_request_id):
+        """Reload a request's status from the database and publish it if it has changed."""
+        status = await self.get_match_status(match_request_id, refresh=True)
+        if status.status != "matching":
+            self.publish_status(status)
+
+    def publish_match(self, group):
+        """Push the "matched" status to anyone waiting on a member of a new match or lobby."""
+        for request in group:
+            partner_request_ids = [member["matchRequestId"] for member in group if member is not request]
+            self.publish_status(MatchMakingStatus(
+                matchRequestId=request["matchRequestId"],
+                status="matched",
+                partnerRequestId=partner_request_ids[0],
+                partnerRequestIds=partner_request_ids
+            ))
+
+    @staticmethod
+    def is_expired(record):
+        expire_date = record['expireDate']
+        if type(expire_date) == str:
+            expire_date = datetime.strptime(expire_date, "%Y-%m-%d").date()
+        return expire_date < date.today()
+
     @staticmethod
     def populate_match_request_model(record):
         return MatchRequestWithLinks(
@@ -126,14 +337,18 @@ class MatchRequestsResource(BaseResource):
                 expireDate=record['expireDate'] if type(record['expireDate']) == str else record['expireDate'].strftime("%Y-%m-%d"),
                 isActive=record['isActive'],
                 isCancelled=record['isCancelled'],
+                skillRating=record.get('skillRating'),
+                region=record.get('region'),
+                language=record.get('language'),
                 links={
                     "self": {"href": f"/match-requests/{record['matchRequestId']}"}
                 }
         )
 
     @staticmethod
-    def populate_match_requests_response_model(records, page, page_size):
+    def populate_match_requests_response_model(records, page, page_size, has_next_page=True, cursor=None, filters=None):
         match_request_models = []
+        filters = filters or {}
         # Convert the records to MatchRequest objects
         for row in records:
             date = row['expireDate'] if type(row['expireDate']) == str else row['expireDate'].strftime("%Y-%m-%d")
@@ -144,90 +359,120 @@ class MatchRequestsResource(BaseResource):
                 expireDate=date,
                 isActive=row['isActive'],
                 isCancelled=row['isCancelled'],
+                skillRating=row.get('skillRating'),
+                region=row.get('region'),
+                language=row.get('language'),
                 links={
                     "self": {"href": f"/match-requests/{row['matchRequestId']}"}
                 }
             )
             match_request_models.append(match_request_model)
+        # The next link carries a keyset cursor for the last row on this page
+        next_cursor = encode_cursor({"matchRequestId": match_request_models[-1].matchRequestId}) \
+            if match_request_models else None
         # Create response including pagination links
         response = MatchRequests(
             matchRequests=match_request_models,
             links={
-                "self": {"href": f"/match-requests?page={page}&page_size={page_size}"},
-                "next": {"href": f"/match-requests?page={page + 1}&page_size={page_size}"},
-                "prev": {"href": f"/match-requests?page={page - 1}&page_size={page_size}"} if page > 1 else None
+                "self": {"href": build_href("/match-requests", page=None if cursor else page, page_size=page_size,
+                                            cursor=cursor, **filters)},
+                "next": {"href": build_href("/match-requests", page_size=page_size, cursor=next_cursor, **filters)}
+                if has_next_page and next_cursor else None,
+                "prev": {"href": build_href("/match-requests", page=page - 1, page_size=page_size, **filters)}
+                if page > 1 and not cursor else None
             }
         )
         return response
 
-    # TODO: Fix race condition, when there are two valid matches
-    # TODO: Move this to different file as helper
+    def on_batch_matched(self, groups):
+        """Drop groups made by the scheduler from the engine's queues and notify waiting clients."""
+        for group in groups:
+            for request in group:
+                self.remove_queued(request["matchRequestId"])
+            self.publish_match(group)
+
+    def on_shard_matched(self, groups):
+        """Notify waiting clients of matches made by the shard workers."""
+        for group in groups:
+            self.publish_match(group)
+
+    def remove_queued(self, match_request_id):
+        """Drop a request from whichever matchmaking queue holds it."""
+        self.matchmaking_engine.remove(match_request_id)
+        if self.matchmaking_shards is not None:
+            self.matchmaking_shards.remove(match_request_id)
+
+    async def start_matchmaking(self):
+        """
+        Start the background matchmaking work; called from the app lifespan. Requests left
+        active by a previous process are re-queued first, so the first scheduler tick
+        already sees them.
+        """
+        if self.matchmaking_shards is not None:
+            # Each shard recovers its own partition of the waiting requests
+            self.matchmaking_shards.start()
+        else:
+            await self.matchmaking_recovery.recover()
+        self.matchmaking_scheduler.start()
+        self.expiry_sweeper.start()
+        self.status_poller.start(delay=self.status_poller.interval)
+
+    async def stop_matchmaking(self):
+        await self.status_poller.stop()
+        await self.expiry_sweeper.stop()
+        await self.matchmaking_scheduler.stop()
+        await self.matchmaking_recovery.stop()
+        if self.matchmaking_shards is not None:
+            await self.matchmaking_shards.stop()
+
+    async def expire_batch(self, batch_size):
+        return await self.async_data_service.run(self.data_service.expire_match_requests, batch_size)
+
+    def on_expired(self, match_request_ids):
+        """Cancel queued matchmaking for expired requests and tell anyone waiting on them."""
+        for match_request_id in match_request_ids:
+            self.remove_queued(match_request_id)
+            self.publish_status(MatchMakingStatus(
+                matchRequestId=match_request_id,
+                status="expired"
+            ))
+
     async def process_matchmaking(self, match_request_id):
         """
         Process matchmaking for the given match request ID.
-        This function will look for other active match requests for the same game
-        and pair them together if a match is found.
+        The request is handed to the in-memory matchmaking engine, which matches it
+        immediately if enough other users are already waiting for the same game to fill
+        its party size, and otherwise keeps it queued until they arrive.
+        Runs in a processing slot; the admission reserved by initiate_match_process is
+        given back once the request has been handed over, matched or not.
         """
+        async with self.admission_controller.running(match_request_id):
+            await self._process_matchmaking(match_request_id)
+
+    async def _process_matchmaking(self, match_request_id):
         try:
-            d_service = self.data_service
+            d_service = self.async_data_service
 
             # Fetch the match request from the DB to get the game information
-            match_request = d_service.get_data_object(self.database, self.match_request_table, self.key_field, match_request_id)
+            match_request = await d_service.get_data_object(self.database, self.match_request_table, self.key_field, match_request_id)
 
             if not match_request or not match_request.get("isActive"):
                 print(f"No active match request found for ID: {match_request_id}. Exiting matchmaking process.")
                 return
 
-            game_id = match_request["gameId"]
-            user_id = match_request["userId"]
+            if self.matchmaking_shards is not None:
+                # The owning shard matches it and reports back through on_shard_matched
+                self.matchmaking_shards.submit(match_request)
+                return
+
+            partner_requests = await self.matchmaking_engine.submit(match_request)
 
-            while True:
-                await asyncio.sleep(5)  # Check for matches every 5 seconds
-
-                # Fetch all active match requests for the same game
-                active_matches = d_service.get_all_data_objects(self.database, self.match_request_table, 0, 100)  # Adjust limit as needed
-                print(active_matches)
-                matched_requests = [
-                    req for req in active_matches
-                    if (req["gameId"] == game_id and
-                        req["matchRequestId"] != match_request_id and
-                        req.get("isActive") and
-                        req["userId"] != user_id)  # Ensure user IDs are not the same
-                ]
-                print(matched_requests)
-
-                if matched_requests:
-                    # Pair the current match request with the first matching request found
-                    partner_request = matched_requests[0]
-                    partner_request_id = partner_request["matchRequestId"]
-
-                    # Create a new entry in the matched database
-                    matched_data = {
-                        "matchRequestId1": match_request_id,
-                        "matchRequestId2": partner_request_id,
-                        "gameId": game_id,
-                        "status": "matched"
-                    }
-                    print(matched_data)
-
-                    # Insert the matched data into the database
-                    res = d_service.insert_data_object(self.database, self.matched_request_table, matched_data)
-
-                    if res:
-                        print(f"Match found! {match_request_id} matched with {partner_request_id}")
-
-                        # Update both match requests to set them as not active
-                        match_request["isActive"] = False
-                        partner_request["isActive"] = False
-                        d_service.update_data_object(self.database, self.match_request_table, self.key_field, match_request_id, match_request)
-                        d_service.update_data_object(self.database, self.match_request_table, self.key_field, partner_request_id, partner_request)
-
-                        break  # Exit the while loop after a successful match
-                else:
-                    print(f"No match found for {match_request_id}. Continuing to search...")
+            if partner_requests:
+                print(f"Match found! {match_request_id} matched with "
+                      f"{', '.join(partner['matchRequestId'] for partner in partner_requests)}")
+                self.publish_match([match_request] + partner_requests)
+            else:
+                print(f"No match found for {match_request_id}. Queued until enough partners arrive.")
 
         except Exception as e:
             print(f"Error during matchmaking process for {match_request_id}: {str(e)}")
-
-
-
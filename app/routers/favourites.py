@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from typing import Optional
 from app.models.favourite import Favourite, Favourites
 from app.services.service_factory import ServiceFactory
+from framework.exceptions.pagination_exceptions import InvalidCursorException
+from framework.utils.http_caching import cache_headers, is_not_modified, make_etag
 
 router = APIRouter()
 
@@ -11,7 +13,7 @@ async def add_favourite(favourite: Favourite):
     try:
 
         res = ServiceFactory.get_service("FavouritesResource")
-        record = res.add_to_favourite(favourite)
+        record = await res.add_to_favourite(favourite)
 
         if not record:
             raise HTTPException(status_code=500, detail="Failed to create match request in the database.")
@@ -31,14 +33,32 @@ async def add_favourite(favourite: Favourite):
 
 @router.get("/favourites/{user_id}", response_model=Favourites)
 async def get_favourites(user_id: str,
+                         request: Request,
+                         response: Response,
                          page: int = Query(1, ge=1),
-                         page_size: int = Query(10, ge=1),):
+                         page_size: int = Query(10, ge=1),
+                         cursor: Optional[str] = None):
     try:
         res = ServiceFactory.get_service("FavouritesResource")
-        favourites = res.get_list(user_id, page, page_size)
 
+        # The list embeds game details, so it changes with the catalog as well as the favourites
+        favourites_version = await res.favourites_version(user_id).current()
+        catalog_version = await ServiceFactory.get_service("GamesResource").catalog_version.current()
+        last_modified = max((version.last_modified for version in (favourites_version, catalog_version)
+                             if version.last_modified is not None), default=None)
+        etag = make_etag(favourites_version.tag, catalog_version.tag, user_id, page, page_size, cursor)
+        headers = cache_headers(etag, last_modified, res.cache_control)
+        if is_not_modified(request.headers, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+
+        favourites = await res.get_list(user_id, page, page_size, cursor)
+
+        response.headers.update(headers)
         return favourites
 
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail="An error occurred while fetching favourites from DB.")
\ No newline at end of file
@@ -1,37 +1,84 @@
-from fastapi import APIRouter, Query, HTTPException
-from typing import Optional
-from app.models.game import Game, Games
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from typing import Literal, Optional
+from app.models.game import Game, Games, GameSuggestions, GenreCounts
 from app.services.service_factory import ServiceFactory
+from framework.exceptions.pagination_exceptions import InvalidCursorException
+from framework.utils.http_caching import cache_headers, is_not_modified, make_etag
 
 router = APIRouter()
 
-res = ServiceFactory.get_service("GamesResource")
+# Declared before /games/{game_id} so "suggest" and "genres" are not taken for game ids
+@router.get("/games/genres", response_model=GenreCounts)
+async def get_genre_counts():
+    """
+    Number of games per genre, in the "other" bucket, and in total, for facet counts.
+    """
+    try:
+        res = ServiceFactory.get_service("GamesResource")
+        return await res.get_genre_counts()
+
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail="An error occurred while counting genres.")
+
+
+@router.get("/games/suggest", response_model=GameSuggestions)
+async def suggest_games(prefix: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """
+    Type-ahead for game titles: up to limit games whose title, or a word in it, starts
+    with prefix. Served from memory, so it is cheap enough to call on every keystroke.
+    """
+    try:
+        res = ServiceFactory.get_service("GamesResource")
+        return res.suggest(prefix, limit)
+
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail="An error occurred while fetching suggestions.")
+
 
 @router.get("/games/{game_id}", response_model=Game)
-async def get_game(game_id: str):
+async def get_game(game_id: str, request: Request, response: Response):
     try:
-        record = res.get_item(game_id)
+        res = ServiceFactory.get_service("GamesResource")
+
+        # A game that is gone must get its 404 rather than a 304 for the validator it was
+        # last served with; checking costs an id lookup, not the record
+        if not await res.has_item(game_id):
+            raise HTTPException(status_code=404, detail="Game not found")
+
+        version = await res.catalog_version.current()
+        headers = cache_headers(make_etag(version.tag, game_id), version.last_modified, res.item_cache_control)
+        if is_not_modified(request.headers, headers["ETag"], version.last_modified):
+            return Response(status_code=304, headers=headers)
 
+        # Served from the games cache or the snapshot when it is warm
+        record = await res.get_item(game_id)
         if not record:
             raise HTTPException(status_code=404, detail="Game not found")
 
         print(f"Fetched Game with game_id {game_id}: {record}")
+        response.headers.update(headers)
         return record
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail="An error occurred while fetching the game.")
 
-# TODO: Fix genre population logic
-# TODO: Add logic to filter based on genre
-
 @router.get("/games", response_model=Games)
 async def get_games(
+        request: Request,
+        response: Response,
         page: int = Query(1, ge=1),
         page_size: int = Query(10, ge=1),
         title: Optional[str] = None,
         game_id: Optional[str] = None,
-        genre: Optional[str] = None):
+        genre: Optional[str] = None,
+        genre_match: Literal["any", "all"] = "any",
+        cursor: Optional[str] = None):
     """
     Retrieve all games from the database.
     1) HATEOAS is implemented
@@ -40,11 +87,29 @@ async def get_games(
     - 200 for OK
     3) Added Pagination logic
     4) Added filtering logic using query param for title
+    5) Added keyset pagination: pass the cursor from the next link instead of a page number
+    6) Title filters are answered by an in-memory search index, ranked by relevance and typo tolerant
+    7) genre takes comma-separated genres ("other" for games in none of the main ones);
+       genre_match=any returns games in one of them, genre_match=all games in every one
+    8) Conditional GET: responses carry an ETag and Last-Modified derived from the catalog
+       version, and a matching If-None-Match (or If-Modified-Since) gets a 304
     """
     try:
-        records = res.get_list(title, game_id, page, page_size, genre)
+        res = ServiceFactory.get_service("GamesResource")
+
+        version = await res.catalog_version.current()
+        etag = make_etag(version.tag, page, page_size, title, game_id, genre, genre_match, cursor)
+        headers = cache_headers(etag, version.last_modified, res.list_cache_control)
+        if is_not_modified(request.headers, etag, version.last_modified):
+            return Response(status_code=304, headers=headers)
+
+        records = await res.get_list(title, game_id, page, page_size, genre, cursor, genre_match)
+        response.headers.update(headers)
         return records
 
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail="An error occurred while fetching games from DB.")
\ No newline at end of file
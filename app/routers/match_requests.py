@@ -1,21 +1,28 @@
+import asyncio
 import uuid
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional
 from app.models.match_request import MatchRequest, MatchRequests, MatchRequestWithLinks
 from app.models.match_request_initiate import MatchRequestInitiate
 from app.models.match_making_status import MatchMakingStatus
 from app.services.service_factory import ServiceFactory
 from framework.exceptions.match_exceptions import MatchNotValidException, MatchNotFoundException
+from framework.exceptions.match_exceptions import TooManyMatchRequestsException, MatchmakingOverloadedException
+from framework.exceptions.match_exceptions import MatchAlreadyMatchedException
+from framework.exceptions.pagination_exceptions import InvalidCursorException
 
 router = APIRouter()
-res = ServiceFactory.get_service("MatchRequestsResource")
+
+SSE_KEEPALIVE_INTERVAL = 15
+WEBSOCKET_MAX_WAIT = 3600
 
 @router.get("/match-requests/{match_request_id}", response_model=MatchRequestWithLinks)
 async def get_match_request(match_request_id: str):
     try:
+        res = ServiceFactory.get_service("MatchRequestsResource")
         print(f"Fetching Match Request with match_request_id {match_request_id}")
-        record = res.get_item(match_request_id)
+        record = await res.get_item(match_request_id)
 
         if not record:
             raise HTTPException(status_code=404, detail="match_request_id not found")
@@ -33,7 +40,8 @@ async def get_match_requests(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
     user_id: Optional[str] = None,
-    game_id: Optional[str] = None):
+    game_id: Optional[str] = None,
+    cursor: Optional[str] = None):
     """
     Retrieve all match requests from the database.
     1) HATEOAS is implemented
@@ -44,12 +52,17 @@ async def get_match_requests(
     - 200 for OK
     3) Added Pagination logic
     4) Added filtering logic using query params for userId and gameId
+    5) Added keyset pagination: pass the cursor from the next link instead of a page number
     """
     try:
-        records = res.get_list(user_id, game_id, page, page_size)
+        res = ServiceFactory.get_service("MatchRequestsResource")
+        records = await res.get_list(user_id, game_id, page, page_size, cursor)
 
         return records
 
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail="An error occurred while fetching games from DB.")
@@ -60,7 +73,8 @@ async def get_match_requests(
 @router.post("/match-requests", response_model=MatchRequest, status_code=201)
 async def create_match_request(match_request: MatchRequest):
     try:
-        record = res.create_match_request(match_request)
+        res = ServiceFactory.get_service("MatchRequestsResource")
+        record = await res.create_match_request(match_request)
 
         if not record:
             raise HTTPException(status_code=500, detail="Failed to create match request in the database.")
@@ -82,13 +96,34 @@ async def create_match_request(match_request: MatchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.delete("/match-requests/{match_request_id}", response_model=MatchMakingStatus)
+async def delete_match_request(match_request_id: str):
+    return await cancel_match_request(match_request_id)
+
+
+@router.post("/match-requests/{match_request_id}/cancel", response_model=MatchMakingStatus)
+async def cancel_match_request(match_request_id: str):
+    try:
+        res = ServiceFactory.get_service("MatchRequestsResource")
+        return await res.cancel_match_request(match_request_id)
+
+    except MatchNotFoundException:
+        raise HTTPException(status_code=404, detail="Match request not found.")
+
+    except MatchAlreadyMatchedException as e:
+        raise HTTPException(status_code=409, detail=e.message)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/match-requests/match", status_code=202)
 async def initiate_match(
     match_request_initiate: MatchRequestInitiate,
     background_tasks: BackgroundTasks ):
     try:
-
-        match_request_id = res.initiate_match_process(match_request_initiate)
+        res = ServiceFactory.get_service("MatchRequestsResource")
+        match_request_id = await res.initiate_match_process(match_request_initiate)
 
         background_tasks.add_task(res.process_matchmaking, match_request_id)
         # Return a 202 response with a polling URL
@@ -107,14 +142,27 @@ async def initiate_match(
     except MatchNotValidException:
         raise HTTPException(status_code=400, detail="Match request is already active.")
 
+    except TooManyMatchRequestsException as e:
+        raise HTTPException(status_code=429, detail=e.message, headers={"Retry-After": str(e.retry_after)})
+
+    except MatchmakingOverloadedException as e:
+        raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": str(e.retry_after)})
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/match/status/{match_request_id}", response_model=MatchMakingStatus)
-async def get_matchmaking_status(match_request_id: str):
+async def get_matchmaking_status(match_request_id: str,
+                                 wait: int = Query(0, ge=0, le=60)):
+    """
+    Return the matchmaking status. With wait > 0 this is a long poll: while the request
+    is still matching, the call is parked for up to wait seconds and returns as soon as
+    the status changes.
+    """
     try:
+        res = ServiceFactory.get_service("MatchRequestsResource")
         # Fetch the match request from the database to check its status
-        response = res.get_match_status(match_request_id)
+        response = await res.wait_for_match_status(match_request_id, wait)
 
         return response
 
@@ -123,4 +171,81 @@ async def get_matchmaking_status(match_request_id: str):
         return MatchMakingStatus(
             matchRequestId=match_request_id,
             status="error"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/match/status/{match_request_id}/events")
+async def stream_matchmaking_status(match_request_id: str,
+                                    wait: int = Query(300, ge=1, le=3600)):
+    """
+    Server-Sent Events stream: sends the current status, then parks until the status
+    changes (or wait seconds pass) and pushes the new status once before closing.
+    """
+    res = ServiceFactory.get_service("MatchRequestsResource")
+
+    async def events():
+        status = await res.get_match_status(match_request_id)
+        yield f"event: status\ndata: {status.json()}\n\n"
+        if status.status != "matching":
+            return
+
+        waiter = asyncio.create_task(res.wait_for_match_status(match_request_id, wait))
+        try:
+            while True:
+                done, _ = await asyncio.wait({waiter}, timeout=SSE_KEEPALIVE_INTERVAL)
+                if done:
+                    break
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+            status = waiter.result()
+            yield f"event: status\ndata: {status.json()}\n\n"
+        finally:
+            waiter.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@router.websocket("/match/status/{match_request_id}/ws")
+async def websocket_matchmaking_status(websocket: WebSocket, match_request_id: str):
+    """
+    WebSocket variant: sends the current status, then pushes the new status once when it
+    changes and closes the socket. A client that disconnects first stops the wait.
+    """
+    await websocket.accept()
+    try:
+        res = ServiceFactory.get_service("MatchRequestsResource")
+        status = await res.get_match_status(match_request_id)
+        await websocket.send_json(status.dict())
+        if status.status == "matching":
+            status = await wait_unless_disconnected(
+                websocket, res.wait_for_match_status(match_request_id, WEBSOCKET_MAX_WAIT)
+            )
+            if status is None:
+                return
+            await websocket.send_json(status.dict())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+async def wait_unless_disconnected(websocket: WebSocket, coroutine):
+    """
+    Await coroutine while watching the socket; messages from the client are ignored.
+
+    :return: The coroutine's result, or None if the client disconnected first (the wait is cancelled).
+    """
+    waiter = asyncio.create_task(coroutine)
+    receiver = None
+    try:
+        while True:
+            receiver = asyncio.create_task(websocket.receive())
+            done, _ = await asyncio.wait({waiter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if waiter in done:
+                return waiter.result()
+            if receiver.result()["type"] == "websocket.disconnect":
+                return None
+    finally:
+        waiter.cancel()
+        if receiver is not None:
+            receiver.cancel()
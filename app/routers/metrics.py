@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+from app.services.service_factory import ServiceFactory
+from framework.services.DataAccess.MySQLDataService import MySQLDataService
+
+router = APIRouter()
+
+
+@router.get("/metrics/db-pool")
+async def get_db_pool_metrics():
+    """
+    Connection pool counters for every MySQL pool opened by this process, plus the
+    SQLAlchemy engine pool used by the games data service.
+    """
+    stats = MySQLDataService.get_all_pool_stats()
+    games_data_service = ServiceFactory.get_service("GamesResourceDataService")
+    stats["games_engine"] = games_data_service.get_pool_stats().get("engine")
+    return stats
+
+
+@router.get("/metrics/matchmaking")
+async def get_matchmaking_metrics():
+    """
+    Queue depth and pairing counters of this process's matchmaking engine and scheduler.
+    """
+    res = ServiceFactory.get_service("MatchRequestsResource")
+    return {
+        "engine": res.matchmaking_engine.stats(),
+        "notifications": res.notification_hub.stats(),
+        "status_poller": res.status_poller.stats(),
+        "status_cache": res.status_cache.stats(),
+        "scheduler": res.matchmaking_scheduler.stats(),
+        "recovery": res.matchmaking_recovery.stats(),
+        "expiry": res.expiry_sweeper.stats(),
+        "admission": res.admission_controller.stats(),
+        "shards": res.matchmaking_shards.stats() if res.matchmaking_shards is not None else None,
+    }
+
+
+@router.get("/metrics/games")
+async def get_games_metrics():
+    """
+    Size of the in-memory title indexes (title_index is None when title search falls back to LIKE),
+    hit/miss/eviction counters of the games response cache, and the catalog snapshot (None
+    unless snapshot mode is on).
+    """
+    res = ServiceFactory.get_service("GamesResource")
+    return {
+        "title_index": res.title_index.stats() if res.title_index is not None else None,
+        "prefix_index": res.prefix_index.stats(),
+        "cache": res.games_cache.stats() if res.games_cache is not None else None,
+        "catalog": res.catalog.stats() if res.catalog is not None else None,
+        "catalog_refresh": res.catalog_refresher.stats() if res.catalog_refresher is not None else None,
+        "title_index_refresh": res.index_refresher.stats() if res.index_refresher is not None else None,
+    }
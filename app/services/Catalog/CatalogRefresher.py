@@ -0,0 +1,44 @@
+import time
+
+from framework.services.periodic_task import PeriodicTask
+
+
+class CatalogRefresher(PeriodicTask):
+    """
+    Periodically rebuilds the in-memory catalog snapshot and hands it over to be
+    swapped in. Readers keep using the previous snapshot until the new one is complete,
+    and a failed load leaves it in place.
+    """
+
+    def __init__(self, load_snapshot, on_loaded, interval=60):
+        """
+        :param load_snapshot: Coroutine function returning a new CatalogSnapshot.
+        :param on_loaded: Callback invoked with each new snapshot.
+        :param interval: Seconds between refreshes.
+        """
+        super().__init__(interval)
+        self.load_snapshot = load_snapshot
+        self.on_loaded = on_loaded
+
+        self._runs = 0
+        self._last_games = 0
+        self._last_run_ms = 0.0
+
+    async def run_once(self):
+        started = time.perf_counter()
+        snapshot = await self.load_snapshot()
+        self.on_loaded(snapshot)
+
+        self._runs += 1
+        self._last_games = len(snapshot)
+        self._last_run_ms = (time.perf_counter() - started) * 1000
+        return snapshot
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "runs": self._runs,
+            "last_games": self._last_games,
+            "last_run_ms": self._last_run_ms,
+        }
@@ -0,0 +1,170 @@
+import bisect
+import hashlib
+import time
+from collections import namedtuple
+
+CatalogRecord = namedtuple("CatalogRecord", ["gameId", "title", "description", "image", "genre"])
+
+
+class CatalogSnapshot:
+    """
+    Immutable, columnar copy of game_info for serving /games from memory.
+
+    Rows are sorted by gameId once at build time, so row order is the keyset order the
+    database would use and a gameId cursor is a binary search away. Each column is a
+    tuple indexed by row. Genre membership is kept as one bitset per genre, an int
+    whose bit i is set when row i has the genre, so AND/OR genre filters and facet
+    counts are a handful of big-int operations however many games match.
+
+    A snapshot is never modified; refreshing builds a new one and swaps the reference.
+    """
+
+    def __init__(self, rows, game_genres, main_genres, other_genre="other"):
+        """
+        :param rows: (gameId, title, description, image, genre) for every game.
+        :param game_genres: (gameId, genre) pairs from game_genre, genre lowercased.
+        :param main_genres: Genres with their own bucket; games in none of them are other_genre.
+        :param other_genre: Name of the bucket for the remaining games.
+        """
+        rows = sorted(rows, key=lambda row: row[0])
+        self.ids = tuple(row[0] for row in rows)
+        self.titles = tuple(row[1] or "" for row in rows)
+        self.descriptions = tuple(row[2] for row in rows)
+        self.images = tuple(row[3] for row in rows)
+        self.genres = tuple(row[4] for row in rows)
+        self._titles_lower = tuple(title.lower() for title in self.titles)
+        self._row_of = {game_id: row for row, game_id in enumerate(self.ids)}
+
+        # Set bits in byte buffers and convert once; OR-ing into a big int per row is quadratic
+        buffers = {}
+        for game_id, genre in game_genres:
+            row = self._row_of.get(game_id)
+            if row is not None:
+                buffer = buffers.get(genre)
+                if buffer is None:
+                    buffer = buffers[genre] = bytearray((len(self.ids) + 7) // 8)
+                buffer[row >> 3] |= 1 << (row & 7)
+        bits = {genre: int.from_bytes(buffer, "little") for genre, buffer in buffers.items()}
+        self._genre_bits = bits
+        self._all = (1 << len(self.ids)) - 1
+
+        main = 0
+        for genre in main_genres:
+            main |= bits.get(genre, 0)
+        self.other_genre = other_genre
+        self._other = self._all & ~main
+
+        # Content checksum, so a refresh that found nothing new can be told apart
+        digest = hashlib.sha1()
+        for row in rows:
+            digest.update(repr(tuple(row)).encode("utf-8"))
+        for game_genre in sorted(tuple(game_genre) for game_genre in game_genres):
+            digest.update(repr(game_genre).encode("utf-8"))
+        self.checksum = digest.hexdigest()
+
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, game_id):
+        """The game as a dict, or None if it is not in the snapshot."""
+        row = self._row_of.get(game_id)
+        if row is None:
+            return None
+        return self.record(row)._asdict()
+
+    def record(self, row):
+        return CatalogRecord(self.ids[row], self.titles[row], self.descriptions[row], self.images[row],
+                             self.genres[row])
+
+    def records_for(self, game_ids):
+        """Records of the given games that are in the snapshot, in the given order."""
+        return [self.record(self._row_of[game_id]) for game_id in game_ids if game_id in self._row_of]
+
+    def select(self, title=None, game_id=None, genres=None, genre_match="any"):
+        """
+        Bitset of the rows matching every given filter. title is a case-insensitive
+        substring, like the LIKE filter; genres are lowercased names.
+        """
+        mask = self._all
+        if game_id is not None:
+            row = self._row_of.get(game_id)
+            mask = 1 << row if row is not None else 0
+        if genres:
+            bitsets = [self._other if genre == self.other_genre else self._genre_bits.get(genre, 0)
+                       for genre in genres]
+            combined = bitsets[0]
+            for bitset in bitsets[1:]:
+                combined = combined & bitset if genre_match == "all" else combined | bitset
+            mask &= combined
+        if title:
+            needle = title.lower()
+            matched = bytearray((len(self.ids) + 7) // 8)
+            for row, title_lower in enumerate(self._titles_lower):
+                if needle in title_lower:
+                    matched[row >> 3] |= 1 << (row & 7)
+            mask &= int.from_bytes(matched, "little")
+        return mask
+
+    def contains(self, mask, game_id):
+        row = self._row_of.get(game_id)
+        return row is not None and (mask >> row) & 1 == 1
+
+    def page(self, mask, limit, offset=0, after_id=None):
+        """
+        Records of the matching rows in gameId order, starting after after_id (keyset)
+        or skipping offset matches.
+
+        :return: (records, has_next_page)
+        """
+        if after_id is not None:
+            # First row with a gameId greater than the cursor
+            start = bisect.bisect_right(self.ids, after_id)
+            mask = (mask >> start) << start
+        elif offset:
+            mask = self._drop_lowest(mask, offset)
+        records = []
+        for row in self.rows(mask):
+            if len(records) == limit:
+                return records, True
+            records.append(self.record(row))
+        return records, False
+
+    @staticmethod
+    def rows(mask):
+        """Row numbers of the set bits of mask, lowest first."""
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    def genre_counts(self):
+        return {
+            "genres": {genre: bits.bit_count() for genre, bits in self._genre_bits.items()},
+            "other": self._other.bit_count(),
+            "total": len(self.ids),
+        }
+
+    def stats(self):
+        return {
+            "games": len(self.ids),
+            "genres": len(self._genre_bits),
+            "checksum": self.checksum,
+            "loaded_at": self.loaded_at,
+        }
+
+    @staticmethod
+    def _drop_lowest(mask, count):
+        """Clear the count lowest set bits, locating the cut with a binary search on bit counts."""
+        if mask.bit_count() <= count:
+            return 0
+        low, high = 0, mask.bit_length()
+        # Smallest position whose lower bits hold count set bits
+        while low < high:
+            middle = (low + high) // 2
+            if (mask & ((1 << middle) - 1)).bit_count() >= count:
+                high = middle
+            else:
+                low = middle + 1
+        return (mask >> low) << low
@@ -1,6 +1,8 @@
+import hashlib
 import pymysql
 from framework.services.DataAccess.MySQLDataService import MySQLDataService
 from typing import Optional
+from framework.utils.pagination import decode_cursor
 
 
 class FavouritesDataService(MySQLDataService):
@@ -36,18 +38,49 @@ class FavouritesDataService(MySQLDataService):
                 """)
                 connection.commit()
 
-    def get_favourites(self, user_id: str, page: int, page_size: int):
-        """Builds the SQL query based on filters and executes it, returning the results."""
+        self._ensure_index(database_name, "favourites", "idx_favourites_user", ["userId"])
+        self.initialize_data_versions(database_name)
+
+    @staticmethod
+    def favourites_version_name(user_id):
+        """data_version row of one user's favourites; hashed, as user ids can outgrow the name column."""
+        return f"favourites:{hashlib.sha1(str(user_id).encode('utf-8')).hexdigest()}"
+
+    def _before_commit(self, cursor, database_name, collection_name, data_objects):
+        """Bump the version of each user whose favourites were written, with the write."""
+        if collection_name != "favourites":
+            return
+        for user_id in dict.fromkeys(data_object["userId"] for data_object in data_objects if "userId" in data_object):
+            self._bump_data_version(cursor, database_name, self.favourites_version_name(user_id))
+
+    def get_favourites(self, user_id: str, page: int, page_size: int, cursor: Optional[str] = None):
+        """
+        Builds the SQL query based on filters and executes it, returning the results and
+        whether another page follows. With a cursor the page starts after the favouriteId it
+        encodes and page is ignored.
+        """
         offset = (page - 1) * page_size
         params = []
 
         database = self.context["database"]
 
-        base_query = f"SELECT gameId FROM {database}.favourites "
+        base_query = f"SELECT favouriteId, gameId FROM {database}.favourites "
         base_query += "WHERE userId = %s"
         params.append(f"{user_id}")
 
-        base_query += " LIMIT %s OFFSET %s"
-        params.extend([page_size, offset])
+        if cursor:
+            base_query += " AND favouriteId > %s"
+            params.append(decode_cursor(cursor, "favouriteId")["favouriteId"])
+
+        base_query += " ORDER BY favouriteId"
+
+        if cursor:
+            base_query += " LIMIT %s"
+            params.append(page_size + 1)
+        else:
+            base_query += " LIMIT %s OFFSET %s"
+            params.extend([page_size + 1, offset])
 
-        return self.execute_query(base_query,params)
\ No newline at end of file
+        records = self.execute_query(base_query, params)
+        has_next_page = len(records) > page_size
+        return records[:page_size], has_next_page
@@ -1,34 +1,284 @@
 from framework.services.DataAccess.MySQLDataService import MySQLDataService
 from typing import Optional
-from sqlalchemy import create_engine, or_, MetaData, Table
+from sqlalchemy import create_engine, and_, exists, func, or_, select
 from sqlalchemy.orm import sessionmaker
 from typing import Optional
-from app.models.game import GameInfo
+from app.models.game import GameGenre, GameInfo
+from framework.utils.pagination import decode_cursor
 import traceback
 
+# Genres with their own browse bucket; games with none of them are "other"
+MAIN_GENRES = ["arcade", "shooter", "platform", "adventure", "fighting", "puzzle"]
+OTHER_GENRE = "other"
+
+
+def normalize_genres(genres):
+    """Lowercased, de-duplicated genre names from a list or a comma-joined string."""
+    if not genres:
+        return []
+    if isinstance(genres, str):
+        genres = genres.split(",")
+    return list(dict.fromkeys(genre.strip().lower() for genre in genres if genre and genre.strip()))
+
 
 class GamesDataService(MySQLDataService):
     def __init__(self, context):
         super().__init__(context)
+        # Callables (collection_name, data_objects) run after rows are written
+        self._change_listeners = []
+
+    def add_change_listener(self, listener):
+        """Register a callable invoked with (collection_name, data_objects) after every successful write."""
+        self._change_listeners.append(listener)
+
+    def _before_commit(self, cursor, database_name, collection_name, data_objects):
+        """
+        Keep game_genre in step with game_info writes and bump the catalog's shared
+        version, in the transaction of the write itself.
+        """
+        if collection_name != "game_info" or not data_objects:
+            return
+        genres_by_game = {
+            data_object["gameId"]: data_object["genre"] for data_object in data_objects
+            if "genre" in data_object and "gameId" in data_object
+        }
+        if genres_by_game:
+            self._write_game_genres(cursor, database_name, genres_by_game)
+        self._bump_data_version(cursor, database_name, collection_name)
+
+    def _notify_change(self, collection_name, data_objects):
+        for listener in self._change_listeners:
+            try:
+                listener(collection_name, data_objects)
+            except Exception as e:
+                print(f"Change listener failed for {collection_name}: {e}")
 
     def initialize(self, database_name):
         """
         Creates the database and tables if they do not exist.
         """
+        pool_settings = self._pool_settings()
         self.engine = create_engine(
             f"mysql+pymysql://{self.context['user']}:{self.context['password']}@"
             f"{self.context['host']}:{self.context['port']}/{database_name}",
-            echo=True  #
+            echo=True,  #
+            # SQLAlchemy keeps its own QueuePool; size it with the same knobs as the
+            # pymysql pool so the engine honours the same connection budget.
+            pool_size=max(pool_settings["min_size"], 1),
+            max_overflow=max(pool_settings["max_size"] - pool_settings["min_size"], 0),
+            pool_timeout=pool_settings["checkout_timeout"],
+            pool_recycle=pool_settings["idle_timeout"],
+            pool_pre_ping=True
         )
         self.Session = sessionmaker(bind=self.engine)
+        self.initialize_genres(database_name)
+        self.initialize_ingestion_state(database_name)
+        self.initialize_data_versions(database_name)
+
+    def initialize_ingestion_state(self, database_name):
+        """Create the table holding each ingestion source's high-water mark."""
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {database_name}.ingestion_state (
+                        source VARCHAR(32) NOT NULL PRIMARY KEY,
+                        highWaterMark BIGINT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                    )
+                """)
+
+    def get_high_water_mark(self, database_name, source):
+        """The newest source timestamp already ingested, or 0 if the source was never synced."""
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT highWaterMark FROM {database_name}.ingestion_state WHERE source = %s", (source,)
+                )
+                row = cursor.fetchone()
+        return row["highWaterMark"] if row else 0
+
+    def set_high_water_mark(self, database_name, source, high_water_mark):
+        self.upsert_data_objects(database_name, "ingestion_state", "source",
+                                 [{"source": source, "highWaterMark": high_water_mark}])
+
+    def initialize_genres(self, database_name):
+        """
+        Create the game_genre join table and, the first time, fill it from the
+        comma-joined game_info.genre column.
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                # The primary key serves "genres of a game"; the secondary index serves
+                # "games of a genre, in gameId order".
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {database_name}.game_genre (
+                        gameId VARCHAR(36) NOT NULL,
+                        genre VARCHAR(64) NOT NULL,
+                        PRIMARY KEY (gameId, genre),
+                        INDEX idx_game_genre_genre (genre, gameId)
+                    )
+                """)
+                cursor.execute(f"SELECT 1 FROM {database_name}.game_genre LIMIT 1")
+                if cursor.fetchone() is not None:
+                    return
+                cursor.execute(
+                    f"SELECT gameId, genre FROM {database_name}.game_info WHERE genre IS NOT NULL AND genre <> ''"
+                )
+                rows = cursor.fetchall()
+
+        genres_by_game = {row["gameId"]: row["genre"] for row in rows}
+        if genres_by_game:
+            self.set_game_genres(database_name, genres_by_game)
+            print(f"Backfilled game_genre for {len(genres_by_game)} games")
+
+    def set_game_genres(self, database_name, genres_by_game, chunk_size=None):
+        """
+        Replace the game_genre rows of each game, in one transaction.
+
+        :param genres_by_game: gameId -> genres, as a list or a comma-joined string.
+        """
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                self._write_game_genres(cursor, database_name, genres_by_game, chunk_size)
+
+    def _write_game_genres(self, cursor, database_name, genres_by_game, chunk_size=None):
+        """set_game_genres on a given cursor, e.g. inside the transaction writing game_info."""
+        game_ids = list(genres_by_game)
+        rows = [(game_id, genre) for game_id in game_ids for genre in normalize_genres(genres_by_game[game_id])]
+        chunk_size = self._chunk_size(chunk_size)
+        for chunk in self._chunks(game_ids, chunk_size):
+            cursor.execute(
+                f"DELETE FROM {database_name}.game_genre WHERE gameId IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+        for chunk in self._chunks(rows, chunk_size):
+            cursor.execute(
+                f"INSERT INTO {database_name}.game_genre (gameId, genre) "
+                f"VALUES {', '.join(['(%s, %s)'] * len(chunk))}",
+                [value for row in chunk for value in row]
+            )
+
+    def get_genre_counts(self):
+        """Games per genre, games in none of MAIN_GENRES, and the catalog size."""
+        with self.get_session() as session:
+            genres = dict(
+                session.query(GameGenre.genre, func.count()).group_by(GameGenre.genre).all()
+            )
+            other = session.query(func.count()).select_from(GameInfo).filter(self._other_genre()).scalar()
+            total = session.query(func.count()).select_from(GameInfo).scalar()
+        return {"genres": genres, "other": other, "total": total}
+
+    def get_pool_stats(self):
+        """Return pool counters for both the pymysql pool and the SQLAlchemy engine pool."""
+        stats = super().get_pool_stats()
+        engine = getattr(self, "engine", None)
+        if engine is not None:
+            pool = engine.pool
+            stats["engine"] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        return stats
     
+    def shutdown(self):
+        engine = getattr(self, "engine", None)
+        if engine is not None:
+            engine.dispose()
+        super().shutdown()
+
     def get_session(self):
         return self.Session()
 
-    def get_game_records(self, title: Optional[str], gameId: Optional[str], page: int, page_size: int, genre: Optional[str]):
+    def get_game_titles(self):
+        """Return (gameId, title) for every game, e.g. to build the title search index."""
+        with self.get_session() as session:
+            return session.query(GameInfo.gameId, GameInfo.title).all()
+
+    def has_game(self, game_id):
+        """Whether the game exists, answered from game_info's primary key without reading the row."""
+        with self.get_session() as session:
+            return session.query(GameInfo.gameId).filter(GameInfo.gameId == game_id).first() is not None
+
+    def get_catalog(self):
+        """
+        Every game and every (gameId, genre) pair, for building an in-memory snapshot.
+
+        :return: ([(gameId, title, description, image, genre)], [(gameId, genre)])
+        """
+        with self.get_session() as session:
+            rows = session.query(
+                GameInfo.gameId, GameInfo.title, GameInfo.description, GameInfo.image, GameInfo.genre
+            ).all()
+            game_genres = session.query(GameGenre.gameId, GameGenre.genre).all()
+        return rows, game_genres
+
+    def get_game_records_by_ids(self, game_ids, genre: Optional[str] = None, genre_match: str = "any"):
+        """
+        Fetch the games with the given ids (e.g. title search hits), applying the genre
+        filter, in the order of game_ids.
+        """
+        if not game_ids:
+            return []
+        with self.get_session() as session:
+            query = session.query(GameInfo).filter(GameInfo.gameId.in_(game_ids))
+            query = self._filter_genre(query, genre, genre_match)
+            rows = {row.gameId: row for row in query.all()}
+        return [rows[game_id] for game_id in game_ids if game_id in rows]
+
+    def get_game_ids_by_genre(self, genre: str, genre_match: str = "any"):
+        """
+        The ids of the games passing the genre filter, read from the game_genre index
+        alone (the "other" bucket from game_info's primary key), without loading any
+        game rows; e.g. to narrow title search hits before fetching a page of them.
+        """
+        genres = normalize_genres(genre)
+        with self.get_session() as session:
+            matches = [
+                {game_id for game_id, in session.query(GameGenre.gameId).filter(GameGenre.genre == g)}
+                for g in genres if g != OTHER_GENRE
+            ]
+            if OTHER_GENRE in genres:
+                matches.append({game_id for game_id, in session.query(GameInfo.gameId).filter(self._other_genre())})
+        if not matches:
+            return set()
+        return set.intersection(*matches) if genre_match == "all" else set.union(*matches)
+
+    @staticmethod
+    def _other_genre():
+        """Games tagged with none of MAIN_GENRES: an anti-join on the game_genre primary key."""
+        return ~exists().where(GameGenre.gameId == GameInfo.gameId, GameGenre.genre.in_(MAIN_GENRES))
+
+    @classmethod
+    def _filter_genre(cls, query, genre, genre_match="any"):
+        """
+        Filter on one or more comma-separated genres through game_genre. With
+        genre_match "any" a game needs one of them, with "all" every one of them.
+        """
+        genres = normalize_genres(genre)
+        if not genres:
+            return query
+        named = [g for g in genres if g != OTHER_GENRE]
+
+        # Semi-joins on idx_game_genre_genre: each reads only the games of one genre
+        if genre_match == "all":
+            conditions = [GameInfo.gameId.in_(select(GameGenre.gameId).where(GameGenre.genre == g)) for g in named]
+        else:
+            conditions = [GameInfo.gameId.in_(select(GameGenre.gameId).where(GameGenre.genre.in_(named)))] if named else []
+        if OTHER_GENRE in genres:
+            conditions.append(cls._other_genre())
+
+        return query.filter(and_(*conditions) if genre_match == "all" else or_(*conditions))
+
+    def get_game_records(self, title: Optional[str], gameId: Optional[str], page: int, page_size: int, genre: Optional[str],
+                         cursor: Optional[str] = None, genre_match: str = "any"):
+        """
+        Fetch one page of games ordered by gameId. When a cursor is given the page starts
+        right after the gameId it encodes (keyset pagination) and page is ignored.
+        """
         offset = (page - 1) * page_size
         with self.get_session() as session:
-            session = self.get_session()
             query = session.query(GameInfo)
 
             if title:
@@ -37,35 +287,56 @@ class GamesDataService(MySQLDataService):
             if gameId:
                 query = query.filter(GameInfo.gameId == gameId)
 
-            genres_list = ["arcade", "shooter", "platform", "adventure", "fighting", "puzzle"]
-            if genre and genre.lower() != "other":
-                query = query.filter(GameInfo.genre.ilike(f"%{genre}%"))
-            elif genre and genre.lower() == "other":
-                exclude_conditions = [GameInfo.genre.ilike(f"%{g}%") for g in genres_list]
-                query = query.filter(~or_(*exclude_conditions))
+            query = self._filter_genre(query, genre, genre_match)
+
+            # A stable order on the primary key is what makes keyset pagination possible
+            query = query.order_by(GameInfo.gameId)
+
+            if cursor:
+                last_game_id = decode_cursor(cursor, "gameId")["gameId"]
+                query = query.filter(GameInfo.gameId > last_game_id)
+            else:
+                query = query.offset(offset)
 
-            results = query.limit(page_size + 1).offset(offset).all()
+            results = query.limit(page_size + 1).all()
             has_next_page = len(results) > page_size
             results = results[:page_size]
             return results, has_next_page
-    
+
     def insert_data_object(self, database_name, collection_name, data_object):
-        metadata = MetaData(schema=database_name)
         print(f"Inserting data into table: {collection_name}")
-        print(self.engine)
-        print("!!!!!")
-        table = Table(
-            collection_name,
-            metadata,
-            autoload_with=self.engine 
-        )
         try:
-            with self.engine.connect() as connection:
-                insert_stmt = table.insert().values(**data_object) 
-                connection.execute(insert_stmt)
-                connection.commit()
-            return True
+            result = super().insert_data_object(database_name, collection_name, data_object)
         except Exception as e:
             print(f"Failed to insert data: {e}")
-            traceback.print_exc() 
-            return False
\ No newline at end of file
+            traceback.print_exc()
+            return False
+        if result:
+            self._notify_change(collection_name, [data_object])
+        return result
+
+    def update_data_object(self, database_name, collection_name, key_field, key_value, updated_data):
+        result = super().update_data_object(database_name, collection_name, key_field, key_value, updated_data)
+        if result:
+            self._notify_change(collection_name, [{key_field: key_value, **updated_data}])
+        return result
+
+    def insert_data_objects(self, database_name, collection_name, data_objects, chunk_size=None):
+        data_objects = list(data_objects)
+        results = super().insert_data_objects(database_name, collection_name, data_objects, chunk_size)
+        self._notify_change(collection_name, data_objects)
+        return results
+
+    def upsert_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        data_objects = list(data_objects)
+        results, counts = super().upsert_data_objects(database_name, collection_name, key_field, data_objects,
+                                                      chunk_size)
+        self._notify_change(collection_name, data_objects)
+        return results, counts
+
+    def update_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        data_objects = list(data_objects)
+        results = super().update_data_objects(database_name, collection_name, key_field, data_objects, chunk_size)
+        self._notify_change(collection_name,
+                           [data_object for data_object, updated in zip(data_objects, results) if updated])
+        return results
@@ -1,6 +1,8 @@
+import uuid
 import pymysql
 from framework.services.DataAccess.MySQLDataService import MySQLDataService
 from typing import Optional
+from framework.utils.pagination import decode_cursor
 
 
 class MatchRequestDataService(MySQLDataService):
@@ -54,17 +56,57 @@ class MatchRequestDataService(MySQLDataService):
                 # """)
                 # connection.commit()
 
+                # Lobbies of more than two players: one row per member, sharing a groupId.
+                # Pairs keep using matched_requests.
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS matched_groups (
+                        groupId CHAR(36) NOT NULL,
+                        matchRequestId CHAR(36) NOT NULL PRIMARY KEY,
+                        gameId CHAR(36) NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        INDEX idx_matched_groups_group (groupId)
+                    )
+                """)
 
-    def get_match_requests_records(self, user_id: Optional[str], game_id: Optional[str], page: int, page_size: int):
+        # Optional matchmaking attributes; requests without them match on game alone.
+        # activatedAt lets waiting time (and so the skill window) survive restarts.
+        self._ensure_column(database_name, "match_request", "skillRating", "INT NULL")
+        self._ensure_column(database_name, "match_request", "region", "VARCHAR(32) NULL")
+        self._ensure_column(database_name, "match_request", "language", "VARCHAR(32) NULL")
+        self._ensure_column(database_name, "match_request", "activatedAt", "DATETIME NULL")
+
+        # Secondary indexes for the filtered listings; InnoDB appends the primary key,
+        # so "WHERE userId = ? AND matchRequestId > ? ORDER BY matchRequestId" is a range seek.
+        self._ensure_index(database_name, "match_request", "idx_match_request_user", ["userId"])
+        # Per-user cap on waiting requests: "WHERE userId = ? AND isActive = TRUE"
+        self._ensure_index(database_name, "match_request", "idx_match_request_user_active", ["userId", "isActive"])
+        self._ensure_index(database_name, "match_request", "idx_match_request_game", ["gameId"])
+        # Partner lookups: "WHERE gameId = ? AND isActive = TRUE ... FOR UPDATE SKIP LOCKED"
+        self._ensure_index(database_name, "match_request", "idx_match_request_game_active", ["gameId", "isActive"])
+        # Scheduler ticks: "WHERE isActive = TRUE AND (gameId, activatedAt, matchRequestId) > ? ORDER BY ... LIMIT n";
+        # the primary key rides along in the index, so it orders ties without being listed
+        self._ensure_index(database_name, "match_request", "idx_match_request_active_game_activated",
+                           ["isActive", "gameId", "activatedAt"])
+        # Expiry sweeps: "WHERE isActive = TRUE AND expireDate < CURDATE()"
+        self._ensure_index(database_name, "match_request", "idx_match_request_active_expire", ["isActive", "expireDate"])
+        # "Already matched?" probes look a request up on either side of a pair, one
+        # indexed probe per column
+        self._ensure_index(database_name, "matched_requests", "idx_matched_requests_id1", ["matchRequestId1"])
+        self._ensure_index(database_name, "matched_requests", "idx_matched_requests_id2", ["matchRequestId2"])
+
+
+    def get_match_requests_records(self, user_id: Optional[str], game_id: Optional[str], page: int, page_size: int,
+                                   cursor: Optional[str] = None):
         """
         Build and execute a SQL query to fetch match requests with optional filtering and pagination.
 
         :param self: self instance.
         :param user_id: Optional user ID to filter match requests.
         :param game_id: Optional game ID to filter match requests.
-        :param page: The page number for pagination.
+        :param page: The page number for pagination. Ignored when a cursor is given.
         :param page_size: The number of records per page.
-        :return: A list of match requests.
+        :param cursor: Optional keyset cursor; the page starts after the matchRequestId it encodes.
+        :return: A list of match requests and whether another page follows.
         """
         offset = (page - 1) * page_size  # Calculate the offset for pagination
 
@@ -83,8 +125,422 @@ class MatchRequestDataService(MySQLDataService):
             base_query += " AND gameId = %s"
             params.append(f"{game_id}")
 
-        base_query += " LIMIT %s OFFSET %s"
-        params.extend([page_size, offset])
+        if cursor:
+            base_query += " AND matchRequestId > %s"
+            params.append(decode_cursor(cursor, "matchRequestId")["matchRequestId"])
+
+        # Order on the primary key so pages are stable and cursors can seek with the index
+        base_query += " ORDER BY matchRequestId"
+
+        if cursor:
+            base_query += " LIMIT %s"
+            params.append(page_size + 1)
+        else:
+            base_query += " LIMIT %s OFFSET %s"
+            params.extend([page_size + 1, offset])
         # Execute the query and return the results
-        return self.execute_query(base_query, params)
+        records = self.execute_query(base_query, params)
+        has_next_page = len(records) > page_size
+        return records[:page_size], has_next_page
+
+    def activate_match_request(self, match_request_id: str, user_id: Optional[str] = None,
+                               max_active: Optional[int] = None):
+        """
+        Atomically flip a request to active. Only succeeds for a request that is not active,
+        cancelled, expired or already matched, so concurrent initiations cannot both win.
+        With max_active, the user's requests are locked first and the flip is refused once
+        the user already has max_active active requests, so concurrent initiations by one
+        user cannot overshoot the cap either.
+
+        :return: True if this call activated the request.
+        """
+        database = self.context["database"]
+
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                if max_active is not None:
+                    # Locks every request of the user, in index order, so initiations by
+                    # the same user take turns
+                    cursor.execute(
+                        f"SELECT isActive FROM {database}.match_request WHERE userId = %s FOR UPDATE", (user_id,)
+                    )
+                    if sum(1 for row in cursor.fetchall() if row["isActive"]) >= max_active:
+                        return False
+                cursor.execute(
+                    f"UPDATE {database}.match_request SET isActive = TRUE, activatedAt = NOW() "
+                    f"WHERE matchRequestId = %s AND isActive = FALSE AND isCancelled = FALSE "
+                    f"AND expireDate >= CURDATE() "
+                    f"AND NOT EXISTS (SELECT 1 FROM {database}.matched_requests m WHERE m.matchRequestId1 = %s) "
+                    f"AND NOT EXISTS (SELECT 1 FROM {database}.matched_requests m WHERE m.matchRequestId2 = %s) "
+                    f"AND NOT EXISTS (SELECT 1 FROM {database}.matched_groups g WHERE g.matchRequestId = %s)",
+                    (match_request_id, match_request_id, match_request_id, match_request_id)
+                )
+                return cursor.rowcount > 0
+
+    def count_active_match_requests(self, user_id: str):
+        """Number of the user's requests that are waiting in matchmaking."""
+        database = self.context["database"]
+        rows = self.execute_query(
+            f"SELECT COUNT(*) AS active FROM {database}.match_request WHERE userId = %s AND isActive = TRUE",
+            (user_id,)
+        )
+        return rows[0]["active"]
+
+    def cancel_match_request(self, match_request_id: str):
+        """
+        Atomically cancel a request that has not been matched. The UPDATE takes the row
+        lock, so it waits for any claim in progress on the row; if that claim committed,
+        the match row exists and the cancel is refused. Once cancelled, the request fails
+        every claim's isCancelled check and can never be matched.
+
+        :return: True if this call cancelled the request.
+        """
+        database = self.context["database"]
+
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {database}.match_request SET isCancelled = TRUE, isActive = FALSE "
+                    f"WHERE matchRequestId = %s AND isCancelled = FALSE "
+                    f"AND NOT EXISTS (SELECT 1 FROM {database}.matched_requests m WHERE m.matchRequestId1 = %s) "
+                    f"AND NOT EXISTS (SELECT 1 FROM {database}.matched_requests m WHERE m.matchRequestId2 = %s) "
+                    f"AND NOT EXISTS (SELECT 1 FROM {database}.matched_groups g WHERE g.matchRequestId = %s)",
+                    (match_request_id, match_request_id, match_request_id, match_request_id)
+                )
+                return cursor.rowcount > 0
+
+    def claim_match(self, match_request_id: str, partner_request_id: str, game_id: str):
+        """
+        Atomically pair two requests. See claim_group.
+
+        :return: A dict with "matched" (bool), "available", the ids that were still
+            claimable, and "busy", the ids locked by another claim. When the pair was not
+            recorded, nothing was written.
+        """
+        return self.claim_group([match_request_id, partner_request_id], game_id)
+
+    def claim_group(self, match_request_ids: list, game_id: str):
+        """
+        Atomically match a pair or lobby. Every row is locked with SELECT ... FOR UPDATE SKIP LOCKED
+        and must still be active, not cancelled and not expired; the match rows and the isActive
+        flips are then written in the same transaction. Rows another transaction is claiming
+        are skipped rather than waited on, so concurrent claims never block or deadlock.
+
+        :return: A dict with "matched" (bool), "available", the ids that were still claimable,
+            and "busy", the ids that are still active but were locked by another claim, so
+            callers can keep them queued. When the group was not recorded, nothing was written.
+        """
+        database = self.context["database"]
+
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                available = self._lock_claimable(cursor, database, match_request_ids)
+                if len(available) < len(match_request_ids):
+                    busy = self._find_busy(cursor, database, [
+                        match_request_id for match_request_id in match_request_ids if match_request_id not in available
+                    ])
+                    return {"matched": False, "available": available, "busy": busy}
+
+                self._write_groups(cursor, database, [(game_id, match_request_ids)])
+        return {"matched": True, "available": available, "busy": []}
+
+    def claim_partner(self, match_request_id: str, user_id: str, game_id: str, region: Optional[str] = None,
+                      language: Optional[str] = None, skill_rating: Optional[int] = None,
+                      skill_window: Optional[dict] = None):
+        """
+        Look for any claimable partner in the database (e.g. one queued by another worker)
+        and, if there is one, pair with it in the same transaction. The partner must share
+        the game, region and language; when both sides have a skillRating, the closest one
+        within the wider of the two skill windows is taken.
+
+        :param skill_window: Dict with "window" (the caller's current window), "base_window",
+            "widen_rate" and "max_window", used to compute each candidate's window from its
+            activatedAt. Without it, skill ratings are ignored.
+        :return: The partner's row if a match was recorded, otherwise None.
+        """
+        database = self.context["database"]
+
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT matchRequestId FROM {database}.match_request "
+                    f"WHERE matchRequestId = %s AND isActive = TRUE AND isCancelled = FALSE "
+                    f"AND expireDate >= CURDATE() "
+                    f"FOR UPDATE SKIP LOCKED",
+                    (match_request_id,)
+                )
+                if cursor.fetchone() is None:
+                    # Already matched, cancelled, or being claimed by someone else right now
+                    return None
+
+                # <=> so that NULL region/language only matches NULL, like the in-memory buckets
+                query = (
+                    f"SELECT * FROM {database}.match_request "
+                    f"WHERE gameId = %s AND region <=> %s AND language <=> %s "
+                    f"AND isActive = TRUE AND isCancelled = FALSE "
+                    f"AND expireDate >= CURDATE() "
+                    f"AND userId <> %s AND matchRequestId <> %s "
+                )
+                params = [game_id, region, language, user_id, match_request_id]
+                if skill_rating is not None and skill_window is not None:
+                    query += (
+                        f"AND (skillRating IS NULL OR ABS(skillRating - %s) <= GREATEST(%s, LEAST(%s, "
+                        f"%s + %s * COALESCE(TIMESTAMPDIFF(SECOND, activatedAt, NOW()), 0)))) "
+                        f"ORDER BY skillRating IS NULL, ABS(skillRating - %s) "
+                    )
+                    params += [skill_rating, skill_window["window"], skill_window["max_window"],
+                               skill_window["base_window"], skill_window["widen_rate"], skill_rating]
+                query += "LIMIT 1 FOR UPDATE SKIP LOCKED"
+                cursor.execute(query, params)
+                partner = cursor.fetchone()
+                if partner is None:
+                    return None
+
+                self._write_groups(cursor, database, [(game_id, [match_request_id, partner["matchRequestId"]])])
+        return partner
+
+    def get_active_game_ids(self):
+        """
+        The games with active requests, read from idx_match_request_active_game_activated
+        alone, e.g. to pick a shard's partition before loading any rows.
+        """
+        database = self.context["database"]
+        rows = self.execute_query(
+            f"SELECT DISTINCT gameId FROM {database}.match_request WHERE isActive = TRUE ORDER BY gameId", ()
+        )
+        return [row["gameId"] for row in rows]
+
+    def get_active_match_requests(self, page_size: int, cursor: Optional[tuple] = None,
+                                  game_ids: Optional[list] = None):
+        """
+        Load one page of the requests still waiting for a match: active, not cancelled
+        and not expired. Used to rebuild the in-memory matchmaking queues; waitSeconds
+        carries how long each request has been active. Pages follow gameId, then
+        matchRequestId, a range seek on idx_match_request_game_active.
+
+        :param cursor: (gameId, matchRequestId) of the last row of the previous page; None starts at the first.
+        :param game_ids: Only read the requests of these games.
+        :return: (rows, cursor for the next page, or None after the last page).
+        """
+        database = self.context["database"]
+
+        query = (
+            f"SELECT *, TIMESTAMPDIFF(SECOND, activatedAt, NOW()) AS waitSeconds FROM {database}.match_request "
+            f"WHERE isActive = TRUE AND isCancelled = FALSE AND expireDate >= CURDATE() "
+        )
+        params = []
+        if game_ids is not None:
+            query += f"AND gameId IN ({', '.join(['%s'] * len(game_ids))}) "
+            params.extend(game_ids)
+        if cursor is not None:
+            game_id, match_request_id = cursor
+            query += "AND (gameId > %s OR (gameId = %s AND matchRequestId > %s)) "
+            params.extend([game_id, game_id, match_request_id])
+        query += "ORDER BY gameId, matchRequestId LIMIT %s"
+        params.append(page_size)
+        rows = self.execute_query(query, params)
+
+        next_cursor = None
+        if len(rows) >= page_size:
+            next_cursor = (rows[-1]["gameId"], rows[-1]["matchRequestId"])
+        return rows, next_cursor
+
+    def get_settled_match_requests(self, match_request_ids: list):
+        """
+        Return which of the given requests are no longer active (matched, cancelled, expired
+        or gone), with one primary-key lookup per chunk of ids.
+        """
+        database = self.context["database"]
+
+        active = set()
+        for chunk in self._chunks(list(match_request_ids), self._chunk_size()):
+            rows = self.execute_query(
+                f"SELECT matchRequestId FROM {database}.match_request "
+                f"WHERE matchRequestId IN ({', '.join(['%s'] * len(chunk))}) AND isActive = TRUE",
+                chunk
+            )
+            active.update(row["matchRequestId"] for row in rows)
+        return [match_request_id for match_request_id in match_request_ids if match_request_id not in active]
+
+    def match_active_batch(self, max_batch_size: int, group_requests, cursor: Optional[tuple] = None):
+        """
+        Run one batch matchmaking pass: read up to max_batch_size active requests without
+        locking them, group them with group_requests, then claim the groups in one
+        transaction. Only the grouped rows are locked (SKIP LOCKED), and a group is written
+        only if every member is still claimable, so requests other workers are claiming
+        meanwhile are left alone rather than stolen or dropped.
+
+        Rows are read in gameId order, oldest first within a game, starting after cursor and
+        wrapping around once the end is reached, so successive passes rotate through every
+        request however many are active, including the requests of a game with more
+        ungroupable ones than fit in a batch.
+
+        :param max_batch_size: Most active requests to consider.
+        :param group_requests: Function taking the rows and returning groups (lists of rows).
+        :param cursor: (gameId, activatedAt, matchRequestId) of the row to resume after, as
+            returned by the previous call; None starts at the lowest gameId.
+        :return: (committed groups, cursor for the next pass).
+        """
+        database = self.context["database"]
+
+        query = (
+            f"SELECT matchRequestId, userId, gameId, skillRating, region, language, activatedAt, "
+            f"TIMESTAMPDIFF(SECOND, activatedAt, NOW()) AS waitSeconds FROM {database}.match_request "
+            f"WHERE isActive = TRUE AND isCancelled = FALSE AND expireDate >= CURDATE() "
+        )
+        params = []
+        if cursor is not None:
+            game_id, activated_at, match_request_id = cursor
+            query += ("AND (gameId > %s OR (gameId = %s AND (activatedAt > %s "
+                      "OR (activatedAt = %s AND matchRequestId > %s)))) ")
+            params.extend([game_id, game_id, activated_at, activated_at, match_request_id])
+        query += "ORDER BY gameId, activatedAt, matchRequestId LIMIT %s"
+        params.append(max_batch_size)
+        rows = self.execute_query(query, params)
+
+        next_cursor = None
+        if len(rows) >= max_batch_size:
+            # The limit may have cut the last game short, so resume at its first row to
+            # group it whole; if it filled the whole batch, resume after the batch instead
+            last_game_id = rows[-1]["gameId"]
+            first = next(index for index, row in enumerate(rows) if row["gameId"] == last_game_id)
+            resume_after = rows[first - 1] if first > 0 else rows[-1]
+            next_cursor = (resume_after["gameId"], resume_after["activatedAt"], resume_after["matchRequestId"])
+
+        groups = group_requests(rows)
+        if not groups:
+            return [], next_cursor
+
+        with self._transaction() as connection:
+            with connection.cursor() as db_cursor:
+                available = set(self._lock_claimable(
+                    db_cursor, database, [row["matchRequestId"] for group in groups for row in group]
+                ))
+                committed = [group for group in groups
+                             if all(row["matchRequestId"] in available for row in group)]
+                if committed:
+                    self._write_groups(db_cursor, database, [
+                        (group[0]["gameId"], [row["matchRequestId"] for row in group]) for group in committed
+                    ])
+        return committed, next_cursor
+
+    def get_match_group(self, match_request_id: str):
+        """
+        Return the matchRequestIds of everyone matched together with a request, in indexed
+        lookups only, or None if it has not been matched.
+        """
+        database = self.context["database"]
+
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                # One probe per pair column, each on its own index
+                for column in ("matchRequestId1", "matchRequestId2"):
+                    cursor.execute(
+                        f"SELECT matchRequestId1, matchRequestId2 FROM {database}.matched_requests "
+                        f"WHERE {column} = %s LIMIT 1",
+                        (match_request_id,)
+                    )
+                    pair = cursor.fetchone()
+                    if pair is not None:
+                        return [pair["matchRequestId1"], pair["matchRequestId2"]]
+
+                cursor.execute(
+                    f"SELECT g.matchRequestId FROM {database}.matched_groups m "
+                    f"JOIN {database}.matched_groups g ON g.groupId = m.groupId "
+                    f"WHERE m.matchRequestId = %s",
+                    (match_request_id,)
+                )
+                members = [row["matchRequestId"] for row in cursor.fetchall()]
+                return members or None
+
+    def expire_match_requests(self, batch_size: int):
+        """
+        Deactivate one batch of active requests whose expireDate has passed. The rows are
+        found through the (isActive, expireDate) index and locked with SKIP LOCKED, so the
+        sweep never waits on a pairing transaction.
+
+        :param batch_size: Most rows expired by this call.
+        :return: The ids of the requests that were expired.
+        """
+        database = self.context["database"]
+
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT matchRequestId FROM {database}.match_request "
+                    f"WHERE isActive = TRUE AND expireDate < CURDATE() "
+                    f"LIMIT %s FOR UPDATE SKIP LOCKED",
+                    (batch_size,)
+                )
+                expired_ids = [row["matchRequestId"] for row in cursor.fetchall()]
+                if not expired_ids:
+                    return []
+
+                cursor.execute(
+                    f"UPDATE {database}.match_request SET isActive = FALSE "
+                    f"WHERE matchRequestId IN ({', '.join(['%s'] * len(expired_ids))})",
+                    expired_ids
+                )
+        return expired_ids
+
+    @staticmethod
+    def _lock_claimable(cursor, database, match_request_ids):
+        """Lock the given requests that are still claimable, skipping rows other claims hold."""
+        cursor.execute(
+            f"SELECT matchRequestId FROM {database}.match_request "
+            f"WHERE matchRequestId IN ({', '.join(['%s'] * len(match_request_ids))}) "
+            f"AND isActive = TRUE AND isCancelled = FALSE AND expireDate >= CURDATE() "
+            f"FOR UPDATE SKIP LOCKED",
+            match_request_ids
+        )
+        return [row["matchRequestId"] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _find_busy(cursor, database, match_request_ids):
+        """
+        Of requests that could not be locked, return those still claimable: a plain read
+        does not wait on row locks and sees them as last committed, i.e. held by a claim
+        in progress rather than matched, cancelled or expired.
+        """
+        cursor.execute(
+            f"SELECT matchRequestId FROM {database}.match_request "
+            f"WHERE matchRequestId IN ({', '.join(['%s'] * len(match_request_ids))}) "
+            f"AND isActive = TRUE AND isCancelled = FALSE AND expireDate >= CURDATE()",
+            match_request_ids
+        )
+        return [row["matchRequestId"] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _write_groups(cursor, database, groups):
+        """
+        Record matches and deactivate their requests: pairs go to matched_requests and
+        larger lobbies to matched_groups, each table in one multi-row insert.
+
+        :param groups: List of (gameId, [matchRequestId, ...]).
+        """
+        pairs = [(game_id, ids) for game_id, ids in groups if len(ids) == 2]
+        lobbies = [(game_id, ids) for game_id, ids in groups if len(ids) > 2]
+
+        if pairs:
+            cursor.execute(
+                f"INSERT INTO {database}.matched_requests (matchRequestId1, matchRequestId2, gameId, status) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(pairs))}",
+                [value for game_id, ids in pairs for value in (ids[0], ids[1], game_id, "matched")]
+            )
+        if lobbies:
+            members = []
+            for game_id, ids in lobbies:
+                group_id = str(uuid.uuid4())
+                members.extend((group_id, match_request_id, game_id) for match_request_id in ids)
+            cursor.execute(
+                f"INSERT INTO {database}.matched_groups (groupId, matchRequestId, gameId) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(members))}",
+                [value for member in members for value in member]
+            )
 
+        matched_ids = [match_request_id for _, ids in groups for match_request_id in ids]
+        cursor.execute(
+            f"UPDATE {database}.match_request SET isActive = FALSE "
+            f"WHERE matchRequestId IN ({', '.join(['%s'] * len(matched_ids))})",
+            matched_ids
+        )
@@ -0,0 +1,79 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.utils.igdb_helper import ACCESS_TOKEN, CLIENT_ID, GAME_FIELDS, IGDB_BASE_URL
+from framework.utils.rate_limiter import RateLimiter
+
+
+class IgdbClient:
+    """
+    IGDB games API over one pooled requests.Session. Every call first takes a token
+    from a shared rate limiter, so concurrent callers together stay inside the API's
+    request budget. Connection errors, 429s and 5xx responses are retried with
+    exponential backoff, honouring Retry-After.
+    """
+
+    def __init__(self, base_url=IGDB_BASE_URL, client_id=CLIENT_ID, access_token=ACCESS_TOKEN,
+                 requests_per_second=4, max_connections=8, max_retries=5, backoff_factor=0.5, timeout=30):
+        """
+        :param base_url: API root, e.g. https://api.igdb.com/v4 or a local fake server.
+        :param requests_per_second: Request budget shared by every caller of this client.
+        :param max_connections: Size of the session's connection pool.
+        :param max_retries: Attempts per request beyond the first.
+        :param backoff_factor: Base of the exponential backoff between retries, in seconds.
+        :param timeout: Seconds to wait for a response.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # IGDB queries are POSTs but only read
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Client-ID": client_id,
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "text/plain"
+        })
+
+        self._requests = 0
+
+    def count(self, where=None):
+        """Number of games matching an optional where clause."""
+        body = f"where {where};" if where else ""
+        return self._post("/games/count", body)["count"]
+
+    def fetch_page(self, offset, limit, where=None):
+        """One page of raw game records, in id order."""
+        body = f"fields {GAME_FIELDS}; "
+        if where:
+            body += f"where {where}; "
+        body += f"sort id asc; limit {limit}; offset {offset};"
+        return self._post("/games", body)
+
+    def close(self):
+        self.session.close()
+
+    def stats(self):
+        return {
+            "base_url": self.base_url,
+            "requests": self._requests,
+            "rate_limiter": self.rate_limiter.stats(),
+        }
+
+    def _post(self, path, body):
+        self.rate_limiter.acquire()
+        self._requests += 1
+        response = self.session.post(f"{self.base_url}{path}", data=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,46 @@
+import asyncio
+
+from framework.services.periodic_task import PeriodicTask
+
+
+class IgdbSyncTask(PeriodicTask):
+    """
+    Runs an incremental IGDB sync every interval. The pipeline is blocking I/O, so each
+    sync runs in a worker thread and the event loop keeps serving requests meanwhile.
+
+    Every worker process runs this task, but a sync only proceeds under a database
+    advisory lock: whichever worker takes it syncs, the others skip that run. If the
+    syncing worker dies, its connection and lock go with it and the next run elsewhere
+    takes over.
+    """
+
+    def __init__(self, ingestion, interval=3600, lock_name=None):
+        """
+        :param ingestion: The IgdbIngestion to run.
+        :param interval: Seconds between syncs.
+        :param lock_name: Name of the advisory lock; defaults to one per database.
+        """
+        super().__init__(interval)
+        self.ingestion = ingestion
+        self.lock_name = lock_name or f"{ingestion.database}.igdb_sync"
+
+        self._skipped = 0
+
+    async def run_once(self):
+        return await asyncio.to_thread(self.sync)
+
+    def sync(self):
+        """:return: The sync's counters, or None if another process holds the lock."""
+        with self.ingestion.data_service.advisory_lock(self.lock_name) as acquired:
+            if not acquired:
+                self._skipped += 1
+                return None
+            return self.ingestion.sync()
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "skipped": self._skipped,
+            **self.ingestion.stats(),
+        }
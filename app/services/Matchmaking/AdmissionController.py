@@ -0,0 +1,109 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+
+from framework.exceptions.match_exceptions import MatchmakingOverloadedException
+
+
+class AdmissionController:
+    """
+    Bounds the matchmaking work in flight in this process. An admission covers one
+    initiation from the moment it is accepted until process_matchmaking has handed the
+    request to the matchmaking engine (or the shards), so at most max_concurrent
+    requests are processed at once and at most max_queued more wait for a slot.
+    Anything beyond that is rejected immediately with a Retry-After hint, so a burst of
+    initiations is turned away instead of piling onto the database.
+
+    Requests waiting for partners hold no admission: they cost a queue entry, not work,
+    and how many a user may have is capped on the database count of active requests.
+
+    Work is admitted with admit() when the request is accepted and processed inside
+    running(), which gives the admission back when the body exits. release() gives it
+    back for an initiation that fails before processing.
+    """
+
+    def __init__(self, max_concurrent=64, max_queued=256, retry_after=1):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        # matchRequestIds admitted and not yet released
+        self._admitted = set()
+        self._running = 0
+
+        self._admissions = 0
+        self._released = 0
+        self._rejected_overloaded = 0
+        self._completed = 0
+        self._total_run_ms = 0.0
+        self._total_wait_ms = 0.0
+
+    @property
+    def held(self):
+        return len(self._admitted)
+
+    def admit(self, match_request_id):
+        """
+        Reserve room for one initiation, or raise if the process is at its limit.
+
+        :raises MatchmakingOverloadedException: max_concurrent + max_queued initiations are in flight.
+        """
+        if match_request_id in self._admitted:
+            return
+        if len(self._admitted) >= self.max_concurrent + self.max_queued:
+            self._rejected_overloaded += 1
+            raise MatchmakingOverloadedException(
+                "Matchmaking is at capacity.", self._estimate_retry_after()
+            )
+        self._admitted.add(match_request_id)
+        self._admissions += 1
+
+    def release(self, match_request_id):
+        """Give back an admission; releasing one that is not held does nothing."""
+        if match_request_id in self._admitted:
+            self._admitted.discard(match_request_id)
+            self._released += 1
+
+    @asynccontextmanager
+    async def running(self, match_request_id):
+        """Wait for a processing slot, run the body, then release the admission."""
+        waited = time.perf_counter()
+        try:
+            async with self._slots:
+                started = time.perf_counter()
+                self._total_wait_ms += (started - waited) * 1000
+                self._running += 1
+                try:
+                    yield
+                finally:
+                    self._running -= 1
+                    self._completed += 1
+                    self._total_run_ms += (time.perf_counter() - started) * 1000
+        finally:
+            self.release(match_request_id)
+
+    def stats(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "running": self._running,
+            "held": self.held,
+            "admitted": self._admissions,
+            "released": self._released,
+            "completed": self._completed,
+            "rejected_overloaded": self._rejected_overloaded,
+            "avg_wait_ms": self._total_wait_ms / self._completed if self._completed else 0.0,
+            "avg_run_ms": self._total_run_ms / self._completed if self._completed else 0.0,
+        }
+
+    def _estimate_retry_after(self):
+        """
+        Seconds until the backlog drains: held admissions, max_concurrent at a time, each
+        taking the average run time. Never below retry_after.
+        """
+        if not self._completed:
+            return self.retry_after
+        average_run = self._total_run_ms / self._completed / 1000
+        return max(self.retry_after, math.ceil(average_run * len(self._admitted) / self.max_concurrent))
@@ -0,0 +1,59 @@
+import time
+
+from framework.services.periodic_task import PeriodicTask
+
+
+class ExpirySweeper(PeriodicTask):
+    """
+    Periodically deactivates match requests past their expireDate, in bounded batches,
+    and hands the expired ids to a callback so in-memory matchmaking work for them can
+    be cancelled. Keeping expired rows out of the active set keeps every matchmaking
+    query over that set small.
+    """
+
+    def __init__(self, expire_batch, on_expired, interval=60, batch_size=500, max_batches=20):
+        """
+        :param expire_batch: Coroutine function (batch_size) -> list of expired ids.
+        :param on_expired: Callback invoked with the ids expired by each batch.
+        :param interval: Seconds between sweeps.
+        :param batch_size: Rows expired per statement.
+        :param max_batches: Batches per sweep, bounding how long one sweep can hold the loop busy.
+        """
+        super().__init__(interval)
+        self.expire_batch = expire_batch
+        self.on_expired = on_expired
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+
+        self._runs = 0
+        self._last_reclaimed = 0
+        self._total_reclaimed = 0
+        self._last_run_ms = 0.0
+
+    async def run_once(self):
+        started = time.perf_counter()
+        reclaimed = 0
+        for _ in range(self.max_batches):
+            expired_ids = await self.expire_batch(self.batch_size)
+            if expired_ids:
+                reclaimed += len(expired_ids)
+                self.on_expired(expired_ids)
+            if len(expired_ids) < self.batch_size:
+                break
+
+        self._runs += 1
+        self._last_reclaimed = reclaimed
+        self._total_reclaimed += reclaimed
+        self._last_run_ms = (time.perf_counter() - started) * 1000
+        return reclaimed
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "runs": self._runs,
+            "last_reclaimed": self._last_reclaimed,
+            "total_reclaimed": self._total_reclaimed,
+            "last_run_ms": self._last_run_ms,
+        }
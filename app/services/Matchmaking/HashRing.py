@@ -0,0 +1,51 @@
+import bisect
+import hashlib
+
+
+class HashRing:
+    """
+    Consistent-hash ring mapping keys (gameIds) to nodes (matchmaking shards). Each node
+    is placed on the ring at `replicas` points, so adding or removing a node only moves
+    about 1/n of the keys, spread evenly over the remaining nodes.
+
+    Hashing uses md5 rather than hash(), so every process builds the same ring.
+    """
+
+    def __init__(self, nodes=(), replicas=100):
+        self.replicas = replicas
+        self._nodes = set()
+        # Sorted (point, node) pairs
+        self._ring = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(str(key).encode("utf-8")).digest()[:8], "big")
+
+    @property
+    def nodes(self):
+        return sorted(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def add(self, node):
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for replica in range(self.replicas):
+            bisect.insort(self._ring, (self._hash(f"{node}#{replica}"), node))
+
+    def remove(self, node):
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._ring = [point for point in self._ring if point[1] != node]
+
+    def get_node(self, key):
+        """The node owning key: the first point clockwise from the key's hash."""
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._ring, (self._hash(key),))
+        return self._ring[index % len(self._ring)][1]
@@ -0,0 +1,90 @@
+from app.services.Matchmaking.MatchmakingEngine import MatchmakingEngine
+from app.services.Matchmaking.SkillMatcher import SkillMatcher
+
+
+class MatchmakingBackend:
+    """
+    The database side of matchmaking, as the functions the engine, the scheduler and
+    recovery are built on: atomic claims, batch passes and the snapshot of waiting
+    requests. MatchRequestsResource uses it, and so do the shard worker processes,
+    which need nothing else of the resource.
+    """
+
+    def __init__(self, data_service, async_data_service, config):
+        """
+        :param data_service: MatchRequestDataService whose database is already set up.
+        :param async_data_service: ExecutorDataService running data_service's calls.
+        :param config: Matchmaking config: skill windows, party sizes and recovery_page_size.
+        """
+        self.data_service = data_service
+        self.async_data_service = async_data_service
+
+        # Skill windows shared by the engine's queue and the scheduler's batch pairing
+        self.skill_window = {
+            "base_window": config.get("skill_base_window", 100),
+            "widen_rate": config.get("skill_widen_rate", 10),
+            "max_window": config.get("skill_max_window", 1000),
+        }
+        # Players per match; games not listed use the default
+        self.party_sizes = config.get("party_sizes", {})
+        self.default_party_size = config.get("default_party_size", 2)
+        # Active requests read per query when the queues are rebuilt from the database
+        self.recovery_page_size = config.get("recovery_page_size", 1000)
+
+    def party_size(self, game_id):
+        return self.party_sizes.get(game_id, self.default_party_size)
+
+    def new_skill_matcher(self):
+        return SkillMatcher(**self.skill_window)
+
+    def new_engine(self):
+        return MatchmakingEngine(self.claim_group, self.claim_partner, self.new_skill_matcher(), self.party_size)
+
+    async def claim_group(self, group):
+        """Atomically record a pair or lobby proposed by the matchmaking engine."""
+        return await self.async_data_service.run(
+            self.data_service.claim_group,
+            [request["matchRequestId"] for request in group], group[0]["gameId"]
+        )
+
+    async def claim_partner(self, match_request):
+        """Find and claim a partner in the database, e.g. one queued by another worker."""
+        return await self.async_data_service.run(
+            self.data_service.claim_partner,
+            match_request["matchRequestId"], match_request["userId"], match_request["gameId"],
+            match_request.get("region"), match_request.get("language"), match_request.get("skillRating"),
+            {"window": self.skill_window["base_window"], **self.skill_window}
+        )
+
+    async def match_batch(self, max_batch_size, group_requests, cursor=None):
+        """Run one scheduler pass against the database."""
+        return await self.async_data_service.run(
+            self.data_service.match_active_batch, max_batch_size, group_requests, cursor
+        )
+
+    async def load_active_requests(self, owns=None):
+        """
+        Every request waiting for a match, read page by page in gameId order.
+
+        :param owns: Optional predicate on gameId, e.g. a shard's partition. The games with
+            active requests are listed first, and only the requests of those it accepts are read.
+        """
+        run = self.async_data_service.run
+        if owns is None:
+            game_id_chunks = [None]
+        else:
+            game_ids = [game_id for game_id in await run(self.data_service.get_active_game_ids) if owns(game_id)]
+            game_id_chunks = [game_ids[start:start + self.recovery_page_size]
+                              for start in range(0, len(game_ids), self.recovery_page_size)]
+
+        active_requests = []
+        for game_ids in game_id_chunks:
+            cursor = None
+            while True:
+                rows, cursor = await run(
+                    self.data_service.get_active_match_requests, self.recovery_page_size, cursor, game_ids
+                )
+                active_requests.extend(rows)
+                if cursor is None:
+                    break
+        return active_requests
@@ -0,0 +1,185 @@
+import time
+
+from app.services.Matchmaking.SkillMatcher import SkillMatcher
+
+
+class MatchmakingEngine:
+    """
+    Event-driven matchmaking. Active match requests wait in an in-memory SkillMatcher
+    index; a request is matched the moment enough compatible partners (same game, region
+    and language, different users, ratings within the skill window) are queued to fill
+    the game's party size.
+
+    The in-memory queues are only a fast path. Every match is claimed atomically in
+    the database, so several workers (processes or nodes) can each run an engine
+    without double-matching: a claim that loses a race simply drops the stale
+    candidates. When no local partner is queued for a two-player game, the engine asks
+    the database for one, which finds requests queued by other workers; lobbies that
+    span workers are left to the batch scheduler.
+    """
+
+    # Local candidates tried before falling back to the database, so a queue full of
+    # stale entries cannot turn one submission into an unbounded series of claims.
+    max_claim_attempts = 5
+
+    def __init__(self, claim_group, claim_partner=None, matcher=None, party_size=None):
+        """
+        :param claim_group: Coroutine function (list of match_request rows) -> dict that
+            atomically records a match. Returns {"matched": bool, "available": [ids still claimable],
+            "busy": [ids still active but locked by another claim]}.
+        :param claim_partner: Optional coroutine function (match_request) -> partner row or None
+            that finds and claims a partner directly in the database.
+        :param matcher: The SkillMatcher holding queued requests; a default one if omitted.
+        :param party_size: Function gameId -> players per match; 2 if omitted.
+        """
+        self.claim_group = claim_group
+        self.claim_partner = claim_partner
+        self.matcher = matcher or SkillMatcher()
+        self.party_size = party_size or (lambda game_id: 2)
+
+        self._matches = 0
+        self._lost_claims = 0
+        self._claim_failures = 0
+        self._total_claim_ms = 0.0
+
+    def __contains__(self, match_request_id):
+        return match_request_id in self.matcher
+
+    def __len__(self):
+        return len(self.matcher)
+
+    async def submit(self, match_request):
+        """
+        Offer an active match request to the engine.
+
+        :param match_request: Row from match_request (needs matchRequestId, userId, gameId).
+        :return: The partners' rows if a match was made and recorded, otherwise None
+            (the request is then queued until enough partners arrive, unless it turned
+            out to be no longer claimable).
+        """
+        match_request_id = match_request["matchRequestId"]
+        if match_request_id in self.matcher:
+            return None
+
+        needed = self.party_size(match_request["gameId"]) - 1
+        for _ in range(self.max_claim_attempts):
+            partners = self._take_group(match_request, needed)
+            if partners is None:
+                break
+
+            result = await self._claim([match_request] + partners)
+            if result is None:
+                # The claim errored and wrote nothing; keep everyone for a later attempt
+                for partner in partners:
+                    self._enqueue(partner)
+                self._enqueue(match_request)
+                return None
+            if result["matched"]:
+                self._matches += 1
+                return partners
+
+            self._lost_claims += 1
+            available = result["available"]
+            # Rows locked by another claim (e.g. a scheduler pass) stay queued; that claim
+            # may fail, and if it succeeds its matches are removed from the queues anyway
+            busy = result.get("busy", [])
+            for partner in partners:
+                if partner["matchRequestId"] in available or partner["matchRequestId"] in busy:
+                    self._enqueue(partner)
+            if match_request_id in busy:
+                self._enqueue(match_request)
+                return None
+            if match_request_id not in available:
+                # Matched, cancelled or expired; nothing left to do here
+                return None
+
+        if self.claim_partner is not None and needed == 1:
+            try:
+                partner = await self.claim_partner(match_request)
+            except Exception as e:
+                print(f"Failed to look up a partner for {match_request_id}: {e}")
+                partner = None
+            if partner is not None:
+                # The partner may be queued here too if it was submitted before a restart
+                self.remove(partner["matchRequestId"])
+                self._matches += 1
+                return [partner]
+
+        self._enqueue(match_request)
+        return None
+
+    def restore(self, match_requests):
+        """
+        Queue requests that are already active in the database without trying to match
+        them (the scheduler matches waiting requests in batch). Used after a restart.
+
+        :return: How many requests were newly queued.
+        """
+        restored = 0
+        now = time.monotonic()
+        for match_request in match_requests:
+            if match_request["matchRequestId"] not in self.matcher:
+                # Keep the time already waited, so skill windows keep widening across restarts
+                self._enqueue(match_request, now - (match_request.get("waitSeconds") or 0))
+                restored += 1
+        return restored
+
+    def reconcile(self, active_requests, loaded_since=None):
+        """
+        Make the queues mirror the set of active requests in the database: queue the ones
+        missing here and drop the ones that were matched, cancelled or expired elsewhere.
+
+        :param loaded_since: time.monotonic() when the active requests started loading.
+            Requests queued after that are kept even if missing, as the load may have
+            passed them before they were activated.
+        :return: (number queued, number dropped)
+        """
+        active_ids = {match_request["matchRequestId"] for match_request in active_requests}
+        stale_ids = [
+            match_request_id for match_request_id in self.matcher
+            if match_request_id not in active_ids
+            and (loaded_since is None or self.matcher.get(match_request_id)["enqueuedAt"] < loaded_since)
+        ]
+        for match_request_id in stale_ids:
+            self.remove(match_request_id)
+        return self.restore(active_requests), len(stale_ids)
+
+    def remove(self, match_request_id):
+        """Drop a request from its queue (e.g. cancelled or expired). Returns the entry, if queued."""
+        return self.matcher.remove(match_request_id)
+
+    def stats(self):
+        """Counters for monitoring."""
+        return {
+            "queued": len(self.matcher),
+            **self.matcher.stats(),
+            "matches": self._matches,
+            "lost_claims": self._lost_claims,
+            "claim_failures": self._claim_failures,
+            "avg_claim_ms": self._total_claim_ms / self._matches if self._matches else 0.0,
+        }
+
+    async def _claim(self, group):
+        """Run claim_group, returning None (and counting a failure) if it raised."""
+        started = time.perf_counter()
+        try:
+            return await self.claim_group(group)
+        except Exception as e:
+            self._claim_failures += 1
+            print(f"Failed to claim match {' / '.join(request['matchRequestId'] for request in group)}: {e}")
+            return None
+        finally:
+            self._total_claim_ms += (time.perf_counter() - started) * 1000
+
+    def _enqueue(self, match_request, enqueued_at=None):
+        entry = dict(match_request)
+        if "enqueuedAt" not in entry:
+            entry["enqueuedAt"] = time.monotonic() if enqueued_at is None else enqueued_at
+        self.matcher.add(entry)
+
+    def _take_group(self, match_request, count):
+        """Remove and return count compatible queued partners, or None if there are not enough."""
+        partners = self.matcher.find_group(match_request, count)
+        if len(partners) < count:
+            return None
+        return [self.matcher.remove(partner["matchRequestId"]) for partner in partners]
@@ -0,0 +1,61 @@
+import time
+
+from framework.services.periodic_task import PeriodicTask
+
+
+class MatchmakingRecovery(PeriodicTask):
+    """
+    Keeps the in-memory matchmaking queues recoverable. A request is marked active in
+    the database before it is queued, so the database is the durable checkpoint of the
+    queue. On startup recover() reloads every waiting request with one query; after that
+    each tick reconciles the queues with the database, picking up requests orphaned by a
+    crashed worker and dropping ones that were resolved elsewhere.
+    """
+
+    def __init__(self, engine, load_active_requests, interval=30):
+        """
+        :param engine: The MatchmakingEngine whose queues are rebuilt.
+        :param load_active_requests: Coroutine function returning all waiting match_request rows.
+            Requests queued while it runs are kept, since it may have read past them.
+        :param interval: Seconds between reconciliations.
+        """
+        super().__init__(interval)
+        self.engine = engine
+        self.load_active_requests = load_active_requests
+
+        self._recovered = 0
+        self._runs = 0
+        self._queued = 0
+        self._dropped = 0
+        self._last_run_ms = 0.0
+
+    async def recover(self):
+        """Reload the queues after a restart, then keep reconciling every interval."""
+        queued, _ = await self.run_once()
+        self._recovered = queued
+        print(f"Recovered {queued} waiting match requests into the matchmaking queues")
+        self.start(delay=self.interval)
+        return queued
+
+    async def run_once(self):
+        started = time.perf_counter()
+        loaded_since = time.monotonic()
+        active_requests = await self.load_active_requests()
+        queued, dropped = self.engine.reconcile(active_requests, loaded_since)
+        self._last_run_ms = (time.perf_counter() - started) * 1000
+
+        self._runs += 1
+        self._queued += queued
+        self._dropped += dropped
+        return queued, dropped
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "recovered_on_startup": self._recovered,
+            "runs": self._runs,
+            "queued": self._queued,
+            "dropped": self._dropped,
+            "last_run_ms": self._last_run_ms,
+        }
@@ -0,0 +1,89 @@
+import time
+
+from app.services.Matchmaking.SkillMatcher import SkillMatcher
+from framework.services.periodic_task import PeriodicTask
+
+
+class MatchmakingScheduler(PeriodicTask):
+    """
+    One matchmaking pass per tick for the whole process: load a batch of claimable active
+    requests in one query, group them into pairs and lobbies in one pass, and write every
+    match in one batched transaction. Successive ticks rotate through the active requests
+    game by game, so no game waits behind a backlog of others. This catches anything the
+    event-driven engine could not match on arrival (requests from other workers, recovered
+    requests) at O(1) queries per tick.
+    """
+
+    def __init__(self, match_batch, on_matched, interval=2, max_batch_size=1000, matcher_factory=SkillMatcher,
+                 party_size=None):
+        """
+        :param match_batch: Coroutine function (max_batch_size, group_requests, cursor) ->
+            (groups (lists of rows) that were committed, cursor for the next tick).
+        :param on_matched: Callback invoked with the committed groups.
+        :param interval: Seconds between ticks.
+        :param max_batch_size: Most active requests loaded per tick.
+        :param matcher_factory: Zero-argument callable returning an empty SkillMatcher, so
+            batch grouping uses the same skill windows as the engine.
+        :param party_size: Function gameId -> players per match; 2 if omitted.
+        """
+        super().__init__(interval)
+        self.match_batch = match_batch
+        self.on_matched = on_matched
+        self.max_batch_size = max_batch_size
+        self.matcher_factory = matcher_factory
+        self.party_size = party_size or (lambda game_id: 2)
+        # (gameId, activatedAt, matchRequestId) the next tick resumes after, so ticks rotate
+        # through every request
+        self._cursor = None
+
+        self._ticks = 0
+        self._total_groups = 0
+        self._total_tick_ms = 0.0
+        self._last_tick_ms = 0.0
+        self._last_groups = 0
+
+    async def run_once(self):
+        started = time.perf_counter()
+        groups, self._cursor = await self.match_batch(self.max_batch_size, self.group_requests, self._cursor)
+        self._last_tick_ms = (time.perf_counter() - started) * 1000
+
+        self._ticks += 1
+        self._total_tick_ms += self._last_tick_ms
+        self._last_groups = len(groups)
+        self._total_groups += len(groups)
+
+        if groups:
+            self.on_matched(groups)
+        return groups
+
+    def group_requests(self, match_requests):
+        """
+        Fill pairs and lobbies of compatible requests (same game, region and language,
+        different users, ratings within the skill window) in one pass. Each request's
+        window is widened by how long it has been waiting, so long waits eventually match
+        across wider skill gaps.
+
+        :param match_requests: Rows with matchRequestId, userId, gameId and optionally
+            skillRating, region, language and waitSeconds.
+        :return: List of groups, each a list of party_size(gameId) rows. Requests that
+            could not fill a group are left out.
+        """
+        matcher = self.matcher_factory()
+        now = time.monotonic()
+        for request in match_requests:
+            entry = dict(request)
+            entry["enqueuedAt"] = now - (request.get("waitSeconds") or 0)
+            matcher.add(entry)
+        return matcher.group_all(self.party_size, now)
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "max_batch_size": self.max_batch_size,
+            "ticks": self._ticks,
+            "last_tick_ms": self._last_tick_ms,
+            "avg_tick_ms": self._total_tick_ms / self._ticks if self._ticks else 0.0,
+            "last_groups": self._last_groups,
+            "total_groups": self._total_groups,
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import multiprocessing
+import threading
+
+from app.services.Matchmaking.HashRing import HashRing
+from app.services.Matchmaking.MatchmakingBackend import MatchmakingBackend
+from app.services.Matchmaking.MatchmakingRecovery import MatchmakingRecovery
+from framework.services.periodic_task import PeriodicTask
+
+
+class MatchmakingShards(PeriodicTask):
+    """
+    Runs matchmaking in a pool of worker processes instead of the API process. Each
+    worker owns the gameIds that a consistent-hash ring assigns to it and runs its own
+    MatchmakingEngine, event loop and connection pool, so matchmaking throughput grows
+    with the number of cores.
+
+    submit() routes a request to its owning shard over a multiprocessing queue; matches
+    come back over a shared queue and are handed to on_matched on the API process's
+    event loop. Adding or removing a worker changes the ring and tells every shard to
+    rebalance: each reconciles its queues against the database, dropping games it no
+    longer owns and loading the ones it gained. While that happens two shards may hold
+    the same request, which is safe because every match is claimed atomically.
+
+    Each tick replaces workers that died; the replacement recovers its partition from
+    the database.
+    """
+
+    def __init__(self, workers, config, on_matched, interval=5):
+        """
+        :param workers: Number of shard processes to start.
+        :param config: Matchmaking config each shard builds its engine and recovery from.
+        :param on_matched: Callback invoked with a list of committed groups (lists of rows).
+        :param interval: Seconds between worker health checks.
+        """
+        super().__init__(interval)
+        self.workers = workers
+        self.config = config
+        self.on_matched = on_matched
+        self.ring = HashRing()
+
+        # Spawned (not forked) workers do not inherit the API process's sockets and threads
+        self._context = multiprocessing.get_context("spawn")
+        self._outbox = None
+        self._reader = None
+        self._loop = None
+        # shard id -> (process, inbox)
+        self._shards = {}
+        self._next_shard = 0
+
+        self._routed = {}
+        self._matches = {}
+        self._restarts = 0
+        self._shard_stats = {}
+
+    def start(self, delay=0):
+        """Spawn the workers and start watching them; called on the event loop."""
+        if self._outbox is None:
+            self._loop = asyncio.get_running_loop()
+            self._outbox = self._context.Queue()
+            self._reader = threading.Thread(target=self._read_outbox, name="MatchmakingShardsReader", daemon=True)
+            self._reader.start()
+            for _ in range(self.workers):
+                self.add_worker()
+        super().start(delay=delay or self.interval)
+
+    async def stop(self):
+        await super().stop()
+        for shard_id in list(self._shards):
+            await self._stop_worker(shard_id)
+        if self._outbox is not None:
+            self._outbox.put(None)
+            self._outbox = None
+
+    def submit(self, match_request):
+        """Hand an active request to the shard that owns its game."""
+        shard_id = self.ring.get_node(match_request["gameId"])
+        if shard_id is None:
+            raise RuntimeError("No matchmaking shards are running.")
+        self._shards[shard_id][1].put(("submit", match_request))
+        self._routed[shard_id] = self._routed.get(shard_id, 0) + 1
+
+    def remove(self, match_request_id):
+        """Drop a request from whichever shard has it queued."""
+        self._broadcast(("remove", match_request_id))
+
+    def add_worker(self):
+        """Start one more shard and move its share of the gameIds to it."""
+        shard_id = f"shard-{self._next_shard}"
+        self._next_shard += 1
+        self.ring.add(shard_id)
+        self._spawn(shard_id)
+        self._broadcast(("rebalance", self.ring.nodes), exclude=shard_id)
+        return shard_id
+
+    async def remove_worker(self, shard_id):
+        """Stop a shard and hand its gameIds to the remaining ones."""
+        if shard_id not in self._shards:
+            return False
+        self.ring.remove(shard_id)
+        await self._stop_worker(shard_id)
+        self._broadcast(("rebalance", self.ring.nodes))
+        return True
+
+    async def run_once(self):
+        for shard_id, (process, _) in list(self._shards.items()):
+            if not process.is_alive():
+                print(f"Matchmaking shard {shard_id} exited with {process.exitcode}; restarting it")
+                self._restarts += 1
+                self._spawn(shard_id)
+        self._broadcast(("stats", None))
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "workers": len(self._shards),
+            "ring": self.ring.nodes,
+            "restarts": self._restarts,
+            "shards": {
+                shard_id: {
+                    "alive": process.is_alive(),
+                    "routed": self._routed.get(shard_id, 0),
+                    "matches": self._matches.get(shard_id, 0),
+                    **self._shard_stats.get(shard_id, {}),
+                }
+                for shard_id, (process, _) in self._shards.items()
+            },
+        }
+
+    def _spawn(self, shard_id):
+        inbox = self._context.Queue()
+        process = self._context.Process(
+            target=run_shard, args=(shard_id, self.ring.nodes, self.config, inbox, self._outbox),
+            name=f"matchmaking-{shard_id}", daemon=True
+        )
+        process.start()
+        self._shards[shard_id] = (process, inbox)
+
+    async def _stop_worker(self, shard_id):
+        process, inbox = self._shards.pop(shard_id)
+        inbox.put(("stop", None))
+        await asyncio.get_running_loop().run_in_executor(None, process.join, 10)
+        if process.is_alive():
+            process.terminate()
+
+    def _broadcast(self, message, exclude=None):
+        for shard_id, (_, inbox) in self._shards.items():
+            if shard_id != exclude:
+                inbox.put(message)
+
+    def _read_outbox(self):
+        """Reader thread: forward worker messages to the event loop."""
+        outbox = self._outbox
+        while True:
+            message = outbox.get()
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._handle, *message)
+
+    def _handle(self, kind, shard_id, payload):
+        if kind == "matched":
+            self._matches[shard_id] = self._matches.get(shard_id, 0) + 1
+            self.on_matched([payload])
+        elif kind == "stats":
+            self._shard_stats[shard_id] = payload
+
+
+def run_shard(shard_id, nodes, config, inbox, outbox):
+    """Entry point of a shard process."""
+    asyncio.run(_serve_shard(shard_id, nodes, config, inbox, outbox))
+
+
+async def _serve_shard(shard_id, nodes, config, inbox, outbox):
+    # Imported here: the service factory imports the resources, which import this module
+    from app.services.service_factory import ServiceFactory
+    from framework.services.DataAccess.ExecutorDataService import ExecutorDataService
+
+    # Only what matching needs: the API process owns the schema, caches and admission control
+    data_service = ServiceFactory.get_service("MatchResourceDataService")
+    data_service.context["database"] = "Game"
+    async_data_service = ExecutorDataService(data_service)
+    backend = MatchmakingBackend(data_service, async_data_service, config)
+    engine = backend.new_engine()
+    ring = HashRing(nodes)
+
+    async def load_owned_requests():
+        # The ring reads the current partition, so a rebalance takes effect on the next load
+        return await backend.load_active_requests(owns=lambda game_id: ring.get_node(game_id) == shard_id)
+
+    async def submit(match_request):
+        partner_requests = await engine.submit(match_request)
+        if partner_requests:
+            outbox.put(("matched", shard_id, [match_request] + partner_requests))
+
+    recovery = MatchmakingRecovery(engine, load_owned_requests, interval=config.get("checkpoint_interval", 30))
+    await recovery.recover()
+
+    loop = asyncio.get_running_loop()
+    pending = set()
+    try:
+        while True:
+            kind, payload = await loop.run_in_executor(None, inbox.get)
+            if kind == "submit":
+                task = asyncio.create_task(submit(payload))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            elif kind == "remove":
+                engine.remove(payload)
+            elif kind == "rebalance":
+                ring = HashRing(payload)
+                await recovery.run_once()
+            elif kind == "stats":
+                outbox.put(("stats", shard_id, {"engine": engine.stats(), "recovery": recovery.stats()}))
+            elif kind == "stop":
+                break
+    finally:
+        await recovery.stop()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        async_data_service.shutdown()
+        data_service.shutdown()
@@ -0,0 +1,51 @@
+import asyncio
+
+
+class NotificationHub:
+    """
+    In-process publish/subscribe of match status changes, keyed by matchRequestId.
+    Status endpoints subscribe and park until the matchmaking code publishes a new
+    status for the request, so waiting clients cost no queries.
+    """
+
+    def __init__(self):
+        # matchRequestId -> set of futures waiting for the next status
+        self._waiters = {}
+        self._published = 0
+        self._delivered = 0
+
+    def subscribe(self, match_request_id) -> asyncio.Future:
+        """
+        Register interest in the next status published for a request. Subscribe before
+        reading the current status so a change in between is not missed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(match_request_id, set()).add(future)
+        return future
+
+    def unsubscribe(self, match_request_id, future):
+        waiters = self._waiters.get(match_request_id)
+        if waiters is not None:
+            waiters.discard(future)
+            if not waiters:
+                del self._waiters[match_request_id]
+
+    def watched(self):
+        """The requests someone is currently waiting on."""
+        return list(self._waiters)
+
+    def publish(self, match_request_id, status):
+        """Wake everyone waiting on the request with its new status."""
+        self._published += 1
+        for future in self._waiters.pop(match_request_id, ()):
+            if not future.done():
+                future.set_result(status)
+                self._delivered += 1
+
+    def stats(self):
+        return {
+            "watched_requests": len(self._waiters),
+            "waiters": sum(len(waiters) for waiters in self._waiters.values()),
+            "published": self._published,
+            "delivered": self._delivered,
+        }
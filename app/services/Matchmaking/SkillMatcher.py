@@ -0,0 +1,244 @@
+import bisect
+import itertools
+import time
+from collections import OrderedDict
+
+
+class _Bucket:
+    """Queued requests sharing (gameId, region, language)."""
+
+    def __init__(self):
+        # Sorted (skillRating, seq, matchRequestId) for rated requests: bisect finds the
+        # closest skill in O(log n).
+        self.rated = []
+        # matchRequestId -> entry for requests without a rating, oldest first
+        self.unrated = OrderedDict()
+
+    def __len__(self):
+        return len(self.rated) + len(self.unrated)
+
+
+class SkillMatcher:
+    """
+    In-memory index of queued match requests for attribute-aware matchmaking.
+
+    Requests only match within the same (gameId, region, language) bucket and never with
+    the same user. Within a bucket, rated requests are kept sorted by skillRating. Rated
+    requests are compatible when the spread of their ratings is no more than the widest
+    of their skill windows. A window starts at base_window and grows by widen_rate per
+    second of waiting, up to max_window. A request without a rating matches any rating.
+    """
+
+    def __init__(self, base_window=100, widen_rate=10, max_window=1000):
+        self.base_window = base_window
+        self.widen_rate = widen_rate
+        self.max_window = max_window
+
+        self._buckets = {}
+        # matchRequestId -> entry
+        self._entries = {}
+        self._seq = itertools.count()
+
+    def __contains__(self, match_request_id):
+        return match_request_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def get(self, match_request_id):
+        """The queued entry of a request, or None."""
+        return self._entries.get(match_request_id)
+
+    @staticmethod
+    def bucket_key(match_request):
+        return match_request["gameId"], match_request.get("region"), match_request.get("language")
+
+    def window(self, entry, now):
+        """Acceptable skill difference for an entry that has waited since its enqueuedAt."""
+        waited = max(now - entry["enqueuedAt"], 0)
+        return min(self.base_window + self.widen_rate * waited, self.max_window)
+
+    def add(self, entry):
+        """Index an entry. It must carry matchRequestId, userId, gameId and enqueuedAt."""
+        bucket = self._buckets.setdefault(self.bucket_key(entry), _Bucket())
+        if entry.get("skillRating") is None:
+            bucket.unrated[entry["matchRequestId"]] = entry
+        else:
+            entry["_sortKey"] = (entry["skillRating"], next(self._seq), entry["matchRequestId"])
+            bisect.insort(bucket.rated, entry["_sortKey"])
+        self._entries[entry["matchRequestId"]] = entry
+
+    def remove(self, match_request_id):
+        entry = self._entries.pop(match_request_id, None)
+        if entry is None:
+            return None
+
+        key = self.bucket_key(entry)
+        bucket = self._buckets[key]
+        if entry.get("skillRating") is None:
+            bucket.unrated.pop(match_request_id, None)
+        else:
+            sort_key = entry.pop("_sortKey")
+            index = bisect.bisect_left(bucket.rated, sort_key)
+            if index < len(bucket.rated) and bucket.rated[index] == sort_key:
+                del bucket.rated[index]
+        if not bucket:
+            del self._buckets[key]
+        return entry
+
+    def find_group(self, request, count, now=None):
+        """
+        Return up to count queued partners for request without removing them. Partners
+        come from the request's bucket, belong to distinct users and keep the group's
+        rating spread within the widest skill window among its members.
+
+        A rated request takes the closest compatible ratings, topping up with the oldest
+        unrated requests; an unrated request takes the oldest unrated requests, topping
+        up with rated requests nearest the middle of the bucket.
+        """
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(self.bucket_key(request))
+        if not bucket:
+            return []
+
+        users = {request["userId"]}
+        skill = request.get("skillRating")
+        if skill is None:
+            group = self._oldest_unrated(bucket, users, count)
+            if len(group) < count and bucket.rated:
+                middle = bucket.rated[len(bucket.rated) // 2][0]
+                group += self._nearest_rated(bucket, None, middle, users, count - len(group), now)
+            return group
+
+        group = self._nearest_rated(bucket, request, skill, users, count, now)
+        if len(group) < count:
+            group += self._oldest_unrated(bucket, users, count - len(group))
+        return group
+
+    def group_all(self, party_size, now=None):
+        """
+        Form every lobby that is currently possible in one pass per bucket and remove the
+        grouped requests from the index. Used for batch matching, where waiting requests'
+        windows have widened since they were queued.
+
+        :param party_size: Function gameId -> players per match.
+        :return: List of groups, each a list of entries.
+        """
+        now = time.monotonic() if now is None else now
+        groups = []
+
+        for key in list(self._buckets):
+            bucket = self._buckets[key]
+            size = party_size(key[0])
+
+            # Walk the bucket in rating order, growing a run of distinct users whose spread
+            # fits the widest window in the run; anything that falls out of the run is left
+            # for the unrated pass. Each entry enters and leaves the run once, so this is linear.
+            leftover = []
+            run = []
+            for sort_key in bucket.rated:
+                entry = self._entries[sort_key[2]]
+                if any(member["userId"] == entry["userId"] for member in run):
+                    leftover.append(entry)
+                    continue
+                while run and not self._fits(run, entry, now):
+                    leftover.append(run.pop(0))
+                run.append(entry)
+                if len(run) == size:
+                    groups.append(run)
+                    run = []
+            leftover += run
+
+            # Unrated requests form lobbies in arrival order, topped up with leftover rated requests
+            waiting = list(bucket.unrated.values()) + leftover if bucket.unrated else []
+            run = []
+            deferred = []
+            for entry in waiting:
+                if any(member["userId"] == entry["userId"] for member in run):
+                    deferred.append(entry)
+                    continue
+                if not self._fits(run, entry, now):
+                    continue
+                run.append(entry)
+                if len(run) == size:
+                    groups.append(run)
+                    run = []
+                    # A deferred duplicate can start the next lobby
+                    waiting.extend(deferred)
+                    deferred = []
+
+        for group in groups:
+            for entry in group:
+                self.remove(entry["matchRequestId"])
+        return groups
+
+    def stats(self):
+        return {
+            "buckets": len(self._buckets),
+            "largest_bucket": max((len(bucket) for bucket in self._buckets.values()), default=0),
+        }
+
+    def _fits(self, group, entry, now):
+        """Whether the rated members of group plus entry stay within their widest window."""
+        rated = [member for member in group + [entry] if member.get("skillRating") is not None]
+        if len(rated) < 2:
+            return True
+        skills = [member["skillRating"] for member in rated]
+        return max(skills) - min(skills) <= max(self.window(member, now) for member in rated)
+
+    @staticmethod
+    def _oldest_unrated(bucket, users, count):
+        """Take up to count unrated entries, oldest first, from users not already in users."""
+        group = []
+        for entry in bucket.unrated.values():
+            if len(group) == count:
+                break
+            if entry["userId"] not in users:
+                users.add(entry["userId"])
+                group.append(entry)
+        return group
+
+    def _nearest_rated(self, bucket, request, skill, users, count, now):
+        """
+        Walk outwards from skill in rating order, taking up to count entries from users
+        not already in users. With request None any rating is acceptable; otherwise the
+        group's spread must fit the widest window among its members, and the walk stops
+        once the difference exceeds max_window, since nothing further away can fit.
+        """
+        rated = bucket.rated
+        right = bisect.bisect_left(rated, (skill,))
+        left = right - 1
+        group = []
+        if request is not None:
+            low = high = skill
+            widest = self.window(request, now) if "enqueuedAt" in request else self.base_window
+
+        while len(group) < count and (left >= 0 or right < len(rated)):
+            left_difference = skill - rated[left][0] if left >= 0 else None
+            right_difference = rated[right][0] - skill if right < len(rated) else None
+            if right_difference is None or (left_difference is not None and left_difference <= right_difference):
+                difference, sort_key = left_difference, rated[left]
+                left -= 1
+            else:
+                difference, sort_key = right_difference, rated[right]
+                right += 1
+
+            if request is not None and difference > self.max_window:
+                break
+
+            candidate = self._entries[sort_key[2]]
+            if candidate["userId"] in users:
+                continue
+            if request is not None:
+                candidate_low = min(low, candidate["skillRating"])
+                candidate_high = max(high, candidate["skillRating"])
+                candidate_widest = max(widest, self.window(candidate, now))
+                if candidate_high - candidate_low > candidate_widest:
+                    continue
+                low, high, widest = candidate_low, candidate_high, candidate_widest
+            users.add(candidate["userId"])
+            group.append(candidate)
+        return group
@@ -0,0 +1,52 @@
+import time
+
+from framework.services.periodic_task import PeriodicTask
+
+
+class StatusPoller(PeriodicTask):
+    """
+    Catches status changes made by other workers for the requests this process has
+    clients waiting on. Every interval, one batched query finds which watched requests
+    are no longer active; only those are reloaded and published, which wakes their
+    waiters. The cost is one query per tick however many clients are parked.
+    """
+
+    def __init__(self, notification_hub, find_settled, on_settled, interval=5):
+        """
+        :param notification_hub: NotificationHub whose watched requests are polled.
+        :param find_settled: Coroutine function (ids) -> the ids that are no longer active.
+        :param on_settled: Coroutine function (id) that reloads and publishes a request's status.
+        :param interval: Seconds between polls.
+        """
+        super().__init__(interval)
+        self.notification_hub = notification_hub
+        self.find_settled = find_settled
+        self.on_settled = on_settled
+
+        self._runs = 0
+        self._settled = 0
+        self._last_watched = 0
+        self._last_run_ms = 0.0
+
+    async def run_once(self):
+        started = time.perf_counter()
+        watched = self.notification_hub.watched()
+        settled = await self.find_settled(watched) if watched else []
+        for match_request_id in settled:
+            await self.on_settled(match_request_id)
+
+        self._runs += 1
+        self._settled += len(settled)
+        self._last_watched = len(watched)
+        self._last_run_ms = (time.perf_counter() - started) * 1000
+        return settled
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "runs": self._runs,
+            "settled": self._settled,
+            "last_watched": self._last_watched,
+            "last_run_ms": self._last_run_ms,
+        }
@@ -0,0 +1,54 @@
+import time
+
+from framework.services.periodic_task import PeriodicTask
+
+
+class TitleIndexRefresher(PeriodicTask):
+    """
+    Keeps the in-memory title indexes of a worker serving /games from the database in
+    step with writes made by other workers. Every interval it compares the catalog
+    version every worker shares with the one the indexes were built for; only when it
+    has moved are the titles reloaded and fresh indexes built and handed over to be
+    swapped in. Readers keep using the previous indexes until then.
+    """
+
+    def __init__(self, load_version, rebuild, indexed_version=None, interval=30):
+        """
+        :param load_version: Coroutine function returning the current catalog version tag.
+        :param rebuild: Coroutine function that reloads the titles and swaps in new indexes.
+        :param indexed_version: Version the initial indexes were built for; None rebuilds on the first run.
+        :param interval: Seconds between version checks.
+        """
+        super().__init__(interval)
+        self.load_version = load_version
+        self.rebuild = rebuild
+        self.indexed_version = indexed_version
+
+        self._runs = 0
+        self._rebuilds = 0
+        self._last_rebuild_ms = 0.0
+
+    async def run_once(self):
+        self._runs += 1
+        version = await self.load_version()
+        if version == self.indexed_version:
+            return False
+
+        started = time.perf_counter()
+        # The titles are read after the version, so they are at least as new as the one recorded
+        await self.rebuild()
+        self.indexed_version = version
+
+        self._rebuilds += 1
+        self._last_rebuild_ms = (time.perf_counter() - started) * 1000
+        return True
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "indexed_version": self.indexed_version,
+            "runs": self._runs,
+            "rebuilds": self._rebuilds,
+            "last_rebuild_ms": self._last_rebuild_ms,
+        }
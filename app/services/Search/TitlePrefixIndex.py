@@ -0,0 +1,156 @@
+import bisect
+import heapq
+import threading
+
+from app.services.Search.TitleSearchIndex import tokenize
+
+
+class TitlePrefixIndex:
+    """
+    Sorted-array prefix index over game titles for type-ahead.
+
+    Each title is normalized (lowercased, punctuation collapsed to single spaces) and
+    stored twice over: once as a whole, and once per later word as the title suffix
+    starting at that word, so "mar" finds both "Mario Kart" and "Super Mario Bros".
+    Entries are (key, gameId) tuples kept sorted, so a lookup is one binary search
+    followed by a scan of at most a few dozen neighbours, however large the catalog.
+
+    Whole-title matches are returned before word matches; each group is alphabetical.
+    """
+
+    def __init__(self, max_limit=50):
+        """
+        :param max_limit: Most suggestions a lookup returns.
+        """
+        self.max_limit = max_limit
+
+        # gameId -> title
+        self._titles = {}
+        # Sorted (normalized title, gameId)
+        self._title_keys = []
+        # Sorted (normalized title suffix starting at a word, gameId)
+        self._word_keys = []
+        # Guards the key lists while suggest() reads them; held only for in-place edits
+        # and reference swaps
+        self._lock = threading.Lock()
+        # Serializes writers, so a bulk write can build its lists outside _lock
+        self._write_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._titles)
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(tokenize(text))
+
+    @classmethod
+    def _keys(cls, title):
+        words = tokenize(title)
+        return " ".join(words), [" ".join(words[i:]) for i in range(1, len(words))]
+
+    def build(self, games):
+        """Replace the index contents with (gameId, title) pairs."""
+        titles = {game_id: title or "" for game_id, title in games}
+        title_keys = []
+        word_keys = []
+        for game_id, title in titles.items():
+            key, suffixes = self._keys(title)
+            title_keys.append((key, game_id))
+            word_keys.extend((suffix, game_id) for suffix in suffixes)
+        title_keys.sort()
+        word_keys.sort()
+        with self._write_lock, self._lock:
+            self._titles = titles
+            self._title_keys = title_keys
+            self._word_keys = word_keys
+
+    def add(self, game_id, title):
+        """Index a game, replacing what was indexed for it before."""
+        with self._write_lock, self._lock:
+            self._remove(game_id)
+            title = title or ""
+            self._titles[game_id] = title
+            key, suffixes = self._keys(title)
+            bisect.insort(self._title_keys, (key, game_id))
+            for suffix in suffixes:
+                bisect.insort(self._word_keys, (suffix, game_id))
+
+    def add_many(self, games):
+        """
+        Index many (gameId, title) pairs at once: one filtering pass and one merge rather
+        than an insertion per key, which keeps bulk writes such as ingestion linear. As in
+        build(), the new lists are made outside the read lock and only swapped in under it,
+        so suggest() never waits on the merge.
+        """
+        titles = {game_id: title or "" for game_id, title in games}
+        if not titles:
+            return
+        title_keys = []
+        word_keys = []
+        for game_id, title in titles.items():
+            key, suffixes = self._keys(title)
+            title_keys.append((key, game_id))
+            word_keys.extend((suffix, game_id) for suffix in suffixes)
+        title_keys.sort()
+        word_keys.sort()
+        with self._write_lock:
+            # No other writer runs meanwhile, so the current lists stay as read here
+            merged_titles = dict(self._titles)
+            merged_titles.update(titles)
+            merged_title_keys = list(heapq.merge(
+                (entry for entry in self._title_keys if entry[1] not in titles), title_keys
+            ))
+            merged_word_keys = list(heapq.merge(
+                (entry for entry in self._word_keys if entry[1] not in titles), word_keys
+            ))
+            with self._lock:
+                self._titles = merged_titles
+                self._title_keys = merged_title_keys
+                self._word_keys = merged_word_keys
+
+    def remove(self, game_id):
+        with self._write_lock, self._lock:
+            self._remove(game_id)
+
+    def suggest(self, prefix, limit=10):
+        """
+        :return: Up to limit (gameId, title) pairs whose title, or a word in it, starts with prefix.
+        """
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+        limit = max(1, min(limit, self.max_limit))
+
+        suggestions = {}
+        with self._lock:
+            for keys in (self._title_keys, self._word_keys):
+                i = bisect.bisect_left(keys, (prefix,))
+                while i < len(keys) and len(suggestions) < limit:
+                    key, game_id = keys[i]
+                    if not key.startswith(prefix):
+                        break
+                    suggestions.setdefault(game_id, self._titles[game_id])
+                    i += 1
+        return list(suggestions.items())
+
+    def stats(self):
+        return {
+            "games": len(self._titles),
+            "title_keys": len(self._title_keys),
+            "word_keys": len(self._word_keys),
+        }
+
+    def _remove(self, game_id):
+        title = self._titles.pop(game_id, None)
+        if title is None:
+            return
+        key, suffixes = self._keys(title)
+        self._discard(self._title_keys, (key, game_id))
+        for suffix in suffixes:
+            self._discard(self._word_keys, (suffix, game_id))
+
+    @staticmethod
+    def _discard(keys, entry):
+        i = bisect.bisect_left(keys, entry)
+        if i < len(keys) and keys[i] == entry:
+            del keys[i]
@@ -0,0 +1,203 @@
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercased word tokens of text."""
+    return _TOKEN.findall((text or "").lower())
+
+
+def trigrams(token):
+    """
+    Trigrams of a token padded like pg_trgm ("  ab " for "ab"), so short tokens and
+    prefixes still produce trigrams.
+    """
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleSearchIndex:
+    """
+    In-memory full-text index over game titles.
+
+    Titles are split into tokens; an inverted index maps each token to the games whose
+    title contains it, and a trigram index maps each trigram to the distinct tokens
+    containing it. A query token is resolved against the token vocabulary, not the
+    catalog. Exact, prefix and substring matches are exhaustive: prefixes come from a
+    sorted copy of the vocabulary, substrings of three or more characters from the
+    tokens sharing every trigram of the query token. Only the typo-tolerant fuzzy
+    fallback, tokens whose trigrams are similar enough, is capped. The cost of a search
+    therefore depends on the vocabulary and the number of hits, not on how many games
+    exist.
+
+    Every query token must match for a game to be returned. Games are ranked by how
+    well their tokens match (exact > prefix > substring > fuzzy), then by title length.
+    """
+
+    # Weights of the ways a query token can match a title token
+    EXACT = 1.0
+    PREFIX = 0.9
+    SUBSTRING = 0.75
+    FUZZY = 0.6
+
+    def __init__(self, min_similarity=0.3, max_fuzzy_tokens=50):
+        """
+        :param min_similarity: Trigram Jaccard similarity a fuzzy token match needs.
+        :param max_fuzzy_tokens: Most fuzzy token matches kept per query token.
+        """
+        self.min_similarity = min_similarity
+        self.max_fuzzy_tokens = max_fuzzy_tokens
+
+        # gameId -> title
+        self._titles = {}
+        # token -> set of gameIds
+        self._postings = {}
+        # trigram -> set of tokens
+        self._trigrams = {}
+        # The keys of _postings, sorted for prefix lookups
+        self._vocabulary = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __contains__(self, game_id):
+        return game_id in self._titles
+
+    def build(self, games):
+        """Replace the index contents with (gameId, title) pairs."""
+        with self._lock:
+            self._titles.clear()
+            self._postings.clear()
+            self._trigrams.clear()
+            self._vocabulary = []
+            for game_id, title in games:
+                self._index(game_id, title)
+            self._vocabulary = sorted(self._postings)
+
+    def add(self, game_id, title):
+        """Index a game, replacing what was indexed for it before."""
+        with self._lock:
+            if game_id in self._titles:
+                self.remove(game_id)
+            for token in self._index(game_id, title):
+                bisect.insort(self._vocabulary, token)
+
+    def remove(self, game_id):
+        with self._lock:
+            title = self._titles.pop(game_id, None)
+            if title is None:
+                return
+            for token in set(tokenize(title)):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.discard(game_id)
+                if not postings:
+                    # Last game with this token: drop it from the vocabulary too
+                    del self._postings[token]
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+                    for trigram in trigrams(token):
+                        tokens = self._trigrams.get(trigram)
+                        if tokens is not None:
+                            tokens.discard(token)
+                            if not tokens:
+                                del self._trigrams[trigram]
+
+    def search(self, query, limit=None):
+        """
+        :param limit: Most gameIds returned; every match when None.
+        :return: gameIds matching every token of query, best first.
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            scores = None
+            for query_token in query_tokens:
+                token_scores = {}
+                for token, weight in self._match_token(query_token):
+                    for game_id in self._postings.get(token, ()):
+                        if weight > token_scores.get(game_id, 0):
+                            token_scores[game_id] = weight
+                if scores is None:
+                    scores = token_scores
+                else:
+                    # Every query token must match: keep only games matched so far
+                    scores = {game_id: score + token_scores[game_id]
+                              for game_id, score in scores.items() if game_id in token_scores}
+                if not scores:
+                    return []
+
+            phrase = " ".join(query_tokens)
+            ranked = sorted(
+                scores.items(),
+                key=lambda item: (
+                    -(item[1] + (0.5 if " ".join(tokenize(self._titles[item[0]])).startswith(phrase) else 0)),
+                    len(self._titles[item[0]]),
+                    item[0]
+                )
+            )
+        return [game_id for game_id, _ in ranked[:limit]]
+
+    def stats(self):
+        return {
+            "games": len(self._titles),
+            "tokens": len(self._postings),
+            "trigrams": len(self._trigrams),
+        }
+
+    def _index(self, game_id, title):
+        """Add a game to the postings and trigrams; :return: the tokens new to the vocabulary."""
+        self._titles[game_id] = title or ""
+        new_tokens = []
+        for token in set(tokenize(title)):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                for trigram in trigrams(token):
+                    self._trigrams.setdefault(trigram, set()).add(token)
+                new_tokens.append(token)
+            postings.add(game_id)
+        return new_tokens
+
+    def _match_token(self, query_token):
+        """Vocabulary tokens matching query_token, with the weight of each match."""
+        matches = {}
+        if query_token in self._postings:
+            matches[query_token] = self.EXACT
+
+        start = bisect.bisect_left(self._vocabulary, query_token)
+        for token in self._vocabulary[start:bisect.bisect_left(self._vocabulary, query_token + "\U0010ffff")]:
+            matches.setdefault(token, self.PREFIX)
+
+        if len(query_token) >= 3:
+            # A token containing query_token has every trigram inside it; check the survivors,
+            # since sharing the trigrams does not make them contiguous
+            inner = sorted((self._trigrams.get(query_token[i:i + 3], set())
+                            for i in range(len(query_token) - 2)), key=len)
+            for token in inner[0].intersection(*inner[1:]):
+                if query_token in token:
+                    matches.setdefault(token, self.SUBSTRING)
+
+        query_trigrams = trigrams(query_token)
+        shared = Counter()
+        for trigram in query_trigrams:
+            for token in self._trigrams.get(trigram, ()):
+                if token not in matches:
+                    shared[token] += 1
+        similar = (
+            (count / (len(query_trigrams) + len(trigrams(token)) - count), token)
+            for token, count in shared.items()
+        )
+        for similarity, token in heapq.nlargest(self.max_fuzzy_tokens, similar):
+            if similarity < self.min_similarity:
+                break
+            matches[token] = self.FUZZY * similarity
+        return matches.items()
@@ -1,6 +1,5 @@
 import os
 from framework.services.service_factory import BaseServiceFactory
-# from app.services.DataAccess.FavouritesDataService import FavouritesDataService
 
 
 class ServiceFactory(BaseServiceFactory):
@@ -9,38 +8,147 @@ class ServiceFactory(BaseServiceFactory):
         super().__init__()
 
     @classmethod
-    def get_service(cls, service_name):
-        print(f"ServiceFactory.get_service({service_name})")
-        context = {
+    def get_context(cls):
+        return {
             "host": os.getenv("DB_HOST"),
             "port": int(os.getenv("DB_PORT")),
             "user": os.getenv("DB_USER"),
             "password": os.getenv("DB_PASSWORD"),
+            "pool_min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            "pool_max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "pool_idle_timeout": int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+            "pool_max_uses": int(os.getenv("DB_POOL_MAX_USES", "1000")),
+            "pool_checkout_timeout": int(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10")),
+            "bulk_chunk_size": int(os.getenv("DB_BULK_CHUNK_SIZE", "1000")),
         }
 
+    @classmethod
+    def get_matchmaking_config(cls):
+        return {
+            "status_recheck_interval": float(os.getenv("MATCH_STATUS_RECHECK_INTERVAL", "5")),
+            "tick_interval": float(os.getenv("MATCHMAKING_TICK_INTERVAL", "2")),
+            "max_batch_size": int(os.getenv("MATCHMAKING_MAX_BATCH_SIZE", "1000")),
+            "checkpoint_interval": float(os.getenv("MATCHMAKING_CHECKPOINT_INTERVAL", "30")),
+            # Active requests read per query when the queues are rebuilt from the database
+            "recovery_page_size": int(os.getenv("MATCHMAKING_RECOVERY_PAGE_SIZE", "1000")),
+            "expiry_sweep_interval": float(os.getenv("MATCH_EXPIRY_SWEEP_INTERVAL", "60")),
+            "expiry_batch_size": int(os.getenv("MATCH_EXPIRY_BATCH_SIZE", "500")),
+            "skill_base_window": float(os.getenv("MATCHMAKING_SKILL_BASE_WINDOW", "100")),
+            "skill_widen_rate": float(os.getenv("MATCHMAKING_SKILL_WIDEN_RATE", "10")),
+            "skill_max_window": float(os.getenv("MATCHMAKING_SKILL_MAX_WINDOW", "1000")),
+            # Match status cache: entries, TTL of final statuses, TTL of "matching"
+            "status_cache_size": int(os.getenv("MATCH_STATUS_CACHE_SIZE", "100000")),
+            "status_cache_ttl": float(os.getenv("MATCH_STATUS_CACHE_TTL", "300")),
+            "status_cache_pending_ttl": float(os.getenv("MATCH_STATUS_CACHE_PENDING_TTL", "2")),
+            # Admission control for initiations: requests processed at once, further initiations
+            # waiting for a slot, active requests per user (counted in the database), and the
+            # minimum Retry-After (seconds) on rejection
+            "max_concurrent": int(os.getenv("MATCHMAKING_MAX_CONCURRENT", "64")),
+            "max_queued": int(os.getenv("MATCHMAKING_MAX_QUEUED", "256")),
+            "max_per_user": int(os.getenv("MATCHMAKING_MAX_PER_USER", "3")),
+            "retry_after": int(os.getenv("MATCHMAKING_RETRY_AFTER", "1")),
+            # Matchmaking worker processes; 0 keeps matchmaking in the API process
+            "shard_workers": int(os.getenv("MATCHMAKING_SHARD_WORKERS", "0")),
+            "default_party_size": int(os.getenv("MATCHMAKING_DEFAULT_PARTY_SIZE", "2")),
+            # e.g. MATCHMAKING_PARTY_SIZES="<gameId>:4,<gameId>:10"
+            "party_sizes": {
+                game_id.strip(): int(size)
+                for game_id, size in (
+                    item.split(":") for item in os.getenv("MATCHMAKING_PARTY_SIZES", "").split(",") if item.strip()
+                )
+            },
+        }
+
+    @classmethod
+    def get_games_config(cls):
+        return {
+            "title_index_enabled": os.getenv("GAMES_TITLE_INDEX_ENABLED", "true").lower() == "true",
+            "title_search_min_similarity": float(os.getenv("GAMES_TITLE_SEARCH_MIN_SIMILARITY", "0.3")),
+            "title_search_max_fuzzy_tokens": int(os.getenv("GAMES_TITLE_SEARCH_MAX_FUZZY_TOKENS", "50")),
+            "suggest_max_limit": int(os.getenv("GAMES_SUGGEST_MAX_LIMIT", "50")),
+            # Without the snapshot, seconds between checks for catalog writes made by other
+            # workers, which rebuild the title indexes
+            "title_index_refresh_interval": float(os.getenv("GAMES_TITLE_INDEX_REFRESH_INTERVAL", "30")),
+            "genre_counts_ttl": float(os.getenv("GAMES_GENRE_COUNTS_TTL", "300")),
+            # Read-through cache of /games responses; size 0 disables it
+            "games_cache_size": int(os.getenv("GAMES_CACHE_SIZE", "10000")),
+            "games_cache_ttl": float(os.getenv("GAMES_CACHE_TTL", "3600")),
+            "games_cache_max_bytes": int(os.getenv("GAMES_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            # Serve /games from an in-memory snapshot of game_info, rebuilt every refresh interval
+            "catalog_snapshot_enabled": os.getenv("GAMES_CATALOG_SNAPSHOT_ENABLED", "false").lower() == "true",
+            "catalog_refresh_interval": float(os.getenv("GAMES_CATALOG_REFRESH_INTERVAL", "60")),
+            # Cache-Control sent with /games and /games/{game_id}; responses also carry an ETag
+            "games_cache_control": os.getenv("GAMES_CACHE_CONTROL", "public, max-age=60"),
+            "game_cache_control": os.getenv("GAME_CACHE_CONTROL", "public, max-age=300"),
+            # Seconds the catalog version behind those ETags is reused before it is read again
+            "catalog_version_ttl": float(os.getenv("GAMES_CATALOG_VERSION_TTL", "1")),
+        }
+
+    @classmethod
+    def get_favourites_config(cls):
+        return {
+            "favourites_cache_control": os.getenv("FAVOURITES_CACHE_CONTROL", "private, no-cache"),
+            "favourites_version_ttl": float(os.getenv("FAVOURITES_VERSION_TTL", "1")),
+            "favourites_versions_size": int(os.getenv("FAVOURITES_VERSIONS_SIZE", "10000")),
+        }
+
+    @classmethod
+    def get_ingestion_config(cls):
+        return {
+            # Run an incremental IGDB sync at startup and then every sync_interval seconds
+            "sync_enabled": os.getenv("IGDB_SYNC_ENABLED", "false").lower() == "true",
+            "sync_interval": float(os.getenv("IGDB_SYNC_INTERVAL", "3600")),
+            "requests_per_second": float(os.getenv("IGDB_REQUESTS_PER_SECOND", "4")),
+            "max_concurrency": int(os.getenv("IGDB_MAX_CONCURRENCY", "4")),
+            "max_retries": int(os.getenv("IGDB_MAX_RETRIES", "5")),
+            "page_size": int(os.getenv("IGDB_PAGE_SIZE", "500")),
+            "batch_size": int(os.getenv("IGDB_BATCH_SIZE", "2000")),
+        }
+
+    @classmethod
+    def _create_service(cls, service_name):
+        print(f"ServiceFactory._create_service({service_name})")
+
         if service_name == 'GamesResource':
             import app.resources.games_resource as games_resource
-            result = games_resource.GamesResource(config=None)
+            result = games_resource.GamesResource(config=cls.get_games_config())
         elif service_name == 'MatchRequestsResource':
             import app.resources.match_requests_resource as match_requests_resource
-            result = match_requests_resource.MatchRequestsResource(config=None)
+            result = match_requests_resource.MatchRequestsResource(config=cls.get_matchmaking_config())
         elif service_name == 'FavouritesResource':
             import app.resources.favourites_resource as favourites_resource
-            result = favourites_resource.FavouritesResource(config=None)
+            result = favourites_resource.FavouritesResource(config=cls.get_favourites_config())
+
+        elif service_name == 'IgdbIngestion':
+            from app.services.Ingestion.IgdbClient import IgdbClient
+            from app.services.Ingestion.IgdbIngestion import IgdbIngestion
+            config = cls.get_ingestion_config()
+            client = IgdbClient(
+                requests_per_second=config["requests_per_second"],
+                max_connections=config["max_concurrency"],
+                max_retries=config["max_retries"]
+            )
+            result = IgdbIngestion(
+                client, cls.get_service("GamesResourceDataService"),
+                page_size=config["page_size"],
+                max_concurrency=config["max_concurrency"],
+                batch_size=config["batch_size"]
+            )
 
         elif service_name == 'GamesResourceDataService':
             from app.services.DataAccess.GamesDataService import GamesDataService
-            data_service = GamesDataService(context=context)
+            data_service = GamesDataService(context=cls.get_context())
             result = data_service
         elif service_name == 'MatchResourceDataService':
             from app.services.DataAccess.MatchRequestDataService import MatchRequestDataService
-            data_service = MatchRequestDataService(context=context)
+            data_service = MatchRequestDataService(context=cls.get_context())
+            result = data_service
+        elif service_name == 'FavouriteResourceDataService':
+            from app.services.DataAccess.FavouritesDataService import FavouritesDataService
+            data_service = FavouritesDataService(context=cls.get_context())
             result = data_service
-        # elif service_name == 'FavouriteResourceDataService':
-        #     data_service = FavouritesDataService(context=context)
-        #     result = data_service
 
         else:
             result = None
 
-        return result
\ No newline at end of file
+        return result
@@ -1,15 +1,43 @@
+import os
+
 import requests
 
 # Replace these with your own client ID and access token
-CLIENT_ID = "lypkh207hr1yfpu07yj2fhwkdon3e3"
-ACCESS_TOKEN = "949cfj21cqlggvn5jt6nbnxvlrmxgy"
+CLIENT_ID = os.getenv("IGDB_CLIENT_ID", "lypkh207hr1yfpu07yj2fhwkdon3e3")
+ACCESS_TOKEN = os.getenv("IGDB_ACCESS_TOKEN", "949cfj21cqlggvn5jt6nbnxvlrmxgy")
+# Point at a local fake IGDB server to exercise ingestion without the real API
+IGDB_BASE_URL = os.getenv("IGDB_BASE_URL", "https://api.igdb.com/v4")
 
 headers = {
     "Client-ID": CLIENT_ID,
     "Authorization": f"Bearer {ACCESS_TOKEN}",
     "Content-Type": "text/plain"
 }
-url = "https://api.igdb.com/v4/games"
+url = f"{IGDB_BASE_URL}/games"
+
+GAME_FIELDS = "id, name, summary, genres.name, cover.image_id, updated_at"
+
+
+def transform_game(game):
+    """
+    Flatten one IGDB game record.
+
+    Returns:
+        dict: id, name, description, genres, image_url and updated_at of the game.
+    """
+    # Construct image URL
+    cover_image_id = game.get('cover', {}).get('image_id')
+    image_url = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{cover_image_id}.jpg" if cover_image_id else "No image available"
+
+    return {
+        "id": game['id'],
+        "name": game['name'],
+        "description": game.get('summary', 'No description available'),
+        "genres": [genre['name'] for genre in game.get('genres', [])],
+        "image_url": image_url,
+        "updated_at": game.get('updated_at')
+    }
+
 
 def fetch_games_data(limit=500, genre=None):
     """
@@ -24,7 +52,7 @@ def fetch_games_data(limit=500, genre=None):
     """
     # Base query with required fields
     query = f"""
-    fields id, name, summary, genres.name, cover.image_id;
+    fields {GAME_FIELDS};
     limit {limit};
     """
 
@@ -37,30 +65,7 @@ def fetch_games_data(limit=500, genre=None):
 
     # Check response status and parse data
     if response.status_code == 200:
-        game_data = response.json()
-        games_info = []
-
-        for game in game_data:
-            # Extract game details
-            game_id = game['id']
-            name = game['name']
-            description = game.get('summary', 'No description available')
-            genres = [genre['name'] for genre in game.get('genres', [])]
-            
-            # Construct image URL
-            cover_image_id = game.get('cover', {}).get('image_id')
-            image_url = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{cover_image_id}.jpg" if cover_image_id else "No image available"
-            
-            # Append game info to list
-            games_info.append({
-                "id": game_id,
-                "name": name,
-                "description": description,
-                "genres": genres,
-                "image_url": image_url
-            })
-
-        return games_info
+        return [transform_game(game) for game in response.json()]
     else:
         print(f"Failed to fetch data: {response.status_code} - {response.text}")
         return []
@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+
+from framework.services.DataAccess.BaseDataService import BaseDataService
+from framework.utils.pagination import decode_cursor
+
+
+class InMemoryMatchRequestDataService(BaseDataService):
+    """
+    Stand-in for MatchRequestDataService that keeps match requests in memory, so the
+    matchmaking path can be benchmarked without a MySQL server. It implements the
+    same methods with the same claim semantics, and counts the SQL statements the
+    MySQL implementation would have issued for each call.
+    """
+
+    def __init__(self, context=None):
+        super().__init__(context or {})
+        self._lock = threading.Lock()
+        # matchRequestId -> row
+        self._rows = {}
+        # gameId -> {matchRequestId: row} of active requests, standing in for the gameId index
+        self._active = {}
+        # matchRequestId -> ids of everyone in its match
+        self._groups = {}
+        self.queries = Counter()
+
+    def _get_connection(self):
+        raise NotImplementedError("The in-memory data service has no connections.")
+
+    def initialize(self, database_name):
+        self.context["database"] = database_name
+
+    def shutdown(self):
+        pass
+
+    def get_data_object(self, database_name, collection_name, key_field, key_value):
+        with self._lock:
+            self.queries["get_data_object"] += 1
+            row = self._rows.get(key_value) if key_field == "matchRequestId" else None
+            return dict(row) if row is not None else None
+
+    def get_all_data_objects(self, database_name, collection_name, offset, limit):
+        with self._lock:
+            self.queries["get_all_data_objects"] += 1
+            return [dict(row) for row in list(self._rows.values())[offset:offset + limit]]
+
+    def execute_query(self, query, params):
+        raise NotImplementedError("The in-memory data service does not run SQL.")
+
+    def insert_data_object(self, database_name, collection_name, data_object):
+        with self._lock:
+            self.queries["insert_data_object"] += 1
+            row = dict(data_object)
+            row["activatedAt"] = None
+            self._rows[row["matchRequestId"]] = row
+            return True
+
+    def update_data_object(self, database_name, collection_name, key_field, key_value, updated_data):
+        with self._lock:
+            self.queries["update_data_object"] += 1
+            row = self._rows.get(key_value)
+            if row is None:
+                return False
+            row.update(updated_data)
+            return True
+
+    def activate_match_request(self, match_request_id, user_id=None, max_active=None):
+        with self._lock:
+            self.queries["activate_match_request"] += 1
+            if max_active is not None and self._count_active(user_id) >= max_active:
+                return False
+            row = self._rows.get(match_request_id)
+            if (row is None or row["isActive"] or row["isCancelled"] or self._is_expired(row)
+                    or match_request_id in self._groups):
+                return False
+            row["isActive"] = True
+            row["activatedAt"] = time.monotonic()
+            self._active.setdefault(row["gameId"], {})[match_request_id] = row
+            return True
+
+    def count_active_match_requests(self, user_id):
+        with self._lock:
+            self.queries["count_active_match_requests"] += 1
+            return self._count_active(user_id)
+
+    def _count_active(self, user_id):
+        return sum(1 for row in self._rows.values() if row["userId"] == user_id and row["isActive"])
+
+    def get_match_requests_records(self, user_id, game_id, page, page_size, cursor=None):
+        with self._lock:
+            self.queries["get_match_requests_records"] += 1
+            rows = sorted((row for row in self._rows.values()
+                           if (not user_id or row["userId"] == user_id) and (not game_id or row["gameId"] == game_id)),
+                          key=lambda row: row["matchRequestId"])
+            if cursor:
+                after = decode_cursor(cursor, "matchRequestId")["matchRequestId"]
+                rows = [row for row in rows if row["matchRequestId"] > after]
+            else:
+                rows = rows[(page - 1) * page_size:]
+            return [dict(row) for row in rows[:page_size]], len(rows) > page_size
+
+    def cancel_match_request(self, match_request_id):
+        """Like MatchRequestDataService: refused once cancelled or matched, allowed whether or not active."""
+        with self._lock:
+            self.queries["cancel_match_request"] += 1
+            row = self._rows.get(match_request_id)
+            if row is None or row["isCancelled"] or match_request_id in self._groups:
+                return False
+            row["isCancelled"] = True
+            self._deactivate(row)
+            return True
+
+    def claim_match(self, match_request_id, partner_request_id, game_id):
+        return self.claim_group([match_request_id, partner_request_id], game_id)
+
+    def claim_group(self, match_request_ids, game_id):
+        with self._lock:
+            self.queries["claim_group"] += 1
+            available = [match_request_id for match_request_id in match_request_ids
+                         if self._is_claimable(self._rows.get(match_request_id))]
+            if len(available) < len(match_request_ids):
+                # Calls are serialized by the lock, so no row is ever busy
+                return {"matched": False, "available": available, "busy": []}
+            self._write_groups([match_request_ids])
+            return {"matched": True, "available": available, "busy": []}
+
+    def claim_partner(self, match_request_id, user_id, game_id, region=None, language=None, skill_rating=None,
+                      skill_window=None):
+        with self._lock:
+            self.queries["claim_partner"] += 2
+            if not self._is_claimable(self._rows.get(match_request_id)):
+                return None
+
+            now = time.monotonic()
+            best, best_difference = None, None
+            for row in self._active.get(game_id, {}).values():
+                if (row["userId"] == user_id or row["matchRequestId"] == match_request_id
+                        or row.get("region") != region or row.get("language") != language
+                        or not self._is_claimable(row)):
+                    continue
+                difference = 0
+                if skill_rating is not None and skill_window is not None and row.get("skillRating") is not None:
+                    difference = abs(row["skillRating"] - skill_rating)
+                    waited = now - row["activatedAt"]
+                    window = min(skill_window["max_window"],
+                                 skill_window["base_window"] + skill_window["widen_rate"] * waited)
+                    if difference > max(skill_window["window"], window):
+                        continue
+                if best is None or difference < best_difference:
+                    best, best_difference = row, difference
+            if best is None:
+                return None
+
+            self._write_groups([[match_request_id, best["matchRequestId"]]])
+            return dict(best)
+
+    def get_settled_match_requests(self, match_request_ids):
+        with self._lock:
+            self.queries["get_settled_match_requests"] += 1
+            return [match_request_id for match_request_id in match_request_ids
+                    if not (self._rows.get(match_request_id) or {}).get("isActive")]
+
+    def get_active_game_ids(self):
+        with self._lock:
+            self.queries["get_active_game_ids"] += 1
+            return sorted(game_id for game_id, rows in self._active.items() if rows)
+
+    def get_active_match_requests(self, page_size, cursor=None, game_ids=None):
+        with self._lock:
+            self.queries["get_active_match_requests"] += 1
+            rows = sorted(self._claimable_rows(), key=lambda row: (row["gameId"], row["matchRequestId"]))
+            if game_ids is not None:
+                game_ids = set(game_ids)
+                rows = [row for row in rows if row["gameId"] in game_ids]
+            if cursor is not None:
+                rows = [row for row in rows if (row["gameId"], row["matchRequestId"]) > tuple(cursor)]
+            rows = rows[:page_size]
+            next_cursor = (rows[-1]["gameId"], rows[-1]["matchRequestId"]) if len(rows) >= page_size else None
+            return rows, next_cursor
+
+    def match_active_batch(self, max_batch_size, group_requests, cursor=None):
+        with self._lock:
+            self.queries["match_active_batch"] += 1
+            key = lambda row: (row["gameId"], row["activatedAt"], row["matchRequestId"])
+            rows = sorted(self._claimable_rows(), key=key)
+            if cursor is not None:
+                rows = [row for row in rows if key(row) > tuple(cursor)]
+            rows = rows[:max_batch_size]
+            next_cursor = None
+            if len(rows) >= max_batch_size:
+                first = next(index for index, row in enumerate(rows) if row["gameId"] == rows[-1]["gameId"])
+                next_cursor = key(rows[first - 1] if first > 0 else rows[-1])
+            groups = group_requests(rows)
+            if groups:
+                self.queries["match_active_batch"] += 1
+                self._write_groups([[row["matchRequestId"] for row in group] for group in groups])
+            return groups, next_cursor
+
+    def expire_match_requests(self, batch_size):
+        with self._lock:
+            self.queries["expire_match_requests"] += 1
+            expired = [row for rows in self._active.values() for row in rows.values()
+                       if self._is_expired(row)][:batch_size]
+            if expired:
+                self.queries["expire_match_requests"] += 1
+            for row in expired:
+                self._deactivate(row)
+            return [row["matchRequestId"] for row in expired]
+
+    def get_match_group(self, match_request_id):
+        with self._lock:
+            self.queries["get_match_group"] += 1
+            return list(self._groups[match_request_id]) if match_request_id in self._groups else None
+
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def _write_groups(self, groups):
+        """One insert per match table plus one update, like MatchRequestDataService._write_groups."""
+        self.queries["write_groups"] += 1 + any(len(ids) == 2 for ids in groups) + any(len(ids) > 2 for ids in groups)
+        for ids in groups:
+            for match_request_id in ids:
+                self._groups[match_request_id] = ids
+                self._deactivate(self._rows[match_request_id])
+
+    def _deactivate(self, row):
+        row["isActive"] = False
+        self._active.get(row["gameId"], {}).pop(row["matchRequestId"], None)
+
+    def _claimable_rows(self):
+        now = time.monotonic()
+        return [dict(row, waitSeconds=int(now - row["activatedAt"]))
+                for rows in self._active.values() for row in rows.values() if self._is_claimable(row)]
+
+    def _is_claimable(self, row):
+        return row is not None and row["isActive"] and not row["isCancelled"] and not self._is_expired(row)
+
+    @staticmethod
+    def _is_expired(row):
+        expire_date = row["expireDate"]
+        if isinstance(expire_date, str):
+            expire_date = datetime.strptime(expire_date, "%Y-%m-%d").date()
+        return expire_date < date.today()
@@ -0,0 +1,121 @@
+"""
+Local stand-in for the IGDB games API, for exercising and timing the ingestion
+pipeline without credentials or the real rate limits.
+
+Serves POST /games and POST /games/count over a synthetic catalog, understanding the
+subset of the query language the pipeline sends ("where updated_at > N", "limit",
+"offset"). A fraction of requests can be answered with 429 to exercise retries.
+
+Run using:  python -m benchmarks.fake_igdb_server --games 200000 --port 8090
+Then sync:  IGDB_BASE_URL=http://127.0.0.1:8090 IGDB_SYNC_ENABLED=true python -m app.main
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENRES = ["Shooter", "Platform", "Puzzle", "Adventure", "Fighting", "Arcade", "Strategy", "Role-playing (RPG)"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a synthetic IGDB catalog.")
+    parser.add_argument("--games", type=int, default=10000, help="Games in the catalog.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429.")
+    parser.add_argument("--seed", type=int, default=4153)
+    return parser.parse_args(argv)
+
+
+def build_catalog(games, rng):
+    """Synthetic games in id order; updated_at spreads over the last year."""
+    now = int(time.time())
+    return [
+        {
+            "id": game_id,
+            "name": f"Game {game_id}",
+            "summary": f"Synthetic game number {game_id}.",
+            "genres": [{"name": genre} for genre in rng.sample(GENRES, rng.randint(0, 3))],
+            "cover": {"image_id": f"co{game_id:x}"},
+            "updated_at": now - rng.randint(0, 365 * 24 * 3600),
+        }
+        for game_id in range(1, games + 1)
+    ]
+
+
+def make_handler(catalog, settings, rng, counters):
+    lock = threading.Lock()
+
+    class FakeIgdbHandler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+            time.sleep(settings.latency)
+            with lock:
+                throttled = rng.random() < settings.throttle_rate
+                counters["requests"] += 1
+                counters["throttled"] += throttled
+            if throttled:
+                self._reply(429, {"message": "Too Many Requests"}, {"Retry-After": str(settings.retry_after)})
+                return
+
+            since = re.search(r"updated_at\s*>\s*(\d+)", body)
+            games = [game for game in catalog if game["updated_at"] > int(since.group(1))] if since else catalog
+
+            if self.path == "/games/count":
+                self._reply(200, {"count": len(games)})
+            elif self.path == "/games":
+                limit = re.search(r"limit\s+(\d+)", body)
+                offset = re.search(r"offset\s+(\d+)", body)
+                start = int(offset.group(1)) if offset else 0
+                self._reply(200, games[start:start + min(int(limit.group(1)) if limit else 10, 500)])
+            else:
+                self._reply(404, {"message": "Not Found"})
+
+        def _reply(self, status, payload, headers=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeIgdbHandler
+
+
+def serve(settings):
+    """
+    :return: The server, not yet serving. Its catalog list can be edited in place between
+             syncs, and counters holds the requests served and how many were throttled.
+    """
+    rng = random.Random(settings.seed)
+    catalog = build_catalog(settings.games, rng)
+    counters = {"requests": 0, "throttled": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", settings.port), make_handler(catalog, settings, rng, counters))
+    server.catalog = catalog
+    server.counters = counters
+    print(f"Fake IGDB serving {len(catalog)} games on http://127.0.0.1:{server.server_address[1]}")
+    return server
+
+
+def main(argv=None):
+    server = serve(parse_args(argv))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
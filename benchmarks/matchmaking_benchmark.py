@@ -0,0 +1,248 @@
+"""
+Load simulator for the matchmaking path.
+
+Drives MatchRequestsResource (create, initiate, process_matchmaking, plus the batch
+scheduler) with a synthetic population against an in-memory database stand-in, and
+writes throughput, time-to-match percentiles, DB statements per match and memory use
+as JSON, so runs can be diffed between releases.
+
+Run using:  python -m benchmarks.matchmaking_benchmark --duration 10 --arrival-rate 500 --output bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from app.models.match_request import MatchRequest
+from app.models.match_request_initiate import MatchRequestInitiate
+from app.services.service_factory import ServiceFactory
+from benchmarks.InMemoryMatchRequestDataService import InMemoryMatchRequestDataService
+from framework.exceptions.match_exceptions import MatchmakingOverloadedException, TooManyMatchRequestsException
+from framework.exceptions.match_exceptions import MatchAlreadyMatchedException
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matchmaking path with a synthetic population.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of arrivals.")
+    parser.add_argument("--drain", type=float, default=2, help="Seconds to keep matching after arrivals stop.")
+    parser.add_argument("--arrival-rate", type=float, default=200, help="Mean match requests per second (Poisson).")
+    parser.add_argument("--games", type=int, default=20, help="Distinct gameIds.")
+    parser.add_argument("--users", type=int, default=5000, help="Distinct userIds.")
+    parser.add_argument("--regions", type=int, default=1, help="Distinct regions; 0 leaves region unset.")
+    parser.add_argument("--skill-distribution", choices=["normal", "uniform", "none"], default="normal")
+    parser.add_argument("--skill-mean", type=float, default=1500)
+    parser.add_argument("--skill-stddev", type=float, default=300, help="Stddev (normal) or half-range (uniform).")
+    parser.add_argument("--cancel-rate", type=float, default=0.05, help="Fraction of requests cancelled while waiting.")
+    parser.add_argument("--cancel-after", type=float, default=1.0, help="Mean seconds before a cancellation.")
+    parser.add_argument("--party-size", type=int, default=2, help="Players per match.")
+    parser.add_argument("--tick-interval", type=float, default=0.5, help="Batch scheduler interval.")
+    parser.add_argument("--seed", type=int, default=4153)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report the traced Python heap peak (slows the run down).")
+    parser.add_argument("--output", help="JSON file to write; printed to stdout if omitted.")
+    return parser.parse_args(argv)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an unsorted list, or None if it is empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class Population:
+    """Synthetic users: each has a fixed skill rating and region."""
+
+    def __init__(self, settings, rng):
+        self.settings = settings
+        self.rng = rng
+        self.games = [f"game-{i}" for i in range(settings.games)]
+        regions = [f"region-{i}" for i in range(settings.regions)] or [None]
+        self.users = [
+            (f"user-{i}", self._skill(), rng.choice(regions)) for i in range(settings.users)
+        ]
+
+    def _skill(self):
+        settings = self.settings
+        if settings.skill_distribution == "normal":
+            return max(0, int(self.rng.gauss(settings.skill_mean, settings.skill_stddev)))
+        if settings.skill_distribution == "uniform":
+            return int(self.rng.uniform(settings.skill_mean - settings.skill_stddev,
+                                        settings.skill_mean + settings.skill_stddev))
+        return None
+
+    def next_request(self):
+        user_id, skill, region = self.rng.choice(self.users)
+        return MatchRequest(
+            userId=user_id,
+            gameId=self.rng.choice(self.games),
+            expireDate=(date.today() + timedelta(days=1)).strftime("%Y-%m-%d"),
+            skillRating=skill,
+            region=region
+        )
+
+
+async def run_benchmark(settings):
+    rng = random.Random(settings.seed)
+    population = Population(settings, rng)
+
+    data_service = InMemoryMatchRequestDataService()
+    # Register the stand-in before the resource asks the factory for its data service
+    ServiceFactory.register("MatchResourceDataService", data_service)
+    from app.resources.match_requests_resource import MatchRequestsResource
+
+    config = ServiceFactory.get_matchmaking_config()
+    config.update(tick_interval=settings.tick_interval, default_party_size=settings.party_size, shard_workers=0)
+    resource = MatchRequestsResource(config=config)
+
+    initiated_at = {}
+    time_to_match_ms = []
+    cancelled = set()
+    rejected = set()
+    matches = 0
+    publish_match = resource.publish_match
+
+    def record_match(group):
+        nonlocal matches
+        matches += 1
+        now = time.perf_counter()
+        for request in group:
+            started = initiated_at.pop(request["matchRequestId"], None)
+            if started is not None:
+                time_to_match_ms.append((now - started) * 1000)
+        publish_match(group)
+
+    resource.publish_match = record_match
+
+    async def cancel_later(match_request_id, delay):
+        await asyncio.sleep(delay)
+        if match_request_id not in initiated_at:
+            return
+        try:
+            await resource.cancel_match_request(match_request_id)
+        except MatchAlreadyMatchedException:
+            return
+        initiated_at.pop(match_request_id, None)
+        cancelled.add(match_request_id)
+
+    async def arrive(match_request):
+        created = await resource.create_match_request(match_request)
+        match_request_id = created.matchRequestId
+        initiated_at[match_request_id] = time.perf_counter()
+        try:
+            await resource.initiate_match_process(MatchRequestInitiate(MatchRequestId=match_request_id))
+        except (TooManyMatchRequestsException, MatchmakingOverloadedException):
+            # Admission control turned it away; the API would answer 429/503
+            initiated_at.pop(match_request_id, None)
+            rejected.add(match_request_id)
+            return
+        if rng.random() < settings.cancel_rate:
+            cancellations.add(asyncio.create_task(cancel_later(match_request_id, rng.expovariate(1 / settings.cancel_after))))
+        await resource.process_matchmaking(match_request_id)
+
+    if settings.trace_memory:
+        tracemalloc.start()
+
+    tasks = set()
+    cancellations = set()
+    requests = 0
+    await resource.start_matchmaking()
+    started = time.perf_counter()
+    next_arrival = started
+    while True:
+        next_arrival += rng.expovariate(settings.arrival_rate)
+        if next_arrival - started >= settings.duration:
+            break
+        await asyncio.sleep(max(0, next_arrival - time.perf_counter()))
+        tasks.add(asyncio.create_task(arrive(population.next_request())))
+        requests += 1
+    arrivals_done = time.perf_counter()
+
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(settings.drain)
+    elapsed = time.perf_counter() - started
+    # Cancellations still pending after the drain are for requests that were matched or never will be
+    for task in cancellations:
+        task.cancel()
+    await asyncio.gather(*cancellations, return_exceptions=True)
+    await resource.stop_matchmaking()
+
+    traced_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if settings.trace_memory else None
+    if settings.trace_memory:
+        tracemalloc.stop()
+    resource.shutdown()
+    ServiceFactory.unregister("MatchResourceDataService")
+
+    queries = data_service.query_count()
+    return {
+        "settings": vars(settings),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": {
+            "elapsed_s": elapsed,
+            "arrival_phase_s": arrivals_done - started,
+            "requests": requests,
+            "matched_requests": len(time_to_match_ms),
+            "matches": matches,
+            "cancelled": len(cancelled),
+            "rejected": len(rejected),
+            "unmatched": len(initiated_at),
+            "throughput_requests_per_s": requests / elapsed,
+            "throughput_matched_requests_per_s": len(time_to_match_ms) / elapsed,
+            "time_to_match_ms": {
+                "p50": percentile(time_to_match_ms, 50),
+                "p95": percentile(time_to_match_ms, 95),
+                "p99": percentile(time_to_match_ms, 99),
+                "max": max(time_to_match_ms, default=None),
+            },
+            "db_queries": queries,
+            "db_queries_per_match": queries / matches if matches else None,
+            "db_queries_by_method": dict(data_service.queries),
+            "memory": {
+                "max_rss_mb": max_rss_mb(),
+                "traced_peak_mb": traced_peak_mb,
+            },
+            "engine": resource.matchmaking_engine.stats(),
+            "scheduler": resource.matchmaking_scheduler.stats(),
+            "admission": resource.admission_controller.stats(),
+        },
+    }
+
+
+def main(argv=None):
+    settings = parse_args(argv)
+    # The service logs with print; keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run_benchmark(settings))
+    output = json.dumps(report, indent=2, default=str)
+    if settings.output:
+        with open(settings.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Wrote {settings.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+
+class ConnectionPoolExhaustedException(Exception):
+    """Exception raised when no pooled connection becomes available in time.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
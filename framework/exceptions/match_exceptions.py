@@ -19,4 +19,41 @@ class MatchNotValidException(Exception):
 
     def __init__(self, message):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class MatchAlreadyMatchedException(Exception):
+    """Exception raised when a match request cannot change because it has already been matched.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+class TooManyMatchRequestsException(Exception):
+    """Exception raised when a user already has the most match requests allowed active at once.
+
+    Attributes:
+        message -- explanation of the error
+        retry_after -- seconds the client should wait before retrying
+    """
+
+    def __init__(self, message, retry_after):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+class MatchmakingOverloadedException(Exception):
+    """Exception raised when the matchmaking queue is full.
+
+    Attributes:
+        message -- explanation of the error
+        retry_after -- seconds the client should wait before retrying
+    """
+
+    def __init__(self, message, retry_after):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
@@ -0,0 +1,11 @@
+
+class InvalidCursorException(Exception):
+    """Exception raised when a pagination cursor cannot be decoded.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
@@ -10,3 +10,12 @@ class BaseResource(ABC):
     @abstractmethod
     def get_item(self, key: str) -> Any:
         raise NotImplementedError()
+
+    def shutdown(self):
+        """
+        Release anything the resource owns. Called once by the service factory on shutdown;
+        data services are registered separately and shut down by the factory themselves.
+        """
+        async_data_service = getattr(self, "async_data_service", None)
+        if async_data_service is not None:
+            async_data_service.shutdown()
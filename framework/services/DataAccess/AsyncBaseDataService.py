@@ -0,0 +1,72 @@
+
+from abc import ABC, abstractmethod
+
+
+class AsyncBaseDataService(ABC):
+    """
+    Awaitable counterpart of BaseDataService. Application code running on the event
+    loop uses this interface so that a slow query never blocks other in-flight requests.
+    """
+
+    def __init__(self, context):
+        """
+        :param context: Configuration information the instance needs, as for BaseDataService.
+        """
+        self.context = context
+
+    @abstractmethod
+    async def get_data_object(self,
+                              database_name: str,
+                              collection_name: str,
+                              key_field: str,
+                              key_value: str):
+        """
+        Gets a single data object from a table in a database.
+
+        :param database_name: Name of the database or similar abstraction.
+        :param collection_name: The name of the collection, table, etc. in the database.
+        :param key_field: A single column, field, ... that is a unique key/identifier.
+        :param key_value: The value for the column, field, ... ...
+        :return: The single object identified by the unique field.
+        """
+        raise NotImplementedError('Abstract method get_data_object()')
+
+    @abstractmethod
+    async def get_all_data_objects(self, database_name, collection_name, offset, limit):
+        raise NotImplementedError('Abstract method get_all_data_objects()')
+
+    @abstractmethod
+    async def execute_query(self, query, params):
+        raise NotImplementedError('Abstract method execute_query()')
+
+    @abstractmethod
+    async def insert_data_object(self, database_name, collection_name, data_object):
+        raise NotImplementedError('Abstract method insert_data_object()')
+
+    @abstractmethod
+    async def update_data_object(self, database_name, collection_name, key_field, key_value, updated_data):
+        raise NotImplementedError('Abstract method update_data_object()')
+
+    @abstractmethod
+    async def insert_data_objects(self, database_name, collection_name, data_objects, chunk_size=None):
+        raise NotImplementedError('Abstract method insert_data_objects()')
+
+    @abstractmethod
+    async def update_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        raise NotImplementedError('Abstract method update_data_objects()')
+
+    @abstractmethod
+    async def upsert_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        raise NotImplementedError('Abstract method upsert_data_objects()')
+
+    @abstractmethod
+    async def run(self, func, *args, **kwargs):
+        """
+        Await an arbitrary blocking data access call, e.g. a query method specific to
+        one concrete data service.
+        """
+        raise NotImplementedError('Abstract method run()')
+
+    def shutdown(self):
+        """Release any resources (threads, connections) held by the service."""
+        pass
@@ -61,3 +61,50 @@ class BaseDataService(ABC):
     def update_data_object(self, database_name, collection_name, key_field, key_value, updated_data):
         raise NotImplementedError('Abstract method update_data_object()')
 
+    def insert_data_objects(self, database_name, collection_name, data_objects, chunk_size=None):
+        """
+        Inserts many data objects. Concrete services should override this with a batched
+        implementation; the default falls back to one insert_data_object() per row.
+
+        :param database_name: Name of the database or similar abstraction.
+        :param collection_name: The name of the collection, table, etc. in the database.
+        :param data_objects: The rows to insert. All rows must have the same fields.
+        :param chunk_size: Maximum number of rows sent to the database in one statement.
+        :return: A list with one success flag per input row, in input order.
+        """
+        return [self.insert_data_object(database_name, collection_name, data_object)
+                for data_object in data_objects]
+
+    def update_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        """
+        Updates many data objects, each identified by the value of key_field it carries.
+
+        :param key_field: A single column, field, ... that is a unique key/identifier.
+        :param data_objects: The rows to update. All rows must have the same fields,
+            including key_field.
+        :return: A list with one flag per input row; False when no row had that key.
+        """
+        return [self.update_data_object(database_name, collection_name, key_field,
+                                        data_object[key_field], data_object)
+                for data_object in data_objects]
+
+    def upsert_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        """
+        Inserts many data objects, updating the existing row instead when key_field
+        already exists.
+
+        :return: (results, counts): a list with one flag per input row, in input order,
+            False when writing the row failed, and {"inserted": ..., "updated": ...}.
+        """
+        results = []
+        counts = {"inserted": 0, "updated": 0}
+        for data_object in data_objects:
+            key_value = data_object[key_field]
+            if self.get_data_object(database_name, collection_name, key_field, key_value):
+                written = self.update_data_object(database_name, collection_name, key_field, key_value, data_object)
+                counts["updated"] += bool(written)
+            else:
+                written = self.insert_data_object(database_name, collection_name, data_object)
+                counts["inserted"] += bool(written)
+            results.append(bool(written))
+        return results, counts
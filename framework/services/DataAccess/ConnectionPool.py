@@ -0,0 +1,244 @@
+import threading
+import time
+from collections import deque
+
+from framework.exceptions.data_access_exceptions import ConnectionPoolExhaustedException
+
+
+class _PoolEntry:
+    """A raw DB-API connection plus the bookkeeping the pool needs for it."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled connection. Attribute access is forwarded to the
+    underlying connection, so existing ``with self._get_connection() as connection``
+    code keeps working, but leaving the ``with`` block (or calling ``close()``)
+    hands the connection back to the pool instead of closing the socket.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise AttributeError(f"Connection already returned to the pool ({name})")
+        return getattr(entry.connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(failed=exc_type is not None)
+
+    def close(self, failed=False):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry, failed=failed)
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections.
+
+    :param connect: Zero-argument callable that opens a new raw connection.
+    :param min_size: Connections kept open even when idle.
+    :param max_size: Hard upper bound on open connections (idle + checked out).
+    :param idle_timeout: Seconds an idle connection may sit in the pool before it is closed.
+    :param max_uses: Checkouts after which a connection is recycled.
+    :param checkout_timeout: Seconds to wait for a free connection before giving up.
+    :param health_check_interval: Connections idle for longer than this are pinged on checkout.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300, max_uses=1000,
+                 checkout_timeout=10, health_check_interval=5):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._created = 0
+        self._recycled = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._failed_health_checks = 0
+
+        for _ in range(min_size):
+            entry = self._open_entry()
+            with self._cond:
+                self._size += 1
+                self._idle.append(entry)
+
+    def acquire(self) -> PooledConnection:
+        """Check a connection out of the pool, opening a new one if below max_size."""
+        deadline = time.monotonic() + self.checkout_timeout
+        entry = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ConnectionPoolExhaustedException("Connection pool is closed.")
+                self._prune_idle_locked()
+                if self._idle:
+                    # LIFO keeps the hottest connections busy and lets the rest age out.
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise ConnectionPoolExhaustedException(
+                        f"No connection available after {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})."
+                    )
+                self._waits += 1
+                self._cond.wait(remaining)
+
+        try:
+            if entry is not None and not self._is_healthy(entry):
+                self._close_entry(entry)
+                entry = None
+            if entry is None:
+                entry = self._open_entry()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        entry.uses += 1
+        with self._cond:
+            self._in_use += 1
+            self._checkouts += 1
+        return PooledConnection(self, entry)
+
+    def release(self, entry, failed=False):
+        """Return a connection to the pool, recycling it if it is worn out or broken."""
+        keep = not self._closed and entry.uses < self.max_uses
+        if keep and failed:
+            # The caller hit an error mid-use; make sure no half-finished transaction
+            # leaks into the next checkout, and drop the connection if it is unusable.
+            try:
+                entry.connection.rollback()
+            except Exception:
+                keep = False
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append(entry)
+            else:
+                self._size -= 1
+                self._recycled += 1
+            self._cond.notify()
+
+        if not keep:
+            self._close_entry(entry)
+            self._replenish()
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_entry(entry)
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters for monitoring."""
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self._created,
+                "recycled": self._recycled,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "failed_health_checks": self._failed_health_checks,
+                "closed": self._closed,
+            }
+
+    def _prune_idle_locked(self):
+        """Close connections idle past idle_timeout, never dropping below min_size."""
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        # The left end of the deque holds the least recently used connections.
+        while self._idle and self._size > self.min_size and self._idle[0].last_used < cutoff:
+            entry = self._idle.popleft()
+            self._size -= 1
+            self._recycled += 1
+            self._close_entry(entry)
+
+    def _replenish(self):
+        """Open connections until the pool is back at min_size, e.g. after recycling one."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._open_entry()
+            except Exception as e:
+                # The next checkout opens a connection anyway; don't fail the release for it.
+                with self._cond:
+                    self._size -= 1
+                print(f"Could not replenish connection pool: {e}")
+                return
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def _is_healthy(self, entry):
+        if time.monotonic() - entry.last_used < self.health_check_interval:
+            return True
+        try:
+            entry.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self._failed_health_checks += 1
+            return False
+
+    def _open_entry(self):
+        entry = _PoolEntry(self._connect())
+        with self._cond:
+            self._created += 1
+        return entry
+
+    @staticmethod
+    def _close_entry(entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
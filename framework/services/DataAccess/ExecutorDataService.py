@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from framework.services.DataAccess.AsyncBaseDataService import AsyncBaseDataService
+
+
+class ExecutorDataService(AsyncBaseDataService):
+    """
+    Adapts a blocking BaseDataService to the async interface by running every call
+    on a bounded thread pool. Every ExecutorDataService over the same connection pool
+    shares one thread pool, sized to the connection pool, so queued calls wait for a
+    thread rather than piling up on connection checkout however many resources use it.
+    """
+
+    # executor key -> [ThreadPoolExecutor, its max_workers, number of ExecutorDataServices using it]
+    _executors = {}
+    _executors_lock = threading.Lock()
+
+    def __init__(self, data_service, max_workers=None):
+        super().__init__(data_service.context)
+        self.data_service = data_service
+        self._executor_key = self._key_for(data_service)
+        with ExecutorDataService._executors_lock:
+            shared = ExecutorDataService._executors.get(self._executor_key)
+            if shared is None:
+                workers = max_workers or self.context.get("pool_max_size", 10)
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{type(data_service).__name__}-io")
+                shared = ExecutorDataService._executors[self._executor_key] = [executor, workers, 0]
+            shared[2] += 1
+        self._executor, self.max_workers = shared[0], shared[1]
+        self._released = False
+
+    @staticmethod
+    def _key_for(data_service):
+        """Data services on one MySQL connection pool share a key; any other gets its own."""
+        pool_key = getattr(data_service, "_pool_key", None)
+        return pool_key() if pool_key is not None else id(data_service)
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_data_object(self, database_name, collection_name, key_field, key_value):
+        return await self.run(self.data_service.get_data_object, database_name, collection_name, key_field, key_value)
+
+    async def get_all_data_objects(self, database_name, collection_name, offset, limit):
+        return await self.run(self.data_service.get_all_data_objects, database_name, collection_name, offset, limit)
+
+    async def execute_query(self, query, params):
+        return await self.run(self.data_service.execute_query, query, params)
+
+    async def insert_data_object(self, database_name, collection_name, data_object):
+        return await self.run(self.data_service.insert_data_object, database_name, collection_name, data_object)
+
+    async def update_data_object(self, database_name, collection_name, key_field, key_value, updated_data):
+        return await self.run(self.data_service.update_data_object, database_name, collection_name,
+                              key_field, key_value, updated_data)
+
+    async def insert_data_objects(self, database_name, collection_name, data_objects, chunk_size=None):
+        return await self.run(self.data_service.insert_data_objects, database_name, collection_name,
+                              data_objects, chunk_size)
+
+    async def update_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        return await self.run(self.data_service.update_data_objects, database_name, collection_name,
+                              key_field, data_objects, chunk_size)
+
+    async def upsert_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        return await self.run(self.data_service.upsert_data_objects, database_name, collection_name,
+                              key_field, data_objects, chunk_size)
+
+    def shutdown(self):
+        """Stop using the shared executor; the last user shuts it down."""
+        with ExecutorDataService._executors_lock:
+            if self._released:
+                return
+            self._released = True
+            shared = ExecutorDataService._executors[self._executor_key]
+            shared[2] -= 1
+            if shared[2] > 0:
+                return
+            del ExecutorDataService._executors[self._executor_key]
+        self._executor.shutdown(wait=False)
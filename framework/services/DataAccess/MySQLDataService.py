@@ -1,5 +1,9 @@
+import threading
+import time
+from contextlib import contextmanager
 import pymysql
 from framework.services.DataAccess.BaseDataService import BaseDataService
+from framework.services.DataAccess.ConnectionPool import ConnectionPool
 
 
 class MySQLDataService(BaseDataService):
@@ -9,10 +13,15 @@ class MySQLDataService(BaseDataService):
     can subclass, reuse methods and extend.
     """
 
+    # Pools are shared by every data service pointing at the same server/account,
+    # keyed by (host, port, user).
+    _pools = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, context):
         super().__init__(context)
 
-    def _get_connection(self):
+    def _open_connection(self):
         connection = pymysql.connect(
             host=self.context["host"],
             port=self.context["port"],
@@ -23,6 +32,203 @@ class MySQLDataService(BaseDataService):
         )
         return connection
 
+    def _pool_key(self):
+        return self.context["host"], self.context["port"], self.context["user"]
+
+    def _pool_settings(self):
+        """Pool sizing and lifetime settings, taken from the context with sane defaults."""
+        return {
+            "min_size": self.context.get("pool_min_size", 1),
+            "max_size": self.context.get("pool_max_size", 10),
+            "idle_timeout": self.context.get("pool_idle_timeout", 300),
+            "max_uses": self.context.get("pool_max_uses", 1000),
+            "checkout_timeout": self.context.get("pool_checkout_timeout", 10),
+        }
+
+    def _get_pool(self):
+        key = self._pool_key()
+        pool = MySQLDataService._pools.get(key)
+        if pool is None:
+            with MySQLDataService._pools_lock:
+                pool = MySQLDataService._pools.get(key)
+                if pool is None:
+                    pool = ConnectionPool(self._open_connection, **self._pool_settings())
+                    MySQLDataService._pools[key] = pool
+        return pool
+
+    def _get_connection(self):
+        """Check a connection out of the shared pool. Leaving the ``with`` block returns it."""
+        return self._get_pool().acquire()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Check out a connection and run the block in one transaction: committed on
+        success, rolled back if the block raises.
+        """
+        with self._get_connection() as connection:
+            connection.begin()
+            try:
+                yield connection
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def _chunk_size(self, chunk_size=None):
+        return chunk_size or self.context.get("bulk_chunk_size", 1000)
+
+    @staticmethod
+    def _chunks(rows, chunk_size):
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    @staticmethod
+    def _uniform_columns(data_objects):
+        """Return the shared column list of the rows, rejecting rows with different fields."""
+        columns = list(data_objects[0].keys())
+        for data_object in data_objects:
+            if list(data_object.keys()) != columns:
+                raise ValueError(f"All rows must have the same fields: {columns} != {list(data_object.keys())}")
+        return columns
+
+    def get_pool_stats(self):
+        """Return connection pool counters for monitoring."""
+        return self._get_pool().stats()
+
+    @classmethod
+    def get_all_pool_stats(cls):
+        """Return counters for every pool opened in this process, keyed by user@host:port."""
+        with MySQLDataService._pools_lock:
+            pools = dict(MySQLDataService._pools)
+        return {f"{user}@{host}:{port}": pool.stats() for (host, port, user), pool in pools.items()}
+
+    def close_pool(self):
+        """Close the shared pool for this data service's server/account."""
+        with MySQLDataService._pools_lock:
+            pool = MySQLDataService._pools.pop(self._pool_key(), None)
+        if pool is not None:
+            pool.close()
+
+    def shutdown(self):
+        self.close_pool()
+
+    def _ensure_index(self, database_name, collection_name, index_name, columns):
+        """
+        Create an index unless one with that name already exists. MySQL has no
+        CREATE INDEX IF NOT EXISTS, so look it up in information_schema first.
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.statistics "
+                    "WHERE table_schema = %s AND table_name = %s AND index_name = %s LIMIT 1",
+                    (database_name, collection_name, index_name)
+                )
+                if cursor.fetchone() is not None:
+                    return False
+                try:
+                    cursor.execute(
+                        f"CREATE INDEX {index_name} ON {database_name}.{collection_name} ({', '.join(columns)})"
+                    )
+                except pymysql.MySQLError as e:
+                    print(f"Failed to create index {index_name} on {collection_name}: {e}")
+                    return False
+                return True
+
+    def _ensure_column(self, database_name, collection_name, column_name, definition):
+        """
+        Add a column unless the table already has it, so older schemas pick up new
+        optional fields without a manual migration.
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_schema = %s AND table_name = %s AND column_name = %s LIMIT 1",
+                    (database_name, collection_name, column_name)
+                )
+                if cursor.fetchone() is not None:
+                    return False
+                try:
+                    cursor.execute(
+                        f"ALTER TABLE {database_name}.{collection_name} ADD COLUMN {column_name} {definition}"
+                    )
+                except pymysql.MySQLError as e:
+                    print(f"Failed to add column {column_name} to {collection_name}: {e}")
+                    return False
+                return True
+
+    @contextmanager
+    def advisory_lock(self, name, timeout=0):
+        """
+        Hold a MySQL named lock (GET_LOCK) for the block, so one process at a time does
+        the work it guards. The lock belongs to the connection, which is kept checked out
+        until the block ends; the server releases it too if that connection dies.
+
+        :param timeout: Seconds to wait for a lock held elsewhere; 0 gives up at once.
+        :return: Yields whether the lock was acquired.
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT GET_LOCK(%s, %s) AS acquired", (name, timeout))
+                acquired = cursor.fetchone()["acquired"] == 1
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+
+    def initialize_data_versions(self, database_name):
+        """
+        Create the table counting writes per data set. Every process reads the same rows,
+        so validators derived from them agree across workers and restarts.
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {database_name}.data_version (
+                        name VARCHAR(64) NOT NULL PRIMARY KEY,
+                        version BIGINT NOT NULL,
+                        modifiedAt DOUBLE NOT NULL
+                    )
+                """)
+
+    def bump_data_version(self, database_name, name):
+        """Record a write to the named data set."""
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                self._bump_data_version(cursor, database_name, name)
+
+    @staticmethod
+    def _bump_data_version(cursor, database_name, name):
+        """bump_data_version on a given cursor, e.g. inside the transaction making the write."""
+        cursor.execute(
+            f"INSERT INTO {database_name}.data_version (name, version, modifiedAt) VALUES (%s, 1, %s) "
+            f"ON DUPLICATE KEY UPDATE version = version + 1, modifiedAt = VALUES(modifiedAt)",
+            (name, time.time())
+        )
+
+    def _before_commit(self, cursor, database_name, collection_name, data_objects):
+        """
+        Called by the write methods with the rows they wrote, on their cursor, just before
+        the write commits. Subclasses override it to write dependent rows atomically with
+        the write; the default does nothing.
+        """
+
+    def get_data_version(self, database_name, name):
+        """
+        :return: (version, modifiedAt) of the named data set; (0, None) if it was never written.
+        """
+        with self._get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT version, modifiedAt FROM {database_name}.data_version WHERE name = %s", (name,)
+                )
+                row = cursor.fetchone()
+        return (row["version"], row["modifiedAt"]) if row else (0, None)
+
     def get_data_object(self, database_name, collection_name, key_field, key_value):
         """Fetch a single record based on a unique key field."""
         sql_statement = f"SELECT * FROM {database_name}.{collection_name} WHERE {key_field} = %s"
@@ -51,11 +257,13 @@ class MySQLDataService(BaseDataService):
         columns = ', '.join(data_object.keys())
         placeholders = ', '.join(['%s'] * len(data_object))
         sql_statement = f"INSERT INTO {database_name}.{collection_name} ({columns}) VALUES ({placeholders})"
-        with self._get_connection() as connection:
+        with self._transaction() as connection:
             with connection.cursor() as cursor:
                 cursor.execute(sql_statement, tuple(data_object.values()))
-                connection.commit()
-                return cursor.rowcount > 0  # Returns True if the insertion was successful
+                inserted = cursor.rowcount > 0  # True if the insertion was successful
+                if inserted:
+                    self._before_commit(cursor, database_name, collection_name, [data_object])
+        return inserted
 
     def update_data_object(self, database_name, collection_name, key_field, key_value, updated_data):
         """Update an existing record in a specified table based on a unique key field."""
@@ -65,8 +273,119 @@ class MySQLDataService(BaseDataService):
         # Prepare the parameters for the query
         params = tuple(updated_data.values()) + (key_value,)
 
-        with self._get_connection() as connection:
+        with self._transaction() as connection:
             with connection.cursor() as cursor:
                 cursor.execute(sql_statement, params)
-                connection.commit()
-                return cursor.rowcount > 0
\ No newline at end of file
+                updated = cursor.rowcount > 0
+                if updated:
+                    self._before_commit(cursor, database_name, collection_name, [{key_field: key_value, **updated_data}])
+        return updated
+
+    def insert_data_objects(self, database_name, collection_name, data_objects, chunk_size=None):
+        """
+        Insert many records with one multi-row INSERT per chunk, all in one transaction.
+        Each row's flag is its chunk's outcome: True only if the server reported every
+        row of the chunk as inserted.
+        """
+        data_objects = list(data_objects)
+        if not data_objects:
+            return []
+        columns = self._uniform_columns(data_objects)
+        row_placeholder = "(" + ', '.join(['%s'] * len(columns)) + ")"
+
+        results = []
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                for chunk in self._chunks(data_objects, self._chunk_size(chunk_size)):
+                    sql_statement = (
+                        f"INSERT INTO {database_name}.{collection_name} ({', '.join(columns)}) "
+                        f"VALUES {', '.join([row_placeholder] * len(chunk))}"
+                    )
+                    params = [value for data_object in chunk for value in data_object.values()]
+                    cursor.execute(sql_statement, params)
+                    results.extend([cursor.rowcount == len(chunk)] * len(chunk))
+                self._before_commit(cursor, database_name, collection_name, data_objects)
+        return results
+
+    def upsert_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        """
+        Insert many records, updating rows whose key already exists, with one multi-row
+        INSERT ... ON DUPLICATE KEY UPDATE per chunk, all in one transaction. Inserts and
+        updates are counted from each statement's affected rows, which MySQL reports as 1
+        per inserted row and 2 per updated one; no keys are read or locked beforehand. A
+        row rewritten with the values it already holds reports 0, so the split is exact
+        when every existing row changes, as in an ingestion sync of changed games.
+
+        :return: (results, counts): one flag per input row, True once its chunk is written,
+            and {"inserted": ..., "updated": ...}.
+        """
+        data_objects = list(data_objects)
+        if not data_objects:
+            return [], {"inserted": 0, "updated": 0}
+        columns = self._uniform_columns(data_objects)
+        row_placeholder = "(" + ', '.join(['%s'] * len(columns)) + ")"
+        update_clause = ', '.join([f"{column} = VALUES({column})" for column in columns if column != key_field])
+        if not update_clause:
+            # Nothing but the key to write; a no-op assignment keeps the statement valid.
+            update_clause = f"{key_field} = {key_field}"
+
+        results = []
+        counts = {"inserted": 0, "updated": 0}
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                for chunk in self._chunks(data_objects, self._chunk_size(chunk_size)):
+                    sql_statement = (
+                        f"INSERT INTO {database_name}.{collection_name} ({', '.join(columns)}) "
+                        f"VALUES {', '.join([row_placeholder] * len(chunk))} "
+                        f"ON DUPLICATE KEY UPDATE {update_clause}"
+                    )
+                    params = [value for data_object in chunk for value in data_object.values()]
+                    cursor.execute(sql_statement, params)
+                    # affected = inserted + 2 * updated, over len(chunk) rows
+                    updated = min(max(cursor.rowcount - len(chunk), 0), len(chunk))
+                    counts["updated"] += updated
+                    counts["inserted"] += len(chunk) - updated
+                    results.extend([True] * len(chunk))
+                self._before_commit(cursor, database_name, collection_name, data_objects)
+        return results, counts
+
+    def update_data_objects(self, database_name, collection_name, key_field, data_objects, chunk_size=None):
+        """
+        Update many records in one transaction. Each chunk costs two statements: a key
+        lookup for the per-row results and one UPDATE joined against the new values.
+        """
+        data_objects = list(data_objects)
+        if not data_objects:
+            return []
+        columns = self._uniform_columns(data_objects)
+        if key_field not in columns:
+            raise ValueError(f"Every row must include the key field {key_field}")
+        value_columns = [column for column in columns if column != key_field]
+        if not value_columns:
+            raise ValueError("Rows contain nothing to update besides the key field")
+
+        existing = set()
+        with self._transaction() as connection:
+            with connection.cursor() as cursor:
+                for chunk in self._chunks(data_objects, self._chunk_size(chunk_size)):
+                    keys = [data_object[key_field] for data_object in chunk]
+                    cursor.execute(
+                        f"SELECT {key_field} FROM {database_name}.{collection_name} "
+                        f"WHERE {key_field} IN ({', '.join(['%s'] * len(keys))}) FOR UPDATE",
+                        keys
+                    )
+                    existing.update(row[key_field] for row in cursor.fetchall())
+
+                    # Derived table of the new values, one SELECT per row, joined on the key.
+                    row_select = "SELECT " + ', '.join([f"%s AS {column}" for column in columns])
+                    set_clause = ', '.join([f"t.{column} = v.{column}" for column in value_columns])
+                    sql_statement = (
+                        f"UPDATE {database_name}.{collection_name} t "
+                        f"JOIN ({' UNION ALL '.join([row_select] * len(chunk))}) v "
+                        f"ON t.{key_field} = v.{key_field} SET {set_clause}"
+                    )
+                    params = [value for data_object in chunk for value in data_object.values()]
+                    cursor.execute(sql_statement, params)
+                self._before_commit(cursor, database_name, collection_name,
+                                    [data_object for data_object in data_objects if data_object[key_field] in existing])
+        return [data_object[key_field] in existing for data_object in data_objects]
@@ -0,0 +1,49 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class PeriodicTask(ABC):
+    """
+    Base class for background work that runs on the event loop every `interval`
+    seconds, from start() until stop(). A failing run is logged and retried on the
+    next tick rather than killing the loop.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self, delay=0):
+        """Start ticking, optionally waiting `delay` seconds before the first run."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run(delay), name=type(self).__name__)
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self, delay=0):
+        if delay:
+            await asyncio.sleep(delay)
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"{type(self).__name__} run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    @abstractmethod
+    async def run_once(self):
+        raise NotImplementedError()
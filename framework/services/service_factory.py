@@ -1,15 +1,74 @@
+import threading
 from abc import ABC, abstractmethod
 
-# TODO -- Implement the framework.
-#
-
 
 class BaseServiceFactory(ABC):
+    """
+    Process-wide registry of services. Each named service is created once, on first
+    request (or eagerly via startup()), and shared by every caller until shutdown().
+    """
+
+    _services = {}
+    # Re-entrant because building a resource usually asks the factory for its data service.
+    _lock = threading.RLock()
 
     def __init__(self):
         pass
 
     @classmethod
-    @abstractmethod
     def get_service(cls, service_name):
-        raise NotImplementedError()
\ No newline at end of file
+        service = cls._services.get(service_name)
+        if service is None:
+            with cls._lock:
+                service = cls._services.get(service_name)
+                if service is None:
+                    service = cls._create_service(service_name)
+                    if service is not None:
+                        cls._services[service_name] = service
+        return service
+
+    @classmethod
+    def register(cls, service_name, service):
+        """
+        Use the given instance for service_name instead of building one, e.g. a stand-in
+        data service for tests or benchmarks. Register it before anything asks for it.
+
+        :return: The service previously registered under that name, if any.
+        """
+        with cls._lock:
+            previous = cls._services.get(service_name)
+            cls._services[service_name] = service
+        return previous
+
+    @classmethod
+    def unregister(cls, service_name):
+        """Forget the named service without shutting it down, and return it (or None)."""
+        with cls._lock:
+            return cls._services.pop(service_name, None)
+
+    @classmethod
+    @abstractmethod
+    def _create_service(cls, service_name):
+        """Build a new instance of the named service, or return None if it is unknown."""
+        raise NotImplementedError()
+
+    @classmethod
+    def startup(cls, service_names):
+        """Eagerly create the given services so the first requests do not pay for it."""
+        for service_name in service_names:
+            cls.get_service(service_name)
+
+    @classmethod
+    def shutdown(cls):
+        """Release every registered service, most recently created first, and clear the registry."""
+        with cls._lock:
+            services = list(cls._services.items())
+            cls._services.clear()
+        for service_name, service in reversed(services):
+            shutdown = getattr(service, "shutdown", None)
+            if shutdown is None:
+                continue
+            try:
+                shutdown()
+            except Exception as e:
+                print(f"Failed to shut down {service_name}: {e}")
@@ -0,0 +1,84 @@
+import hashlib
+import time
+from collections import namedtuple
+from email.utils import formatdate, parsedate_to_datetime
+
+# tag identifies the data set's contents; last_modified is an epoch timestamp, or None if unknown
+Version = namedtuple("Version", ["tag", "last_modified"])
+
+
+class DataVersion:
+    """
+    Version of a data set, for validators. It is loaded from state every process
+    shares, such as a version row in the database or a snapshot checksum, so every
+    worker issues and accepts the same validators, and they survive restarts. A loaded
+    version is reused for ttl seconds, which bounds how long a write made by another
+    process can go unnoticed; invalidate() makes this process's own writes visible at once.
+    """
+
+    def __init__(self, load, ttl=1.0):
+        """
+        :param load: Coroutine function returning the current Version.
+        :param ttl: Seconds a loaded version is reused; 0 loads it on every call.
+        """
+        self.load = load
+        self.ttl = ttl
+        self._version = None
+        self._loaded_at = 0.0
+        # Bumped by invalidate(), so a load that raced a write is not kept
+        self._generation = 0
+
+    async def current(self) -> Version:
+        now = time.monotonic()
+        if self._version is not None and now - self._loaded_at < self.ttl:
+            return self._version
+        generation = self._generation
+        version = await self.load()
+        if generation == self._generation:
+            self._version, self._loaded_at = version, now
+        return version
+
+    def invalidate(self):
+        self._generation += 1
+        self._version = None
+
+
+def make_etag(*parts) -> str:
+    """Strong, quoted ETag hashing the given parts, e.g. data versions and the query parameters."""
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: float = None, cache_control: str = None) -> dict:
+    """Validator and freshness headers for a response (and its 304)."""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def is_not_modified(request_headers, etag: str, last_modified: float = None) -> bool:
+    """
+    Whether a conditional GET can be answered with 304. If-None-Match wins over
+    If-Modified-Since, as RFC 9110 requires; ETags compare weakly for GET.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole-second precision
+        return int(last_modified) <= since
+    return False
@@ -0,0 +1,41 @@
+import base64
+import json
+from urllib.parse import urlencode
+
+from framework.exceptions.pagination_exceptions import InvalidCursorException
+
+
+def encode_cursor(values: dict) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque, URL-safe cursor token.
+
+    :param values: Mapping of sort column to the value of the last row returned.
+    :return: The cursor token.
+    """
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *fields) -> dict:
+    """
+    Decode a cursor token produced by encode_cursor().
+
+    :param cursor: The cursor token from the client.
+    :param fields: Sort columns the cursor must contain.
+    :return: Mapping of sort column to value.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorException(f"Malformed cursor: {e}")
+
+    if not isinstance(values, dict) or any(field not in values for field in fields):
+        raise InvalidCursorException(f"Cursor must contain {', '.join(fields)}")
+    return values
+
+
+def build_href(path: str, **params) -> str:
+    """Build a link to path with the given query parameters, skipping the ones that are None."""
+    query = urlencode({key: value for key, value in params.items() if value is not None})
+    return f"{path}?{query}" if query else path
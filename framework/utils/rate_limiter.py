@@ -0,0 +1,47 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: acquire() blocks until a call may proceed, so callers
+    sharing one limiter stay under `rate` calls per second on average, with bursts of
+    at most `burst` calls.
+
+    :param rate: Calls per second.
+    :param burst: Bucket size; defaults to one second's worth of calls.
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waited = 0.0
+
+    def acquire(self):
+        """Take a token, sleeping until one is available. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._waited += waited
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def stats(self):
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "total_waited_s": self._waited,
+        }
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after a time-to-live.
+
+    Lookups and writes are O(1): entries live in an OrderedDict kept in recency order,
+    so the least recently used entry is evicted first once max_size is reached.
+    Expired entries are dropped when they are next looked up or reach the LRU end.
+
+    With a weigher, each entry also has a weight (e.g. its size in bytes) and entries
+    are evicted until the total fits max_weight as well as max_size.
+
+    :param max_size: Most entries kept.
+    :param ttl: Default seconds an entry stays valid; None keeps entries until evicted.
+    :param max_weight: Most total weight kept; None for no limit.
+    :param weigher: Callable returning the weight of a value; defaults to 1 per entry.
+    """
+
+    def __init__(self, max_size=10000, ttl=None, max_weight=None, weigher=None):
+        if max_size < 1:
+            raise ValueError(f"Invalid cache size: {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+
+        # key -> (expires_at or None, value, weight)
+        self._entries = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def get(self, key, default=None, count=True):
+        """Return the cached value for key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, weight = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    if count:
+                        self._hits += 1
+                    return value
+                del self._entries[key]
+                self._weight -= weight
+                self._expirations += 1
+            if count:
+                self._misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Cache value under key for ttl seconds (the cache default if omitted)."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        weight = self.weigher(value) if self.weigher is not None else 1
+        if self.max_weight is not None and weight > self.max_weight:
+            # Would evict everything else and still not fit
+            self.pop(key)
+            return
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._weight -= previous[2]
+            self._entries[key] = (expires_at, value, weight)
+            self._entries.move_to_end(key)
+            self._weight += weight
+            while len(self._entries) > self.max_size or (
+                    self.max_weight is not None and self._weight > self.max_weight):
+                _, (oldest_expires_at, _, oldest_weight) = self._entries.popitem(last=False)
+                self._weight -= oldest_weight
+                if oldest_expires_at is not None and oldest_expires_at <= time.monotonic():
+                    self._expirations += 1
+                else:
+                    self._evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove key, returning its value if it was cached and still valid."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._weight -= entry[2]
+        if entry is None:
+            return default
+        expires_at, value, _ = entry
+        return value if expires_at is None or expires_at > time.monotonic() else default
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self):
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "weight": self._weight,
+            "max_weight": self.max_weight,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
@@ -0,0 +1,41 @@
+import pytest
+
+from framework.services.DataAccess.MySQLDataService import MySQLDataService
+from app.services.service_factory import ServiceFactory
+from tests.fake_mysql import FakeMySQLServer
+
+
+@pytest.fixture
+def fake_mysql(tmp_path, monkeypatch):
+    """
+    Point every MySQL data service at a fresh SQLite-backed fake server, with empty
+    connection pools and service registry before and after the test.
+    """
+    from app.services.DataAccess.GamesDataService import GamesDataService
+
+    server = FakeMySQLServer(tmp_path / "game.db")
+    for name, value in {"DB_HOST": "fake", "DB_PORT": "3306", "DB_USER": "test", "DB_PASSWORD": "test"}.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(MySQLDataService, "_open_connection", lambda self: server.connect())
+
+    def initialize(self, database_name):
+        from sqlalchemy.orm import sessionmaker
+        self.engine = server.sqlalchemy_engine()
+        self.Session = sessionmaker(bind=self.engine)
+        self.initialize_genres(database_name)
+        self.initialize_ingestion_state(database_name)
+        self.initialize_data_versions(database_name)
+
+    monkeypatch.setattr(GamesDataService, "initialize", initialize)
+    _reset()
+    yield server
+    _reset()
+
+
+def _reset():
+    ServiceFactory.shutdown()
+    with MySQLDataService._pools_lock:
+        pools = list(MySQLDataService._pools.values())
+        MySQLDataService._pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,203 @@
+"""
+SQLite-backed stand-in for a MySQL server, for tests.
+
+FakeConnection speaks the small part of the pymysql API the data services use
+(DictCursor rows, begin/commit/rollback, ping) and rewrites the MySQL dialect they
+emit into SQLite. Row locks (FOR UPDATE / SKIP LOCKED) have no SQLite equivalent and
+are dropped; SQLite serializes writers instead, so claim logic is still exercised.
+"""
+import re
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_request (
+    userId TEXT, gameId TEXT, matchRequestId TEXT PRIMARY KEY, expireDate TEXT,
+    isActive INT, isCancelled INT, skillRating INT, region TEXT, language TEXT, activatedAt TEXT
+);
+CREATE TABLE IF NOT EXISTS matched_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, matchRequestId1 TEXT, matchRequestId2 TEXT, gameId TEXT,
+    status TEXT DEFAULT 'matched', created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS game_info (
+    gameId TEXT PRIMARY KEY, image TEXT, title TEXT, description TEXT, genre TEXT
+);
+CREATE TABLE IF NOT EXISTS favourites (favouriteId TEXT PRIMARY KEY, userId TEXT, gameId TEXT);
+"""
+
+# SQLite allows one writer at a time; serialize statements so threads never see "database is locked"
+_lock = threading.RLock()
+
+
+def translate(sql):
+    """Rewrite the MySQL constructs the data services use into SQLite."""
+    if "information_schema.columns" in sql:
+        # Columns are all part of SCHEMA already
+        return "SELECT 1 WHERE ? || ? || ? IS NOT NULL"
+    if "information_schema" in sql:
+        return "SELECT 1 WHERE 0 AND ? || ? || ? IS NULL"
+    sql = sql.replace("%s", "?")
+    sql = re.sub(r"\bGame\.", "", sql)
+    sql = re.sub(r"FOR UPDATE( SKIP LOCKED)?", "", sql)
+    sql = re.sub(r"TIMESTAMPDIFF\(SECOND, (\w+), NOW\(\)\)",
+                 r"CAST((julianday('now') - julianday(\1)) * 86400 AS INT)", sql)
+    sql = sql.replace("<=>", " IS ").replace("GREATEST(", "max(").replace("LEAST(", "min(")
+    sql = sql.replace("CURDATE()", "date('now')").replace("NOW()", "datetime('now')")
+    sql = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", sql)
+    sql = sql.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT DO UPDATE SET")
+    sql = sql.replace("ON UPDATE CURRENT_TIMESTAMP", "")
+    # UPDATE t JOIN (...) v ON ... SET t.x = v.x  ->  UPDATE ... SET x = v.x FROM (...) v WHERE ...
+    update_join = re.match(r"UPDATE (\S+) (\w+) JOIN \((.*)\) (\w+) ON (.*?) SET (.*)$", sql, re.S)
+    if update_join:
+        table, alias, derived, values, condition, assignments = update_join.groups()
+        assignments = re.sub(rf"\b{alias}\.(\w+) =", r"\1 =", assignments)
+        sql = f"UPDATE {table} AS {alias} SET {assignments} FROM ({derived}) AS {values} WHERE {condition}"
+    sql = re.sub(r",\s*INDEX \w+ \([\w, ]+\)", "", sql)
+    sql = re.sub(r"CREATE INDEX (\w+) ON (\w+)", r"CREATE INDEX IF NOT EXISTS \1 ON \2", sql)
+    return sql
+
+
+class FakeCursor:
+
+    def __init__(self, server):
+        self.server = server
+        self._cursor = server.connection.cursor()
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, sql, params=()):
+        self.server.statements.append(sql)
+        if re.match(r"\s*(CREATE DATABASE|USE|SET )", sql):
+            return 0
+        # MySQL counts an upserted row as 1 if inserted and 2 if updated; SQLite as 1 either way
+        upsert = re.match(r"\s*INSERT INTO (?:Game\.)?(\w+) .*ON DUPLICATE KEY UPDATE", sql, re.S)
+        with _lock:
+            if upsert:
+                before = self._cursor.execute(f"SELECT COUNT(*) FROM {upsert.group(1)}").fetchone()[0]
+            self._cursor.execute(translate(sql), tuple(params or ()))
+            self.rowcount = self._cursor.rowcount
+            self.lastrowid = self._cursor.lastrowid
+            if upsert:
+                inserted = self._cursor.execute(f"SELECT COUNT(*) FROM {upsert.group(1)}").fetchone()[0] - before
+                self.rowcount = inserted + 2 * (self.rowcount - inserted)
+        return self.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        self.server.statements.append(sql)
+        with _lock:
+            self._cursor.executemany(translate(sql), [tuple(params) for params in seq_of_params])
+        self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def _dicts(self, rows):
+        columns = [column[0] for column in self._cursor.description or []]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._dicts([row])[0]
+
+    def fetchall(self):
+        return self._dicts(self._cursor.fetchall())
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self, server):
+        self.server = server
+        self.connection = sqlite3.connect(server.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.connection.create_function("GET_LOCK", 2, lambda name, timeout: server.get_lock(self, name))
+        self.connection.create_function("RELEASE_LOCK", 1, lambda name: server.release_lock(self, name))
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    @property
+    def statements(self):
+        return self.server.statements
+
+    def begin(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self.connection.in_transaction:
+            self.connection.execute("COMMIT")
+
+    def rollback(self):
+        if self.connection.in_transaction:
+            self.connection.execute("ROLLBACK")
+
+    def ping(self, reconnect=False):
+        if self.closed:
+            raise sqlite3.ProgrammingError("Connection closed")
+
+    def close(self):
+        self.closed = True
+        self.server.release_locks(self)
+        self.connection.close()
+
+
+class FakeMySQLServer:
+    """One SQLite database file plus the log of statements sent to it."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.statements = []
+        # GET_LOCK name -> the connection holding it
+        self.named_locks = {}
+        connection = sqlite3.connect(self.path)
+        connection.executescript(SCHEMA)
+        connection.close()
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def execute(self, sql, params=()):
+        """Run SQLite directly, for test setup and assertions."""
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            with _lock:
+                return [dict(row) for row in connection.execute(sql, params).fetchall()]
+        finally:
+            connection.close()
+
+    def get_lock(self, connection, name):
+        """GET_LOCK without waiting: 1 if connection now holds name, 0 if another one does."""
+        with _lock:
+            return int(self.named_locks.setdefault(name, connection) is connection)
+
+    def release_lock(self, connection, name):
+        with _lock:
+            if self.named_locks.get(name) is not connection:
+                return 0
+            del self.named_locks[name]
+            return 1
+
+    def release_locks(self, connection):
+        """Like the server when a session ends: drop every named lock it held."""
+        with _lock:
+            for name in [name for name, holder in self.named_locks.items() if holder is connection]:
+                del self.named_locks[name]
+
+    def sqlalchemy_engine(self):
+        """Engine for GamesDataService's ORM queries; the file is attached as schema Game too."""
+        from sqlalchemy import create_engine, event
+
+        engine = create_engine(f"sqlite:///{self.path}")
+
+        @event.listens_for(engine, "connect")
+        def attach_game_schema(dbapi_connection, connection_record):
+            dbapi_connection.execute(f"ATTACH DATABASE '{self.path}' AS Game")
+
+        return engine
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.models.match_request_initiate import MatchRequestInitiate
+from app.services.Matchmaking.AdmissionController import AdmissionController
+from app.services.service_factory import ServiceFactory
+from framework.exceptions.match_exceptions import MatchmakingOverloadedException, TooManyMatchRequestsException
+from tests.test_match_request_data_service import add_request, is_active
+
+
+def test_admissions_are_bounded_by_concurrent_and_queued_work():
+    controller = AdmissionController(max_concurrent=1, max_queued=1)
+    controller.admit("a")
+    controller.admit("b")
+    with pytest.raises(MatchmakingOverloadedException):
+        controller.admit("c")
+
+    controller.release("a")
+    controller.admit("c")
+    assert controller.held == 2
+
+
+def test_running_releases_the_admission():
+    controller = AdmissionController(max_concurrent=1, max_queued=0)
+
+    async def scenario():
+        controller.admit("a")
+        async with controller.running("a"):
+            with pytest.raises(MatchmakingOverloadedException):
+                controller.admit("b")
+
+    asyncio.run(scenario())
+    assert controller.held == 0 and controller.stats()["released"] == 1
+    controller.admit("b")
+
+
+@pytest.fixture
+def resource(fake_mysql, monkeypatch):
+    monkeypatch.setenv("MATCHMAKING_MAX_PER_USER", "2")
+    return ServiceFactory.get_service("MatchRequestsResource")
+
+
+def initiate(resource, match_request_id):
+    async def scenario():
+        await resource.initiate_match_process(MatchRequestInitiate(MatchRequestId=match_request_id))
+        await resource.process_matchmaking(match_request_id)
+
+    asyncio.run(scenario())
+
+
+def test_queued_requests_hold_no_admission(resource, fake_mysql):
+    for match_request_id, game_id in [("a", "g1"), ("b", "g2")]:
+        add_request(fake_mysql, match_request_id, user_id="u1", game_id=game_id, active=False)
+
+    initiate(resource, "a")
+    initiate(resource, "b")
+    # Neither found a partner: both are queued, but their processing is over
+    assert resource.admission_controller.held == 0
+    assert resource.matchmaking_engine.stats()["queued"] == 2
+
+
+def test_users_are_capped_on_their_active_requests(resource, fake_mysql):
+    for match_request_id, game_id in [("a", "g1"), ("b", "g2"), ("c", "g3")]:
+        add_request(fake_mysql, match_request_id, user_id="u1", game_id=game_id, active=False)
+    # Active on another worker; counts all the same
+    add_request(fake_mysql, "d", user_id="u1", game_id="g4")
+
+    initiate(resource, "a")
+    with pytest.raises(TooManyMatchRequestsException):
+        initiate(resource, "b")
+    assert not is_active(fake_mysql, "b")
+
+    asyncio.run(resource.cancel_match_request("a"))
+    initiate(resource, "b")
+    assert is_active(fake_mysql, "b")
+
+
+def test_the_cap_holds_at_activation(resource, fake_mysql):
+    add_request(fake_mysql, "a", user_id="u1", game_id="g1", active=False)
+    add_request(fake_mysql, "b", user_id="u1", game_id="g2")
+    add_request(fake_mysql, "c", user_id="u1", game_id="g3")
+
+    assert not resource.data_service.activate_match_request("a", "u1", 2)
+    assert resource.data_service.activate_match_request("a", "u1", 3)
+    assert resource.data_service.count_active_match_requests("u1") == 3
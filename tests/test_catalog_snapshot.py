@@ -0,0 +1,135 @@
+import asyncio
+import random
+
+import pytest
+
+from app.services.Catalog.CatalogSnapshot import CatalogSnapshot
+from app.services.service_factory import ServiceFactory
+
+MAIN_GENRES = ["arcade", "shooter", "puzzle"]
+GENRES = MAIN_GENRES + ["racing", "sports"]
+WORDS = ["star", "mario", "kart", "dark", "souls", "hollow", "knight"]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    rng = random.Random(11)
+    rows, game_genres = [], []
+    for i in rng.sample(range(10_000), 600):
+        game_id = f"g{i:05d}"
+        genres = rng.sample(GENRES, rng.randint(0, 3))
+        rows.append((game_id, " ".join(rng.choice(WORDS).capitalize() for _ in range(2)), "", None, ",".join(genres)))
+        game_genres.extend((game_id, genre) for genre in genres)
+    return rows, game_genres
+
+
+def naive(catalog, title=None, game_id=None, genres=None, genre_match="any"):
+    """The filter as a scan over the rows, in gameId order."""
+    rows, game_genres = catalog
+    genres_of = {}
+    for row_id, genre in game_genres:
+        genres_of.setdefault(row_id, set()).add(genre)
+
+    def has(row_id, genre):
+        if genre == "other":
+            return not genres_of.get(row_id, set()) & set(MAIN_GENRES)
+        return genre in genres_of.get(row_id, set())
+
+    matched = []
+    for row in sorted(rows):
+        if title and title.lower() not in row[1].lower():
+            continue
+        if game_id is not None and row[0] != game_id:
+            continue
+        if genres and not (all if genre_match == "all" else any)(has(row[0], genre) for genre in genres):
+            continue
+        matched.append(row[0])
+    return matched
+
+
+FILTERS = [
+    {},
+    {"title": "STAR"},
+    {"title": "ark k"},
+    {"genres": ["arcade"]},
+    {"genres": ["arcade", "racing"]},
+    {"genres": ["arcade", "racing"], "genre_match": "all"},
+    {"genres": ["other"]},
+    {"genres": ["puzzle"], "title": "souls"},
+    {"game_id": "missing"},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("page_size", [1, 7, 50])
+def test_offset_and_keyset_pages_match_a_naive_scan(catalog, filters, page_size):
+    snapshot = CatalogSnapshot(*catalog, MAIN_GENRES)
+    expected = naive(catalog, **filters)
+    mask = snapshot.select(**filters)
+
+    by_offset, offset = [], 0
+    while True:
+        records, has_next_page = snapshot.page(mask, page_size, offset=offset)
+        by_offset.extend(record.gameId for record in records)
+        offset += page_size
+        if not has_next_page:
+            break
+
+    by_cursor, after_id = [], None
+    while True:
+        records, has_next_page = snapshot.page(mask, page_size, after_id=after_id)
+        by_cursor.extend(record.gameId for record in records)
+        if not has_next_page:
+            break
+        after_id = records[-1].gameId
+
+    assert by_offset == expected
+    assert by_cursor == expected
+
+
+def test_genre_counts_match_a_naive_scan(catalog):
+    counts = CatalogSnapshot(*catalog, MAIN_GENRES).genre_counts()
+    assert counts["total"] == len(catalog[0])
+    assert counts["other"] == len(naive(catalog, genres=["other"]))
+    for genre in GENRES:
+        assert counts["genres"].get(genre, 0) == len(naive(catalog, genres=[genre]))
+
+
+def test_select_by_game_id(catalog):
+    snapshot = CatalogSnapshot(*catalog, MAIN_GENRES)
+    game_id = catalog[0][0][0]
+    records, has_next_page = snapshot.page(snapshot.select(game_id=game_id), 10)
+    assert [record.gameId for record in records] == [game_id] and not has_next_page
+    assert snapshot.get(game_id)["title"] == catalog[0][0][1]
+
+
+@pytest.fixture
+def resource(fake_mysql, monkeypatch):
+    monkeypatch.setenv("GAMES_CATALOG_SNAPSHOT_ENABLED", "true")
+    for game_id, title in [("g1", "Super Mario"), ("g2", "Stardew Valley")]:
+        fake_mysql.execute("INSERT INTO game_info (gameId, title, genre) VALUES (?, ?, ?)", (game_id, title, "arcade"))
+    return ServiceFactory.get_service("GamesResource")
+
+
+def test_refresh_rebuilds_the_title_indexes_before_the_swap(resource, fake_mysql):
+    assert resource.title_index.search("mario") == ["g1"]
+    # Another worker adds a game; this process only sees it through the next snapshot
+    fake_mysql.execute("INSERT INTO game_info (gameId, title, genre) VALUES (?, ?, ?)", ("g3", "Mario Kart", "arcade"))
+    title_index, prefix_index = resource.title_index, resource.prefix_index
+
+    snapshot = asyncio.run(resource.refresh_catalog())
+    # Built off the request path, but not yet visible
+    assert resource.title_index is title_index and resource.catalog is not snapshot
+    assert resource.prefix_index.suggest("mario k", 10) == []
+
+    resource.on_catalog_loaded(snapshot)
+    assert resource.catalog is snapshot
+    assert sorted(resource.title_index.search("mario")) == ["g1", "g3"]
+    assert [game_id for game_id, _ in resource.prefix_index.suggest("mario k", 10)] == ["g3"]
+    assert resource.prefix_index is not prefix_index
+
+
+def test_unchanged_refresh_keeps_the_indexes(resource):
+    title_index, prefix_index = resource.title_index, resource.prefix_index
+    asyncio.run(resource.catalog_refresher.run_once())
+    assert resource.title_index is title_index and resource.prefix_index is prefix_index
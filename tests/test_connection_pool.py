@@ -0,0 +1,91 @@
+import pytest
+
+from framework.exceptions.data_access_exceptions import ConnectionPoolExhaustedException
+from framework.services.DataAccess.ConnectionPool import ConnectionPool
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**settings):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    return ConnectionPool(connect, **settings), opened
+
+
+def test_pool_opens_min_size_up_front():
+    pool, opened = make_pool(min_size=2, max_size=4)
+    assert len(opened) == 2
+    assert pool.stats()["idle"] == 2
+
+
+def test_recycled_connection_is_replaced_up_to_min_size():
+    pool, opened = make_pool(min_size=2, max_size=4, max_uses=1)
+    with pool.acquire():
+        pass
+    stats = pool.stats()
+    assert stats["recycled"] == 1
+    assert stats["size"] == 2 and stats["idle"] == 2
+    assert opened[-1] is not opened[0] and sum(c.closed for c in opened) == 1
+
+
+def test_overflow_connections_are_not_replenished():
+    pool, opened = make_pool(min_size=1, max_size=3, max_uses=1)
+    first, second = pool.acquire(), pool.acquire()
+    first.close()
+    second.close()
+    assert pool.stats()["size"] == 1
+
+
+def test_replenish_failure_does_not_break_release():
+    pool, opened = make_pool(min_size=1, max_size=2, max_uses=1)
+    connection = pool.acquire()
+    pool._connect = lambda: (_ for _ in ()).throw(OSError("down"))
+    connection.close()
+    assert pool.stats()["size"] == 0
+
+
+def test_checkout_times_out_at_max_size():
+    pool, opened = make_pool(min_size=0, max_size=1, checkout_timeout=0.05)
+    with pool.acquire():
+        with pytest.raises(ConnectionPoolExhaustedException):
+            pool.acquire()
+
+
+def test_data_services_on_one_pool_share_one_executor(fake_mysql):
+    from app.services.DataAccess.FavouritesDataService import FavouritesDataService
+    from app.services.DataAccess.MatchRequestDataService import MatchRequestDataService
+    from framework.services.DataAccess.ExecutorDataService import ExecutorDataService
+
+    context = {"host": "fake", "port": 3306, "user": "test", "password": "test", "pool_max_size": 4}
+    first = ExecutorDataService(MatchRequestDataService(dict(context)))
+    second = ExecutorDataService(FavouritesDataService(dict(context)))
+    other = ExecutorDataService(MatchRequestDataService(dict(context, user="other")))
+    assert first._executor is second._executor and first.max_workers == 4
+    assert other._executor is not first._executor
+
+    first.shutdown()
+    first.shutdown()
+    # Still in use by second
+    assert second._executor.submit(lambda: 1).result() == 1
+    second.shutdown()
+    other.shutdown()
+    again = ExecutorDataService(MatchRequestDataService(dict(context)))
+    assert again._executor is not first._executor
+    again.shutdown()
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.service_factory import ServiceFactory
+
+GAMES = [("g1", "Super Mario", "arcade"), ("g2", "Mario Kart", "racing"), ("g3", "Dr. Mario", "puzzle,arcade"),
+         ("g4", "Stardew Valley", "sim")]
+
+
+@pytest.fixture
+def resource(fake_mysql):
+    for game in GAMES:
+        fake_mysql.execute("INSERT INTO game_info (gameId, title, genre) VALUES (?, ?, ?)", game)
+    return ServiceFactory.get_service("GamesResource")
+
+
+def test_writes_by_other_workers_reach_the_title_indexes(resource, fake_mysql):
+    refresher = resource.index_refresher
+    assert not asyncio.run(refresher.run_once())
+
+    # Another worker adds a game; this process's change listeners hear nothing
+    fake_mysql.execute("INSERT INTO game_info (gameId, title, genre) VALUES (?, ?, ?)", ("g5", "Mario Party", "party"))
+    resource.data_service.bump_data_version("Game", "game_info")
+    resource.catalog_version.invalidate()
+    title_index = resource.title_index
+
+    assert asyncio.run(refresher.run_once())
+    assert resource.title_index is not title_index
+    assert "g5" in resource.title_index.search("mario")
+    assert [game_id for game_id, _ in resource.prefix_index.suggest("mario p", 10)] == ["g5"]
+    assert not asyncio.run(refresher.run_once())
+
+
+@pytest.mark.parametrize("genre, genre_match, expected", [
+    ("arcade", "any", {"g1", "g3"}),
+    ("arcade,racing", "any", {"g1", "g2", "g3"}),
+    ("arcade,puzzle", "all", {"g3"}),
+    ("other", "any", {"g2"}),
+])
+def test_title_search_pages_through_the_genre_filter(resource, genre, genre_match, expected):
+    found, page = [], 1
+    while True:
+        games = asyncio.run(resource.get_list("mario", None, page, 1, genre, None, genre_match))
+        found.extend(game.gameId for game in games.games)
+        if games.links.next is None:
+            break
+        page += 1
+    assert len(found) == len(set(found))
+    assert set(found) == expected
+
+
+def test_game_genres_are_written_in_the_game_info_transaction(resource, fake_mysql):
+    data_service = resource.data_service
+    data_service.upsert_data_objects("Game", "game_info", "gameId", [
+        {"gameId": "g1", "title": "Super Mario", "genre": "platform"},
+        {"gameId": "g6", "title": "Tetris", "genre": "puzzle"},
+    ])
+    assert fake_mysql.execute("SELECT gameId, genre FROM game_genre WHERE gameId IN ('g1', 'g6') ORDER BY gameId") == [
+        {"gameId": "g1", "genre": "platform"}, {"gameId": "g6", "genre": "puzzle"}]
+
+    # A failed genre write takes the game_info rows and the version bump with it
+    version = fake_mysql.execute("SELECT version FROM data_version WHERE name = 'game_info'")
+    fake_mysql.execute("DROP TABLE game_genre")
+    with pytest.raises(Exception):
+        data_service.upsert_data_objects("Game", "game_info", "gameId", [{"gameId": "g7", "title": "Doom", "genre": "shooter"}])
+    with pytest.raises(Exception):
+        data_service.insert_data_objects("Game", "game_info", [{"gameId": "g8", "title": "Quake", "genre": "shooter"}])
+    assert not data_service.insert_data_object("Game", "game_info", {"gameId": "g9", "title": "Myst", "genre": "adventure"})
+    assert fake_mysql.execute("SELECT gameId FROM game_info WHERE gameId IN ('g7', 'g8', 'g9')") == []
+    assert fake_mysql.execute("SELECT version FROM data_version WHERE name = 'game_info'") == version
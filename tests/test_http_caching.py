@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import favourites, games
+from app.services.service_factory import ServiceFactory
+from framework.utils.http_caching import DataVersion, Version
+
+
+def test_data_version_reuses_a_loaded_version_until_invalidated():
+    loads = []
+
+    async def load():
+        loads.append(len(loads))
+        return Version(f"v{len(loads)}", None)
+
+    version = DataVersion(load, ttl=60)
+    assert asyncio.run(version.current()).tag == "v1"
+    assert asyncio.run(version.current()).tag == "v1"
+    version.invalidate()
+    assert asyncio.run(version.current()).tag == "v2"
+    assert asyncio.run(DataVersion(load, ttl=0).current()).tag == "v3"
+
+
+def add_game(fake_mysql, game_id, title):
+    fake_mysql.execute("INSERT INTO game_info (gameId, title, genre) VALUES (?, ?, ?)", (game_id, title, "arcade"))
+
+
+def worker():
+    """
+    A test client over freshly created services: nothing in memory carries over, as for
+    another worker process. The routers look services up per request, so earlier clients
+    switch to the new services too; only state shared through the database connects them.
+    """
+    ServiceFactory.shutdown()
+    app = FastAPI()
+    app.include_router(games.router)
+    app.include_router(favourites.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def client(fake_mysql, monkeypatch):
+    monkeypatch.setenv("GAMES_CATALOG_VERSION_TTL", "0")
+    monkeypatch.setenv("FAVOURITES_VERSION_TTL", "0")
+    add_game(fake_mysql, "g1", "Super Mario")
+    add_game(fake_mysql, "g2", "Stardew Valley")
+    return worker()
+
+
+def test_validators_are_shared_by_every_worker(client):
+    first = client.get("/games", params={"page_size": 5})
+    other = worker()
+    second = other.get("/games", params={"page_size": 5})
+    assert first.status_code == second.status_code == 200
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert other.get("/games", params={"page_size": 5},
+                     headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+def test_a_write_on_one_worker_invalidates_the_validators_of_the_others(client):
+    etag = client.get("/games/g1").headers["ETag"]
+    other = worker()
+    ServiceFactory.get_service("GamesResource").data_service.update_data_object(
+        "Game", "game_info", "gameId", "g1", {"title": "Super Mario Bros."}
+    )
+
+    response = other.get("/games/g1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Super Mario Bros."
+    assert response.headers["ETag"] != etag
+    assert client.get("/games/g1", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_a_game_that_is_gone_gets_a_404_not_a_304(client, fake_mysql):
+    etag = client.get("/games/g1").headers["ETag"]
+    fake_mysql.execute("DELETE FROM game_info WHERE gameId = ?", ("g1",))
+    # The row went without a version bump; the existence check still catches it
+    ServiceFactory.get_service("GamesResource").games_cache.clear()
+    assert client.get("/games/g1", headers={"If-None-Match": etag}).status_code == 404
+    assert client.get("/games/missing", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_a_conditional_get_checks_existence_without_building_the_game(client, monkeypatch):
+    etag = client.get("/games/g1").headers["ETag"]
+    res = ServiceFactory.get_service("GamesResource")
+    res.games_cache.clear()
+
+    async def get_item(key):
+        raise AssertionError("a 304 must not fetch the game")
+
+    monkeypatch.setattr(res, "get_item", get_item)
+    assert client.get("/games/g1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/games/missing", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_if_modified_since_uses_the_shared_modification_time(client):
+    client.get("/games")
+    ServiceFactory.get_service("GamesResource").data_service.update_data_object(
+        "Game", "game_info", "gameId", "g2", {"title": "Stardew"}
+    )
+    last_modified = client.get("/games").headers["Last-Modified"]
+    assert worker().get("/games", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_favourites_validators_follow_favourites_and_catalog_writes(client):
+    etag = client.get("/favourites/u1").headers["ETag"]
+    assert client.get("/favourites/u1", headers={"If-None-Match": etag}).status_code == 304
+
+    other = worker()
+    assert other.post("/favourite", json={"userId": "u1", "gameId": "g1"}).status_code == 201
+    response = client.get("/favourites/u1", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and len(response.json()["games"]) == 1
+    etag = response.headers["ETag"]
+
+    ServiceFactory.get_service("GamesResource").data_service.update_data_object(
+        "Game", "game_info", "gameId", "g1", {"title": "Super Mario 64"}
+    )
+    assert other.get("/favourites/u1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_favourites_validators_are_per_user(client):
+    etag = client.get("/favourites/u1").headers["ETag"]
+    assert worker().post("/favourite", json={"userId": "u2", "gameId": "g1"}).status_code == 201
+    assert client.get("/favourites/u1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.post("/favourite", json={"userId": "u1", "gameId": "g2"}).status_code == 201
+    assert client.get("/favourites/u1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_snapshot_mode_tags_the_snapshot_it_serves(fake_mysql, monkeypatch):
+    monkeypatch.setenv("GAMES_CATALOG_SNAPSHOT_ENABLED", "true")
+    add_game(fake_mysql, "g1", "Super Mario")
+    client = worker()
+    etag = client.get("/games").headers["ETag"]
+    resource = ServiceFactory.get_service("GamesResource")
+
+    add_game(fake_mysql, "g2", "Stardew Valley")
+    # Not in the snapshot yet, so what this worker serves is unchanged
+    assert client.get("/games", headers={"If-None-Match": etag}).status_code == 304
+    asyncio.run(resource.catalog_refresher.run_once())
+    response = client.get("/games", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and len(response.json()["games"]) == 2
+
+
+def test_cached_bodies_follow_writes_made_by_other_workers(client, fake_mysql):
+    assert client.get("/games/g1").json()["title"] == "Super Mario"
+    assert client.get("/games/genres").json()["genres"] == {"arcade": 2}
+    # Another worker renames g1 and adds a game; this process's change listeners hear nothing
+    resource = ServiceFactory.get_service("GamesResource")
+    fake_mysql.execute("UPDATE game_info SET title = ? WHERE gameId = ?", ("Super Mario 64", "g1"))
+    add_game(fake_mysql, "g3", "Hollow Knight")
+    fake_mysql.execute("INSERT INTO game_genre (gameId, genre) VALUES (?, ?)", ("g3", "arcade"))
+    resource.data_service.bump_data_version("Game", "game_info")
+
+    response = client.get("/games/g1")
+    assert response.json()["title"] == "Super Mario 64"
+    assert client.get("/games/genres").json()["genres"] == {"arcade": 3}
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from app.services.Ingestion.IgdbClient import IgdbClient
+from app.services.Ingestion.IgdbIngestion import SOURCE, IgdbIngestion
+from app.services.Ingestion.IgdbSyncTask import IgdbSyncTask
+from app.services.service_factory import ServiceFactory
+from benchmarks.fake_igdb_server import parse_args, serve
+
+GAMES = 300
+
+
+@pytest.fixture
+def igdb():
+    server = serve(parse_args(["--games", str(GAMES), "--port", "0", "--latency", "0.005",
+                               "--throttle-rate", "0.5", "--retry-after", "0", "--seed", "7"]))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ingestion(igdb, fake_mysql):
+    client = IgdbClient(base_url=f"http://127.0.0.1:{igdb.server_address[1]}", requests_per_second=1000,
+                        max_connections=4, max_retries=10, backoff_factor=0)
+    data_service = ServiceFactory.get_service("GamesResourceDataService")
+    data_service.initialize("Game")
+    ingestion = IgdbIngestion(client, data_service, page_size=40, max_concurrency=4, batch_size=100)
+    yield ingestion
+    ingestion.shutdown()
+
+
+def games(fake_mysql):
+    return {row["gameId"]: row for row in fake_mysql.execute("SELECT * FROM game_info")}
+
+
+def test_full_sync_copies_the_catalog_through_throttling(igdb, ingestion, fake_mysql):
+    stats = ingestion.sync()
+
+    assert stats["full"] and stats["expected"] == stats["fetched"] == stats["upserted"] == GAMES
+    assert stats["inserted"] == GAMES and stats["batches"] == 3
+    # Some requests were answered with 429 and retried until they went through
+    assert igdb.counters["throttled"] > 0
+    assert igdb.counters["requests"] == ingestion.client.stats()["requests"] + igdb.counters["throttled"]
+
+    rows = games(fake_mysql)
+    assert len(rows) == GAMES
+    source = {str(game["id"]): game for game in igdb.catalog}
+    assert all(rows[game_id]["title"] == game["name"] for game_id, game in source.items())
+    assert stats["high_water_mark"] == max(game["updated_at"] for game in igdb.catalog)
+    assert ingestion.data_service.get_high_water_mark("Game", SOURCE) == stats["high_water_mark"]
+
+
+def test_incremental_sync_fetches_only_what_changed(igdb, ingestion, fake_mysql):
+    first = ingestion.sync()
+    assert ingestion.sync()["fetched"] == 0
+
+    now = int(time.time()) + 60
+    igdb.catalog[4].update(name="Renamed", updated_at=now)
+    igdb.catalog.append({"id": GAMES + 1, "name": "Brand New", "genres": [], "updated_at": now + 1})
+    stats = ingestion.sync()
+
+    assert not stats["full"] and stats["since"] == first["high_water_mark"]
+    assert stats["fetched"] == stats["upserted"] == 2 and stats["inserted"] == 1
+    assert stats["high_water_mark"] == now + 1
+    rows = games(fake_mysql)
+    assert len(rows) == GAMES + 1
+    assert rows[str(igdb.catalog[4]["id"])]["title"] == "Renamed"
+    assert rows[str(GAMES + 1)]["title"] == "Brand New"
+
+
+def test_only_the_lock_holder_syncs(ingestion, fake_mysql):
+    first, second = IgdbSyncTask(ingestion), IgdbSyncTask(ingestion)
+
+    with ingestion.data_service.advisory_lock(first.lock_name) as acquired:
+        assert acquired
+        # Another worker's run finds the lock taken and leaves the sync to the holder
+        assert second.sync() is None
+    assert second.stats()["skipped"] == 1 and games(fake_mysql) == {}
+
+    # Released with the block: the next run anywhere takes over
+    assert first.sync()["upserted"] == GAMES
+    assert fake_mysql.named_locks == {}
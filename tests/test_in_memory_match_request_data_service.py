@@ -0,0 +1,47 @@
+import inspect
+
+from app.services.DataAccess.MatchRequestDataService import MatchRequestDataService
+from app.services.service_factory import ServiceFactory
+from benchmarks.InMemoryMatchRequestDataService import InMemoryMatchRequestDataService
+from tests.test_match_request_data_service import TOMORROW
+
+
+def public_methods(cls):
+    return {name: inspect.signature(method) for name, method in vars(cls).items()
+            if inspect.isfunction(method) and not name.startswith("_")}
+
+
+def test_stand_in_implements_the_match_request_data_service_interface():
+    real = public_methods(MatchRequestDataService)
+    stand_in = public_methods(InMemoryMatchRequestDataService)
+    for name, signature in real.items():
+        assert name in stand_in, f"InMemoryMatchRequestDataService lacks {name}"
+        assert list(stand_in[name].parameters) == list(signature.parameters), name
+
+
+def test_stand_in_cancel_follows_the_real_rules():
+    service = InMemoryMatchRequestDataService()
+    for match_request_id in "abc":
+        service.insert_data_object("Game", "match_request", {
+            "matchRequestId": match_request_id, "userId": f"u{match_request_id}", "gameId": "g1",
+            "expireDate": TOMORROW, "isActive": False, "isCancelled": False,
+        })
+        service.activate_match_request(match_request_id)
+    service.claim_group(["a", "b"], "g1")
+
+    assert not service.cancel_match_request("a")
+    assert service.cancel_match_request("c")
+    assert not service.cancel_match_request("c")
+    assert not service.claim_group(["c", "a"], "g1")["matched"]
+    assert service.get_settled_match_requests(["a", "c", "missing"]) == ["a", "c", "missing"]
+
+
+def test_factory_register_replaces_and_unregister_forgets():
+    stand_in = InMemoryMatchRequestDataService()
+    previous = ServiceFactory.register("MatchResourceDataService", stand_in)
+    try:
+        assert ServiceFactory.get_service("MatchResourceDataService") is stand_in
+    finally:
+        assert ServiceFactory.unregister("MatchResourceDataService") is stand_in
+        if previous is not None:
+            ServiceFactory.register("MatchResourceDataService", previous)
@@ -0,0 +1,243 @@
+import asyncio
+import datetime
+import re
+
+import pytest
+
+from app.services.DataAccess.MatchRequestDataService import MatchRequestDataService
+
+TOMORROW = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+YESTERDAY = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+
+
+@pytest.fixture
+def data_service(fake_mysql):
+    service = MatchRequestDataService({"host": "fake", "port": 3306, "user": "test", "password": "test"})
+    service.initialize("Game")
+    return service
+
+
+def add_request(fake_mysql, match_request_id, user_id=None, game_id="g1", active=True, cancelled=False,
+                expire_date=TOMORROW, skill_rating=None, region=None, language=None, waited=0):
+    fake_mysql.execute(
+        "INSERT INTO match_request (matchRequestId, userId, gameId, expireDate, isActive, isCancelled, "
+        "skillRating, region, language, activatedAt) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', ?))",
+        (match_request_id, user_id or f"user-{match_request_id}", game_id, expire_date, int(active),
+         int(cancelled), skill_rating, region, language, f"-{waited} seconds")
+    )
+
+
+def is_active(fake_mysql, match_request_id):
+    return bool(fake_mysql.execute("SELECT isActive FROM match_request WHERE matchRequestId = ?",
+                                   (match_request_id,))[0]["isActive"])
+
+
+def pairs(fake_mysql):
+    return {(row["matchRequestId1"], row["matchRequestId2"])
+            for row in fake_mysql.execute("SELECT * FROM matched_requests")}
+
+
+def test_claim_group_pairs_claimable_requests(data_service, fake_mysql):
+    add_request(fake_mysql, "a")
+    add_request(fake_mysql, "b")
+
+    assert data_service.claim_group(["a", "b"], "g1") == {"matched": True, "available": ["a", "b"], "busy": []}
+    assert pairs(fake_mysql) == {("a", "b")}
+    assert not is_active(fake_mysql, "a") and not is_active(fake_mysql, "b")
+    assert data_service.get_match_group("b") == ["a", "b"]
+
+
+def test_claim_group_locks_candidates_without_waiting(data_service, fake_mysql):
+    add_request(fake_mysql, "a")
+    add_request(fake_mysql, "b")
+    data_service.claim_group(["a", "b"], "g1")
+
+    claim = next(sql for sql in fake_mysql.statements if "IN (%s, %s)" in sql and sql.startswith("SELECT"))
+    assert re.search(r"isActive = TRUE AND isCancelled = FALSE AND expireDate >= CURDATE\(\)", claim)
+    assert claim.endswith("FOR UPDATE SKIP LOCKED")
+
+
+@pytest.mark.parametrize("state", [{"active": False}, {"cancelled": True}, {"expire_date": YESTERDAY}])
+def test_claim_group_writes_nothing_unless_every_member_is_claimable(data_service, fake_mysql, state):
+    add_request(fake_mysql, "a")
+    add_request(fake_mysql, "b")
+    add_request(fake_mysql, "c", **state)
+
+    assert data_service.claim_group(["a", "b", "c"], "g1") == {"matched": False, "available": ["a", "b"], "busy": []}
+    assert is_active(fake_mysql, "a") and is_active(fake_mysql, "b")
+    assert fake_mysql.execute("SELECT * FROM matched_groups") == []
+
+
+def test_claim_group_records_lobbies_in_matched_groups(data_service, fake_mysql):
+    for match_request_id in "abcd":
+        add_request(fake_mysql, match_request_id)
+
+    assert data_service.claim_group(list("abcd"), "g1")["matched"]
+    assert sorted(data_service.get_match_group("c")) == list("abcd")
+    assert pairs(fake_mysql) == set()
+
+
+def test_claimed_request_cannot_be_claimed_or_cancelled_again(data_service, fake_mysql):
+    for match_request_id in "abc":
+        add_request(fake_mysql, match_request_id)
+    data_service.claim_group(["a", "b"], "g1")
+
+    assert not data_service.claim_group(["b", "c"], "g1")["matched"]
+    assert not data_service.cancel_match_request("a")
+    assert data_service.cancel_match_request("c")
+    assert not data_service.claim_group(["c", "a"], "g1")["matched"]
+
+
+def test_matched_requests_cannot_be_activated_or_cancelled_again(data_service, fake_mysql):
+    add_request(fake_mysql, "a")
+    add_request(fake_mysql, "b")
+    data_service.claim_group(["a", "b"], "g1")
+    # Either side of the pair, each found through its own index
+    assert not data_service.activate_match_request("a")
+    assert not data_service.activate_match_request("b")
+    assert not data_service.cancel_match_request("b")
+    assert data_service.get_match_group("b") == ["a", "b"]
+    indexes = {row["name"] for row in fake_mysql.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'matched_requests'")}
+    assert {"idx_matched_requests_id1", "idx_matched_requests_id2"} <= indexes
+
+
+def test_claim_partner_respects_game_region_language_and_user(data_service, fake_mysql):
+    add_request(fake_mysql, "me", user_id="u1", region="eu", language="en")
+    add_request(fake_mysql, "same-user", user_id="u1", region="eu", language="en")
+    add_request(fake_mysql, "other-game", game_id="g2", region="eu", language="en")
+    add_request(fake_mysql, "other-region", region="us", language="en")
+    add_request(fake_mysql, "no-language", region="eu")
+
+    assert data_service.claim_partner("me", "u1", "g1", "eu", "en") is None
+    add_request(fake_mysql, "partner", region="eu", language="en")
+    assert data_service.claim_partner("me", "u1", "g1", "eu", "en")["matchRequestId"] == "partner"
+    assert pairs(fake_mysql) == {("me", "partner")}
+
+
+def test_claim_partner_takes_closest_rating_within_window(data_service, fake_mysql):
+    window = {"window": 100, "base_window": 100, "widen_rate": 0, "max_window": 1000}
+    add_request(fake_mysql, "me", skill_rating=1500)
+    add_request(fake_mysql, "far", skill_rating=1700)
+    add_request(fake_mysql, "near", skill_rating=1560)
+    add_request(fake_mysql, "nearest", skill_rating=1480)
+
+    partner = data_service.claim_partner("me", "user-me", "g1", skill_rating=1500, skill_window=window)
+    assert partner["matchRequestId"] == "nearest"
+
+
+def test_claim_partner_widens_window_with_candidate_wait(data_service, fake_mysql):
+    window = {"window": 100, "base_window": 100, "widen_rate": 10, "max_window": 1000}
+    add_request(fake_mysql, "me", skill_rating=1500)
+    add_request(fake_mysql, "patient", skill_rating=1800, waited=30)
+
+    assert data_service.claim_partner("me", "user-me", "g1", skill_rating=1500, skill_window=window) is not None
+
+
+def test_claim_partner_refuses_an_unclaimable_caller(data_service, fake_mysql):
+    add_request(fake_mysql, "me", cancelled=True)
+    add_request(fake_mysql, "partner")
+
+    assert data_service.claim_partner("me", "user-me", "g1") is None
+    assert is_active(fake_mysql, "partner")
+
+
+def pair_by_game(rows):
+    by_game = {}
+    for row in rows:
+        by_game.setdefault(row["gameId"], []).append(row)
+    return [group[i:i + 2] for group in by_game.values() for i in range(0, len(group) - 1, 2)]
+
+
+def test_match_active_batch_claims_only_groups_still_claimable(data_service, fake_mysql):
+    for match_request_id, game_id in [("a", "g1"), ("b", "g1"), ("c", "g2"), ("d", "g2")]:
+        add_request(fake_mysql, match_request_id, game_id=game_id)
+
+    def group_requests(rows):
+        # d is cancelled between the candidate read and the claim
+        fake_mysql.execute("UPDATE match_request SET isCancelled = 1, isActive = 0 WHERE matchRequestId = 'd'")
+        return pair_by_game(rows)
+
+    groups, cursor = data_service.match_active_batch(10, group_requests)
+    assert [[row["matchRequestId"] for row in group] for group in groups] == [["a", "b"]]
+    assert cursor is None
+    assert pairs(fake_mysql) == {("a", "b")}
+    assert is_active(fake_mysql, "c")
+
+
+def test_match_active_batch_locks_only_grouped_rows(data_service, fake_mysql):
+    for match_request_id, game_id in [("a", "g1"), ("b", "g1"), ("lonely", "g2")]:
+        add_request(fake_mysql, match_request_id, game_id=game_id)
+    fake_mysql.statements.clear()
+
+    data_service.match_active_batch(10, pair_by_game)
+    locking = [sql for sql in fake_mysql.statements if "FOR UPDATE" in sql]
+    assert len(locking) == 1 and "IN (%s, %s)" in locking[0]
+    candidates = next(sql for sql in fake_mysql.statements if "ORDER BY" in sql)
+    assert "FOR UPDATE" not in candidates and "ORDER BY gameId, activatedAt, matchRequestId" in candidates
+
+
+def test_match_active_batch_rotates_through_every_game(data_service, fake_mysql):
+    # Three unmatchable requests for g1 would fill every batch if passes always started at the lowest gameId
+    for i in range(3):
+        add_request(fake_mysql, f"g1-{i}", game_id="g1", region=f"r{i}")
+    for game_id in ("g2", "g3"):
+        add_request(fake_mysql, f"{game_id}-a", game_id=game_id, waited=10)
+        add_request(fake_mysql, f"{game_id}-b", game_id=game_id)
+
+    def group_requests(rows):
+        return [group for group in pair_by_game(rows) if group[0].get("region") == group[1].get("region")]
+
+    cursor, matched, seen = None, [], []
+    for _ in range(4):
+        groups, cursor = data_service.match_active_batch(2, lambda rows: seen.append(rows) or group_requests(rows),
+                                                         cursor)
+        matched.extend(row["matchRequestId"] for group in groups for row in group)
+    assert sorted(matched) == ["g2-a", "g2-b", "g3-a", "g3-b"]
+    # Oldest first within a game
+    assert [row["matchRequestId"] for row in seen[2]] == ["g2-a", "g2-b"]
+
+
+def test_match_active_batch_pages_through_a_game_filling_the_batch(data_service, fake_mysql):
+    # More ungroupable requests for g1 than fit in a batch, two of them activated at the same time
+    for i, waited in enumerate([40, 30, 30, 20, 10]):
+        add_request(fake_mysql, f"g1-{i}", game_id="g1", region=f"r{i}", waited=waited)
+    add_request(fake_mysql, "g2-a", game_id="g2")
+
+    cursor, seen = None, []
+    for _ in range(3):
+        _, cursor = data_service.match_active_batch(2, lambda rows: seen.append(rows) or [], cursor)
+    assert [[row["matchRequestId"] for row in rows] for rows in seen] == [
+        ["g1-0", "g1-1"], ["g1-2", "g1-3"], ["g1-4", "g2-a"]]
+    # g2 may have been cut short, so the next pass starts at it rather than after it
+    assert cursor[0] == "g1" and cursor[2] == "g1-4"
+
+
+def test_active_requests_are_read_page_by_page(data_service, fake_mysql):
+    for index in range(7):
+        add_request(fake_mysql, f"r{index}", game_id=f"g{index % 3}")
+    add_request(fake_mysql, "inactive", active=False)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = data_service.get_active_match_requests(2, cursor)
+        seen.extend((row["gameId"], row["matchRequestId"]) for row in rows)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == sorted(seen) and len(seen) == 7 and pages == 4
+
+
+def test_a_partition_reads_only_the_requests_of_its_games(data_service, fake_mysql):
+    from app.services.Matchmaking.MatchmakingBackend import MatchmakingBackend
+    from framework.services.DataAccess.ExecutorDataService import ExecutorDataService
+
+    for index in range(9):
+        add_request(fake_mysql, f"r{index}", game_id=f"g{index % 3}")
+    backend = MatchmakingBackend(data_service, ExecutorDataService(data_service), {"recovery_page_size": 2})
+
+    assert data_service.get_active_game_ids() == ["g0", "g1", "g2"]
+    owned = asyncio.run(backend.load_active_requests(owns=lambda game_id: game_id != "g1"))
+    assert sorted(row["matchRequestId"] for row in owned) == ["r0", "r2", "r3", "r5", "r6", "r8"]
+    assert len(asyncio.run(backend.load_active_requests())) == 9
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import match_requests
+from app.services.service_factory import ServiceFactory
+from tests.test_match_request_data_service import add_request
+
+
+@pytest.fixture
+def resource(fake_mysql):
+    return ServiceFactory.get_service("MatchRequestsResource")
+
+
+def test_status_poller_wakes_waiters_on_changes_made_elsewhere(resource, fake_mysql):
+    for match_request_id in ("a", "b", "c"):
+        add_request(fake_mysql, match_request_id)
+
+    async def scenario():
+        waiters = [asyncio.create_task(resource.wait_for_match_status(match_request_id, 30))
+                   for match_request_id in ("a", "b", "c", "c")]
+        await asyncio.sleep(0.1)
+        # Another worker matches a and b behind this process's back
+        resource.data_service.claim_group(["a", "b"], "g1")
+        fake_mysql.statements.clear()
+        settled = await resource.status_poller.run_once()
+        done, pending = await asyncio.wait(waiters, timeout=1)
+        for waiter in pending:
+            waiter.cancel()
+        return settled, [waiter.result() for waiter in waiters if waiter in done], len(pending)
+
+    settled, statuses, pending = asyncio.run(scenario())
+    assert sorted(settled) == ["a", "b"]
+    assert sorted((status.matchRequestId, status.status) for status in statuses) == [("a", "matched"), ("b", "matched")]
+    assert pending == 2
+    # One query found the settled requests for every waiter; only those were reloaded
+    polls = [sql for sql in fake_mysql.statements if "isActive = TRUE" in sql]
+    assert len(polls) == 1
+
+
+def test_wait_for_match_status_times_out_with_current_status(resource, fake_mysql):
+    add_request(fake_mysql, "a")
+    status = asyncio.run(resource.wait_for_match_status("a", 0.05))
+    assert status.status == "matching"
+    assert resource.notification_hub.stats()["waiters"] == 0
+
+
+class FakeWebSocket:
+
+    def __init__(self, messages):
+        self.messages = asyncio.Queue()
+        for message in messages:
+            self.messages.put_nowait(message)
+
+    async def receive(self):
+        return await self.messages.get()
+
+
+def test_wait_unless_disconnected_cancels_the_wait_on_disconnect():
+    async def scenario():
+        cancelled = asyncio.Event()
+
+        async def wait_forever():
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        websocket = FakeWebSocket([{"type": "websocket.receive", "text": "ping"}])
+        racing = asyncio.create_task(match_requests.wait_unless_disconnected(websocket, wait_forever()))
+        await asyncio.sleep(0.05)
+        assert not racing.done()
+        websocket.messages.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        result = await asyncio.wait_for(racing, 1)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return result, cancelled.is_set()
+
+    assert asyncio.run(scenario()) == (None, True)
+
+
+def test_wait_unless_disconnected_returns_the_result():
+    async def answer():
+        await asyncio.sleep(0.01)
+        return "matched"
+
+    async def scenario():
+        return await match_requests.wait_unless_disconnected(FakeWebSocket([]), answer())
+
+    assert asyncio.run(scenario()) == "matched"
+
+
+def test_websocket_pushes_the_published_status(resource, fake_mysql):
+    add_request(fake_mysql, "a")
+    add_request(fake_mysql, "b")
+    app = FastAPI()
+    app.include_router(match_requests.router)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/match/status/a/ws") as websocket:
+            assert websocket.receive_json()["status"] == "matching"
+            deadline = time.monotonic() + 5
+            while resource.notification_hub.stats()["waiters"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            resource.data_service.claim_group(["a", "b"], "g1")
+            client.portal.call(resource.status_poller.run_once)
+            status = websocket.receive_json()
+            assert (status["status"], status["partnerRequestId"]) == ("matched", "b")
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from app.services.Matchmaking.MatchmakingEngine import MatchmakingEngine
+
+
+def request(match_request_id, game_id="g1", **fields):
+    return {"matchRequestId": match_request_id, "userId": f"user-{match_request_id}", "gameId": game_id, **fields}
+
+
+class Claims:
+    """Scripted claim_group: returns the queued results in order, recording each group."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.groups = []
+
+    async def __call__(self, group):
+        self.groups.append([member["matchRequestId"] for member in group])
+        return self.results.pop(0)
+
+
+def test_submit_matches_with_a_queued_partner():
+    claims = Claims({"matched": True, "available": ["b", "a"], "busy": []})
+    engine = MatchmakingEngine(claims)
+
+    assert asyncio.run(engine.submit(request("a"))) is None
+    partners = asyncio.run(engine.submit(request("b")))
+    assert [partner["matchRequestId"] for partner in partners] == ["a"]
+    assert claims.groups == [["b", "a"]] and len(engine) == 0
+
+
+def test_lost_claim_drops_gone_partners_and_keeps_busy_ones():
+    claims = Claims({"matched": False, "available": ["c"], "busy": ["b"]},
+                    {"matched": False, "available": [], "busy": ["c"]})
+    engine = MatchmakingEngine(claims, party_size=lambda game_id: 3)
+    engine.restore([request("a"), request("b")])
+
+    assert asyncio.run(engine.submit(request("c"))) is None
+    # a was matched or cancelled elsewhere; b is only locked by another claim and stays queued
+    assert "a" not in engine and "b" in engine
+    # c itself is locked by another claim: keep it queued rather than dropping a live request
+    assert "c" in engine
+
+
+def test_lost_claim_drops_submitter_that_is_gone():
+    claims = Claims({"matched": False, "available": ["a"], "busy": []})
+    engine = MatchmakingEngine(claims)
+    engine.restore([request("a")])
+
+    assert asyncio.run(engine.submit(request("b"))) is None
+    assert "a" in engine and "b" not in engine
+
+
+def test_failed_claim_requeues_everyone():
+    async def failing_claim(group):
+        raise RuntimeError("database unavailable")
+
+    engine = MatchmakingEngine(failing_claim)
+    engine.restore([request("a")])
+
+    assert asyncio.run(engine.submit(request("b"))) is None
+    assert "a" in engine and "b" in engine
+    assert engine.stats()["claim_failures"] == 1
+
+
+def test_reconcile_keeps_requests_queued_after_the_load_started():
+    engine = MatchmakingEngine(Claims())
+    engine.restore([request("a"), request("b")])
+    loaded_since = time.monotonic()
+    # Activated and queued while the snapshot was being read, after it passed g3
+    assert asyncio.run(engine.submit(request("c", game_id="g3"))) is None
+
+    assert engine.reconcile([request("b"), request("d", game_id="g2")], loaded_since) == (1, 1)
+    assert "a" not in engine and {"b", "c", "d"} <= set(engine.matcher)
@@ -0,0 +1,156 @@
+import asyncio
+import queue
+from collections import Counter
+
+import pytest
+
+from app.services.Matchmaking.HashRing import HashRing
+from app.services.Matchmaking.MatchmakingShards import MatchmakingShards
+
+GAME_IDS = [f"game-{i}" for i in range(5000)]
+
+
+def test_hash_ring_spreads_keys_evenly():
+    ring = HashRing([f"shard-{i}" for i in range(4)])
+    owners = Counter(ring.get_node(game_id) for game_id in GAME_IDS)
+    assert set(owners) == set(ring.nodes)
+    # 100 points per node keeps every share within a third of the fair share
+    assert all(abs(count - len(GAME_IDS) / 4) < len(GAME_IDS) / 12 for count in owners.values())
+
+
+def test_hash_ring_is_the_same_in_every_process():
+    # md5 rather than the per-process salted hash(), and independent of insertion order
+    first, second = HashRing(["a", "b", "c"]), HashRing(["c", "b", "a"])
+    assert all(first.get_node(game_id) == second.get_node(game_id) for game_id in GAME_IDS)
+
+
+def test_adding_a_node_only_moves_keys_to_it():
+    ring = HashRing([f"shard-{i}" for i in range(4)])
+    before = {game_id: ring.get_node(game_id) for game_id in GAME_IDS}
+    ring.add("shard-4")
+    moved = [game_id for game_id in GAME_IDS if ring.get_node(game_id) != before[game_id]]
+
+    assert all(ring.get_node(game_id) == "shard-4" for game_id in moved)
+    assert abs(len(moved) - len(GAME_IDS) / 5) < len(GAME_IDS) / 15
+
+
+def test_removing_a_node_only_moves_its_keys():
+    ring = HashRing([f"shard-{i}" for i in range(4)])
+    before = {game_id: ring.get_node(game_id) for game_id in GAME_IDS}
+    ring.remove("shard-2")
+
+    for game_id in GAME_IDS:
+        if before[game_id] == "shard-2":
+            assert ring.get_node(game_id) != "shard-2"
+        else:
+            assert ring.get_node(game_id) == before[game_id]
+    assert len(ring) == 3 and HashRing().get_node("game-1") is None
+
+
+class FakeProcess:
+
+    def __init__(self):
+        self.alive = True
+        self.exitcode = None
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+    def terminate(self):
+        self.alive = False
+
+
+class FakeShards(MatchmakingShards):
+    """MatchmakingShards with in-process stand-ins for the worker processes."""
+
+    def __init__(self, workers):
+        self.matched = []
+        super().__init__(workers, {}, on_matched=self.matched.append)
+        self.spawned = []
+
+    def _spawn(self, shard_id):
+        self.spawned.append(shard_id)
+        self._shards[shard_id] = (FakeProcess(), queue.Queue())
+
+    def inbox(self, shard_id):
+        messages = []
+        inbox = self._shards[shard_id][1]
+        while not inbox.empty():
+            messages.append(inbox.get())
+        return messages
+
+
+@pytest.fixture
+def shards():
+    async def start():
+        shards = FakeShards(3)
+        shards.start()
+        return shards
+
+    loop = asyncio.new_event_loop()
+    shards = loop.run_until_complete(start())
+    yield shards
+    loop.run_until_complete(shards.stop())
+    loop.close()
+
+
+def test_submit_routes_each_game_to_its_owning_shard(shards):
+    for shard_id in shards.ring.nodes:
+        shards.inbox(shard_id)
+    for game_id in GAME_IDS[:50]:
+        shards.submit({"matchRequestId": f"r-{game_id}", "gameId": game_id})
+
+    for shard_id in shards.ring.nodes:
+        submitted = [payload for kind, payload in shards.inbox(shard_id) if kind == "submit"]
+        assert submitted
+        assert all(shards.ring.get_node(request["gameId"]) == shard_id for request in submitted)
+    assert sum(shard["routed"] for shard in shards.stats()["shards"].values()) == 50
+
+
+def test_dead_shard_is_restarted_under_the_same_id(shards):
+    process, _ = shards._shards["shard-1"]
+    process.alive = False
+
+    asyncio.run(shards.run_once())
+    assert shards.spawned.count("shard-1") == 2
+    assert shards.stats()["restarts"] == 1
+    assert shards._shards["shard-1"][0].is_alive()
+    # Its games stay with it, so the replacement recovers the same partition
+    assert shards.ring.nodes == ["shard-0", "shard-1", "shard-2"]
+
+
+def test_removing_a_worker_reroutes_its_games_and_rebalances_the_rest(shards):
+    owned = [game_id for game_id in GAME_IDS[:200] if shards.ring.get_node(game_id) == "shard-1"]
+    for shard_id in shards.ring.nodes:
+        shards.inbox(shard_id)
+
+    assert asyncio.run(shards.remove_worker("shard-1"))
+    assert shards.ring.nodes == ["shard-0", "shard-2"]
+    for shard_id in shards.ring.nodes:
+        assert shards.inbox(shard_id) == [("rebalance", ["shard-0", "shard-2"])]
+
+    shards.submit({"matchRequestId": "r", "gameId": owned[0]})
+    assert shards.ring.get_node(owned[0]) in ("shard-0", "shard-2")
+    assert not asyncio.run(shards.remove_worker("shard-1"))
+
+
+def test_adding_a_worker_tells_the_others_to_rebalance(shards):
+    for shard_id in shards.ring.nodes:
+        shards.inbox(shard_id)
+    shard_id = shards.add_worker()
+
+    assert shard_id == "shard-3"
+    assert shards.inbox("shard-0") == [("rebalance", ["shard-0", "shard-1", "shard-2", "shard-3"])]
+    assert shards.inbox("shard-3") == []
+
+
+def test_matches_reported_by_shards_reach_on_matched(shards):
+    group = [{"matchRequestId": "a"}, {"matchRequestId": "b"}]
+    shards._handle("matched", "shard-0", group)
+    shards._handle("stats", "shard-0", {"engine": {"queued": 3}})
+    assert shards.matched == [[group]]
+    assert shards.stats()["shards"]["shard-0"]["matches"] == 1
+    assert shards.stats()["shards"]["shard-0"]["engine"] == {"queued": 3}
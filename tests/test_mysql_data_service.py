@@ -0,0 +1,56 @@
+import pytest
+
+from framework.services.DataAccess.MySQLDataService import MySQLDataService
+
+
+@pytest.fixture
+def data_service(fake_mysql):
+    return MySQLDataService({"host": "fake", "port": 3306, "user": "test", "password": "test", "bulk_chunk_size": 2})
+
+
+def rows(fake_mysql):
+    return {row["favouriteId"]: row["gameId"] for row in fake_mysql.execute("SELECT * FROM favourites")}
+
+
+def test_insert_data_objects_reports_each_chunk(data_service, fake_mysql):
+    results = data_service.insert_data_objects("Game", "favourites", [
+        {"favouriteId": str(i), "userId": "u", "gameId": f"g{i}"} for i in range(5)
+    ])
+    assert results == [True] * 5
+    assert len(rows(fake_mysql)) == 5
+
+
+def test_insert_data_objects_rolls_back_every_chunk_on_error(data_service, fake_mysql):
+    data_service.insert_data_objects("Game", "favourites", [{"favouriteId": "3", "userId": "u", "gameId": "g"}])
+    with pytest.raises(Exception):
+        data_service.insert_data_objects("Game", "favourites", [
+            {"favouriteId": str(i), "userId": "u", "gameId": f"g{i}"} for i in range(5)
+        ])
+    assert list(rows(fake_mysql)) == ["3"]
+
+
+def test_upsert_data_objects_counts_inserts_and_updates(data_service, fake_mysql):
+    data_service.insert_data_objects("Game", "favourites", [
+        {"favouriteId": "1", "userId": "u", "gameId": "old"},
+        {"favouriteId": "4", "userId": "u", "gameId": "old"},
+    ])
+    fake_mysql.statements.clear()
+    results, counts = data_service.upsert_data_objects("Game", "favourites", "favouriteId", [
+        {"favouriteId": str(i), "userId": "u", "gameId": "new"} for i in range(5)
+    ] + [{"favouriteId": "9", "userId": "u", "gameId": "first"}, {"favouriteId": "9", "userId": "u", "gameId": "last"}],
+        chunk_size=3)
+    assert results == [True] * 7
+    assert counts == {"inserted": 4, "updated": 3}
+    # The keys are written without being read, let alone locked, first
+    assert not [sql for sql in fake_mysql.statements if sql.lstrip().startswith("SELECT")]
+    assert rows(fake_mysql) == {"0": "new", "1": "new", "2": "new", "3": "new", "4": "new", "9": "last"}
+
+
+def test_update_data_objects_flags_missing_keys(data_service, fake_mysql):
+    data_service.insert_data_objects("Game", "favourites", [{"favouriteId": "1", "userId": "u", "gameId": "old"}])
+    results = data_service.update_data_objects("Game", "favourites", "favouriteId", [
+        {"favouriteId": "1", "gameId": "new"},
+        {"favouriteId": "2", "gameId": "new"},
+    ])
+    assert results == [True, False]
+    assert rows(fake_mysql) == {"1": "new"}
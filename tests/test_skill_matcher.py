@@ -0,0 +1,136 @@
+from app.services.Matchmaking.SkillMatcher import SkillMatcher
+
+NOW = 1000.0
+
+
+def entry(match_request_id, skill=None, user_id=None, game_id="g1", region=None, language=None, waited=0):
+    return {
+        "matchRequestId": match_request_id,
+        "userId": user_id or f"user-{match_request_id}",
+        "gameId": game_id,
+        "region": region,
+        "language": language,
+        "skillRating": skill,
+        "enqueuedAt": NOW - waited,
+    }
+
+
+def matcher_with(*entries, **windows):
+    matcher = SkillMatcher(**{"base_window": 100, "widen_rate": 10, "max_window": 1000, **windows})
+    for queued in entries:
+        matcher.add(queued)
+    return matcher
+
+
+def ids(group):
+    return [member["matchRequestId"] for member in group]
+
+
+def test_find_group_takes_the_closest_rating_within_the_window():
+    matcher = matcher_with(entry("far", 1700), entry("near", 1560), entry("nearest", 1480))
+    assert ids(matcher.find_group(entry("me", 1500), 1, NOW)) == ["nearest"]
+    assert ids(matcher.find_group(entry("me", 1500), 2, NOW)) == ["nearest", "near"]
+
+
+def test_find_group_ignores_ratings_outside_every_window():
+    matcher = matcher_with(entry("far", 1700))
+    assert matcher.find_group(entry("me", 1500), 1, NOW) == []
+
+
+def test_window_widens_with_waiting_up_to_max_window():
+    matcher = matcher_with(entry("patient", 1800, waited=25))
+    assert ids(matcher.find_group(entry("me", 1500), 1, NOW)) == ["patient"]
+    assert matcher.window(entry("x", waited=10_000), NOW) == 1000
+
+
+def test_find_group_only_matches_within_game_region_and_language():
+    matcher = matcher_with(
+        entry("other-game", 1500, game_id="g2"),
+        entry("other-region", 1500, region="us"),
+        entry("other-language", 1500, region="eu", language="de"),
+        entry("same-user", 1500, user_id="me", region="eu", language="en"),
+    )
+    assert matcher.find_group(entry("me", 1500, user_id="me", region="eu", language="en"), 1, NOW) == []
+    matcher.add(entry("match", 1500, region="eu", language="en"))
+    assert ids(matcher.find_group(entry("me", 1500, user_id="me", region="eu", language="en"), 1, NOW)) == ["match"]
+
+
+def test_unrated_requests_match_any_rating_in_arrival_order():
+    matcher = matcher_with(entry("rated", 2500), entry("first"), entry("second"))
+    assert ids(matcher.find_group(entry("me"), 2, NOW)) == ["first", "second"]
+    assert ids(matcher.find_group(entry("me"), 3, NOW)) == ["first", "second", "rated"]
+    assert ids(matcher.find_group(entry("me", 100), 1, NOW)) == ["first"]
+
+
+def test_find_group_does_not_remove_and_remove_forgets():
+    matcher = matcher_with(entry("a", 1500), entry("b"))
+    matcher.find_group(entry("me", 1500), 2, NOW)
+    assert len(matcher) == 2
+    assert matcher.remove("a")["matchRequestId"] == "a"
+    assert matcher.remove("a") is None
+    matcher.remove("b")
+    assert matcher.find_group(entry("me", 1500), 2, NOW) == []
+    assert len(matcher) == 0 and matcher.stats()["buckets"] == 0
+
+
+def assert_valid_group(matcher, group, size, now=NOW):
+    assert len(group) == size
+    assert len({SkillMatcher.bucket_key(member) for member in group}) == 1
+    assert len({member["userId"] for member in group}) == size
+    assert matcher._fits(group[:-1], group[-1], now)
+
+
+def test_group_all_fills_lobbies_and_removes_them():
+    matcher = matcher_with(*[entry(f"r{i}", 1500 + 10 * i) for i in range(9)])
+    groups = matcher.group_all(lambda game_id: 4, NOW)
+    assert [ids(group) for group in groups] == [["r0", "r1", "r2", "r3"], ["r4", "r5", "r6", "r7"]]
+    assert list(matcher) == ["r8"]
+
+
+def test_group_all_splits_runs_that_exceed_the_window():
+    matcher = matcher_with(entry("a", 1000), entry("b", 1050), entry("c", 1400), entry("d", 1450))
+    groups = matcher.group_all(lambda game_id: 2, NOW)
+    assert sorted(ids(group) for group in groups) == [["a", "b"], ["c", "d"]]
+
+
+def test_group_all_tops_up_unrated_lobbies_with_leftover_rated_requests():
+    matcher = matcher_with(entry("u1"), entry("u2"), entry("low", 1000), entry("high", 2500))
+    groups = matcher.group_all(lambda game_id: 3, NOW)
+    assert len(groups) == 1
+    assert ids(groups[0])[:2] == ["u1", "u2"]
+    assert len(matcher) == 1
+
+
+def test_group_all_defers_a_users_second_request_to_the_next_lobby():
+    matcher = matcher_with(entry("a1", user_id="a"), entry("a2", user_id="a"), entry("b1", user_id="b"),
+                           entry("c1", user_id="c"))
+    groups = matcher.group_all(lambda game_id: 2, NOW)
+    assert sorted(ids(group) for group in groups) == [["a1", "b1"], ["c1", "a2"]]
+
+
+def test_group_all_uses_each_games_party_size():
+    matcher = matcher_with(*[entry(f"x{i}", game_id="duo") for i in range(3)],
+                           *[entry(f"y{i}", game_id="squad") for i in range(3)])
+    groups = matcher.group_all(lambda game_id: 2 if game_id == "duo" else 4, NOW)
+    assert [ids(group) for group in groups] == [["x0", "x1"]]
+
+
+def test_group_all_only_returns_valid_disjoint_groups():
+    import random
+
+    rng = random.Random(7)
+    queued = [
+        entry(f"m{i}", rng.choice([None, rng.gauss(1500, 300)]), user_id=f"u{rng.randrange(60)}",
+              game_id=rng.choice(["g1", "g2"]), region=rng.choice(["eu", "us"]), waited=rng.uniform(0, 60))
+        for i in range(400)
+    ]
+    matcher = matcher_with(*queued)
+    sizes = {"g1": 2, "g2": 5}
+    groups = matcher.group_all(sizes.get, NOW)
+
+    grouped = [member["matchRequestId"] for group in groups for member in group]
+    assert len(grouped) == len(set(grouped)) and groups
+    for group in groups:
+        assert_valid_group(matcher, group, sizes[group[0]["gameId"]])
+    assert len(matcher) == len(queued) - len(grouped)
+    assert not set(grouped) & set(matcher)
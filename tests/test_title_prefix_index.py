@@ -0,0 +1,41 @@
+import heapq
+import threading
+
+from app.services.Search.TitlePrefixIndex import TitlePrefixIndex
+
+
+def test_add_many_matches_one_add_per_game():
+    games = [("a", "Super Mario"), ("b", "Mario Kart"), ("c", "Dr. Mario")]
+    updates = [("b", "Kart Racer"), ("d", "Mario Party"), ("e", "Marionette")]
+    bulk, single = TitlePrefixIndex(), TitlePrefixIndex()
+    bulk.build(games)
+    single.build(games)
+
+    bulk.add_many(updates)
+    for game_id, title in updates:
+        single.add(game_id, title)
+    assert bulk.suggest("mario", 50) == single.suggest("mario", 50)
+    assert bulk._title_keys == single._title_keys and bulk._word_keys == single._word_keys
+
+
+def test_suggest_does_not_wait_for_a_bulk_merge(monkeypatch):
+    index = TitlePrefixIndex()
+    index.build([(f"g{i}", f"Game {i}") for i in range(1000)])
+    merging, release = threading.Event(), threading.Event()
+    merge = heapq.merge
+
+    def slow_merge(*runs):
+        merging.set()
+        release.wait(5)
+        return merge(*runs)
+
+    monkeypatch.setattr(heapq, "merge", slow_merge)
+    writer = threading.Thread(target=index.add_many, args=([(f"n{i}", f"New {i}") for i in range(10)],))
+    writer.start()
+    assert merging.wait(5)
+    # The writer is mid-merge; readers still get the old lists
+    assert index.suggest("game 1", 1) == [("g1", "Game 1")]
+    assert index.suggest("new", 1) == []
+    release.set()
+    writer.join()
+    assert index.suggest("new 3", 1) == [("n3", "New 3")]
@@ -0,0 +1,84 @@
+import random
+import sqlite3
+
+import pytest
+
+from app.services.Search.TitleSearchIndex import TitleSearchIndex
+
+WORDS = ["star", "wars", "starfield", "mario", "super", "kart", "odyssey", "stardew", "valley", "lone",
+         "wanderer", "outer", "wilds", "dark", "souls", "darkest", "dungeon", "hollow", "knight", "rogue"]
+
+
+def catalog(size=4000, seed=3):
+    rng = random.Random(seed)
+    return [(f"g{i}", " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4))))
+            for i in range(size)]
+
+
+@pytest.fixture(scope="module")
+def titles():
+    return catalog()
+
+
+@pytest.fixture(scope="module")
+def index(titles):
+    index = TitleSearchIndex()
+    index.build(titles)
+    return index
+
+
+@pytest.fixture(scope="module")
+def like(titles):
+    """The LIKE query the index stands in for, on an SQLite copy of the titles."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE game_info (gameId TEXT, title TEXT)")
+    connection.executemany("INSERT INTO game_info VALUES (?, ?)", titles)
+
+    def matching(term):
+        rows = connection.execute("SELECT gameId FROM game_info WHERE title LIKE ?", (f"%{term}%",))
+        return {game_id for game_id, in rows}
+
+    yield matching
+    connection.close()
+
+
+@pytest.mark.parametrize("term", ["star", "ari", "ark", "dew", "super", "rogue", "wanderer", "est"])
+def test_every_like_match_is_found(index, like, term):
+    expected = like(term)
+    found = index.search(term)
+    assert len(found) == len(set(found))
+    assert expected <= set(found)
+    # Beyond LIKE, only fuzzy matches are added, and they rank after every real one
+    assert set(found[:len(expected)]) == expected
+
+
+def test_search_is_not_truncated(index, like):
+    assert len(like("star")) > 1000
+    assert set(index.search("star")) >= like("star")
+    assert len(index.search("star", limit=10)) == 10
+
+
+def test_every_query_token_must_match(index, like):
+    expected = like("mario") & like("kart")
+    assert set(index.search("kart mario")) == expected
+    assert set(index.search("mario kart")) >= like("mario kart")
+
+
+def test_matches_rank_exact_then_prefix_then_substring():
+    index = TitleSearchIndex()
+    index.build([("sub", "Lodestar"), ("prefix", "Starfield"), ("exact", "Star Trek"), ("fuzzy", "Sta")])
+    assert index.search("star") == ["exact", "prefix", "sub", "fuzzy"]
+    assert index.search("strfield") == ["prefix"]
+
+
+def test_add_and_remove_keep_the_vocabulary_in_step():
+    index = TitleSearchIndex()
+    index.build([("a", "Super Mario"), ("b", "Mario Kart")])
+    index.add("c", "Marionette")
+    assert sorted(index.search("mario")) == ["a", "b", "c"]
+
+    index.remove("a")
+    index.add("b", "Kart Racer")
+    assert index.search("mario") == ["c"]
+    assert index.search("super") == []
+    assert index._vocabulary == sorted(index._postings)